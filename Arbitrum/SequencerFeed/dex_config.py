@@ -21,7 +21,7 @@ DEX_ROUTERS = {
     # SwapRouter02
     "0xe592427a0aece92de3edee1f18e0157c05861564": "Uniswap V3 Router 1",
     "0x68b3465833fb72a70ecdf485e0e4c7bd8665fc45": "Uniswap V3 Router 2",
-    "0x101F443B4d1b059569D643917553c771E1b9663E": "Arbitrum Sepolia Uniswap V3 Router",
+    "0x101f443b4d1b059569d643917553c771e1b9663e": "Arbitrum Sepolia Uniswap V3 Router",
 
     # Universal Router (v4 routing entrypoint – used for v2/v3 under the hood)
     "0xa51afafe0263b40edaef0df8781ea9aa03e381a3": "Uniswap Universal Router",
@@ -49,18 +49,36 @@ DEX_ROUTERS = {
     "0x171b925c51565f5d2a7d8c494ba3188d304efd93": "Camelot Router (Arbitrum Sepolia)",
 }
 
+# Raw 20-byte router addresses, to check the `to` field of an RLP-encoded tx without hex conversion
+DEX_ROUTER_BYTES = frozenset(bytes.fromhex(address[2:]) for address in DEX_ROUTERS)
+
 # --------------------------------------------------------------------------------------
 # Swap Function Signatures (4-byte selector)
 # --------------------------------------------------------------------------------------
 
 SWAP_SIGNATURES = {
     # --------------------------
-    # Uniswap V3 SwapRouter funcs
+    # Uniswap V3 SwapRouter funcs (params structs include a deadline)
     # --------------------------
-    "0x414bf389": "exactInputSingle",      # exactInputSingle((address,address,uint24,address,uint256,uint256,uint160))
-    "0xc04b8d59": "exactInput",            # exactInput((bytes,address,uint256,uint256))
-    "0xdb3e2198": "exactOutputSingle",     # exactOutputSingle((address,address,uint24,address,uint256,uint256,uint160))
-    "0xf28c0498": "exactOutput",           # exactOutput((bytes,address,uint256,uint256))
+    "0x414bf389": "exactInputSingle",      # exactInputSingle((address,address,uint24,address,uint256,uint256,uint256,uint160))
+    "0xc04b8d59": "exactInput",            # exactInput((bytes,address,uint256,uint256,uint256))
+    "0xdb3e2198": "exactOutputSingle",     # exactOutputSingle((address,address,uint24,address,uint256,uint256,uint256,uint160))
+    "0xf28c0498": "exactOutput",           # exactOutput((bytes,address,uint256,uint256,uint256))
+
+    # --------------------------
+    # Uniswap V3 SwapRouter02 funcs (no deadline in the params structs)
+    # --------------------------
+    "0x04e45aaf": "exactInputSingle",      # exactInputSingle((address,address,uint24,address,uint256,uint256,uint160))
+    "0xb858183f": "exactInput",            # exactInput((bytes,address,uint256,uint256))
+    "0x5023b4df": "exactOutputSingle",     # exactOutputSingle((address,address,uint24,address,uint256,uint256,uint160))
+    "0x09b81346": "exactOutput",           # exactOutput((bytes,address,uint256,uint256))
+
+    # --------------------------
+    # Multicall wrappers (SwapRouter / SwapRouter02), the bundled calls are decoded
+    # --------------------------
+    "0xac9650d8": "multicall",             # multicall(bytes[])
+    "0x5ae401dc": "multicall",             # multicall(uint256,bytes[])
+    "0x1f0464d1": "multicall",             # multicall(bytes32,bytes[])
 
     # ------------------------------------------------
     # Uniswap V2-style swaps (used by Sushi, Camelot V2, etc.)
@@ -80,11 +98,23 @@ SWAP_SIGNATURES = {
     # swapExactTokensForETHSupportingFeeOnTransferTokens(uint256,uint256,address[],address,uint256)
     "0x791ac947": "swapExactTokensForETHSupportingFeeOnTransferTokens",
 
+    # --- Camelot V2 fee-on-transfer variants (with a referrer) ---
+    # swapExactTokensForTokensSupportingFeeOnTransferTokens(uint256,uint256,address[],address,address,uint256)
+    "0xac3893ba": "swapExactTokensForTokensSupportingFeeOnTransferTokens",
+    # swapExactETHForTokensSupportingFeeOnTransferTokens(uint256,address[],address,address,uint256)
+    "0xb4822be3": "swapExactETHForTokensSupportingFeeOnTransferTokens",
+    # swapExactTokensForETHSupportingFeeOnTransferTokens(uint256,uint256,address[],address,address,uint256)
+    "0x52aa4c22": "swapExactTokensForETHSupportingFeeOnTransferTokens",
+
+    # --- Uniswap SwapRouter02 V2 entry points (no deadline) ---
+    "0x472b43f3": "swapExactTokensForTokens",           # swapExactTokensForTokens(uint256,uint256,address[],address)
+    "0x42712a67": "swapTokensForExactTokens",           # swapTokensForExactTokens(uint256,uint256,address[],address)
+
     # ---------------
     # Universal Router
     # ---------------
-    "0x24856bc3": "execute",               # execute(bytes,bytes[],uint256)
-    "0x3593564c": "execute",               # execute(bytes,bytes[])
+    "0x24856bc3": "execute",               # execute(bytes,bytes[])
+    "0x3593564c": "execute",               # execute(bytes,bytes[],uint256)
 }
 
 # --------------------------------------------------------------------------------------
@@ -96,7 +126,7 @@ DEX_VERSIONS = {
     "0xe592427a0aece92de3edee1f18e0157c05861564": "Uniswap V3",
     "0x68b3465833fb72a70ecdf485e0e4c7bd8665fc45": "Uniswap V3",
     "0xa51afafe0263b40edaef0df8781ea9aa03e381a3": "Uniswap V4 Universal Router",  # routes v2/v3/v3
-    "0x101F443B4d1b059569D643917553c771E1b9663E": "Uniswap V3",
+    "0x101f443b4d1b059569d643917553c771e1b9663e": "Uniswap V3",
 
     # Uniswap V2
     "0x4752ba5dbc23f44d87826276bf6fd6b1c372ad24": "Uniswap V2",
@@ -0,0 +1,122 @@
+"""
+Feed Recorder Module for the Arbitrum Sequencer Feed
+
+Records raw feed frames with their receive timestamps to a compact file and
+reads them back, so the decode pipeline can be replayed and benchmarked
+without a live websocket.
+
+File format: an 8-byte magic, then one record per frame:
+    [8 bytes big-endian float64 receive time (unix seconds)] [4 bytes big-endian length] [frame bytes]
+"""
+
+import asyncio
+import struct
+import time
+from typing import Iterator, Optional, Tuple, Union
+
+FILE_MAGIC = b"ARBFEED1"
+RECORD_HEADER = struct.Struct(">dI")
+
+
+class FeedRecorder:
+    """Appends raw feed frames to a recording file."""
+
+    def __init__(self, path: str):
+        """
+        Open a recording file for appending, writing the magic if it is new.
+
+        Args:
+            path: Recording file path
+        """
+        self.path = path
+        self.frames = 0
+        self._file = open(path, "ab")
+        if self._file.tell() == 0:
+            self._file.write(FILE_MAGIC)
+
+    def write(self, raw: Union[str, bytes], received_at: Optional[float] = None):
+        """
+        Append a frame.
+
+        Args:
+            raw: Frame as received from the websocket
+            received_at: Receive time in unix seconds (now if None)
+        """
+        if isinstance(raw, str):
+            raw = raw.encode("utf-8")
+        if received_at is None:
+            received_at = time.time()
+        self._file.write(RECORD_HEADER.pack(received_at, len(raw)))
+        self._file.write(raw)
+        self.frames += 1
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def read_frames(path: str) -> Iterator[Tuple[float, str]]:
+    """
+    Read the frames of a recording file in order.
+
+    Args:
+        path: Recording file path
+
+    Yields:
+        (receive time in unix seconds, frame text)
+    """
+    with open(path, "rb") as f:
+        if f.read(len(FILE_MAGIC)) != FILE_MAGIC:
+            raise ValueError(f"{path} is not a feed recording")
+
+        while True:
+            header = f.read(RECORD_HEADER.size)
+            if not header:
+                return
+            if len(header) < RECORD_HEADER.size:
+                raise ValueError(f"Truncated record header in {path}")
+
+            received_at, length = RECORD_HEADER.unpack(header)
+            raw = f.read(length)
+            if len(raw) < length:
+                raise ValueError(f"Truncated record in {path}")
+            yield received_at, raw.decode("utf-8")
+
+
+async def replay_frames(path: str, frames: asyncio.Queue, realtime: bool = False, speed: float = 1.0) -> int:
+    """
+    Push the frames of a recording into a pipeline queue, like a live receive stage.
+
+    Args:
+        path: Recording file path
+        frames: Queue of (monotonic receive time, frame) items
+        realtime: Keep the recorded gaps between frames instead of replaying as fast as possible
+        speed: Pacing multiplier when realtime (2.0 replays twice as fast)
+
+    Returns:
+        int: Number of frames replayed
+    """
+    count = 0
+    first_recorded = None
+    started = time.monotonic()
+
+    for recorded_at, raw in read_frames(path):
+        if realtime:
+            if first_recorded is None:
+                first_recorded = recorded_at
+            delay = started + (recorded_at - first_recorded) / speed - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+        await frames.put((time.monotonic(), raw))
+        count += 1
+
+    return count
@@ -4,8 +4,7 @@ Swap Decoder Module for Arbitrum DEX Transactions
 Decodes swap transaction calldata to extract token pairs, amounts, and other details.
 """
 
-from eth_abi import decode as abi_decode
-from typing import Dict, Optional, List
+from typing import Callable, Dict, List, Optional, Tuple
 
 
 def extract_function_selector(calldata: str) -> str:
@@ -32,177 +31,445 @@ def extract_function_selector(calldata: str) -> str:
     return "0x" + calldata[:8]
 
 
-def decode_exact_input_single(calldata: str) -> Optional[Dict]:
+# --------------------------------------------------------------------------------------
+# Table-driven calldata decoding
+#
+# Every swap function is described by the fields of its ABI head (one 32-byte
+# word each). The decoders read the words straight from a memoryview of the
+# raw calldata with int.from_bytes, so no hex string or generic ABI decoder
+# is involved. Addresses are returned as lowercase 0x hex strings.
+# --------------------------------------------------------------------------------------
+
+# Field kinds
+UINT = 0            # uint<M>, read as a whole word
+ADDRESS = 1         # address, last 20 bytes of the word
+ADDRESS_ARRAY = 2   # address[], the word is the offset of the array
+BYTES = 3           # bytes, the word is the offset of the data
+SKIP = 4            # word not needed
+
+
+def _read_uint(data: memoryview, offset: int) -> int:
+    """Read a 32-byte big-endian word."""
+    if offset + 32 > len(data):
+        raise ValueError("Calldata word out of bounds")
+    return int.from_bytes(data[offset:offset + 32], "big")
+
+
+def _read_address(data: memoryview, offset: int) -> str:
+    """Read an address word as a lowercase 0x hex string."""
+    if offset + 32 > len(data):
+        raise ValueError("Calldata word out of bounds")
+    return "0x" + data[offset + 12:offset + 32].hex()
+
+
+def _read_address_array(data: memoryview, base: int, head_offset: int) -> List[str]:
+    """Read an address[] whose offset (relative to base) is stored at head_offset."""
+    offset = base + _read_uint(data, head_offset)
+    length = _read_uint(data, offset)
+    if offset + 32 + 32 * length > len(data):
+        raise ValueError("Calldata array out of bounds")
+    return [_read_address(data, offset + 32 + 32 * i) for i in range(length)]
+
+
+def _read_bytes_view(data: memoryview, base: int, head_offset: int) -> memoryview:
+    """Get a view of a bytes value whose offset (relative to base) is stored at head_offset."""
+    offset = base + _read_uint(data, head_offset)
+    length = _read_uint(data, offset)
+    if offset + 32 + length > len(data):
+        raise ValueError("Calldata bytes out of bounds")
+    return data[offset + 32:offset + 32 + length]
+
+
+def _read_bytes(data: memoryview, base: int, head_offset: int) -> bytes:
+    """Read a bytes value whose offset (relative to base) is stored at head_offset."""
+    return bytes(_read_bytes_view(data, base, head_offset))
+
+
+def _read_bytes_array(data: memoryview, base: int, head_offset: int) -> Tuple[int, int]:
     """
-    Decode exactInputSingle swap function.
-    
-    Function signature:
-    exactInputSingle((address tokenIn, address tokenOut, uint24 fee, 
-                      address recipient, uint256 amountIn, uint256 amountOutMinimum, 
-                      uint160 sqrtPriceLimitX96))
-    
+    Locate a bytes[] whose offset (relative to base) is stored at head_offset.
+
+    Returns:
+        (offset of the element offsets, which are relative to it; number of elements)
+    """
+    offset = base + _read_uint(data, head_offset)
+    count = _read_uint(data, offset)
+    if offset + 32 + 32 * count > len(data):
+        raise ValueError("Calldata array out of bounds")
+    return offset + 32, count
+
+
+def parse_v3_path(path: bytes) -> Tuple[List[str], List[int]]:
+    """
+    Split an encoded V3 path into its tokens and fees.
+
+    Path format: tokenA (20 bytes) + fee (3 bytes) + tokenB (20 bytes) + ...
+
     Args:
-        calldata: Transaction calldata (hex string)
-    
+        path: Encoded path
+
     Returns:
-        Dict with swap details or None if decoding fails
+        (token addresses, fee of each hop)
     """
-    try:
-        # Remove function selector (first 4 bytes = 8 hex chars)
-        if calldata.startswith("0x"):
-            calldata = calldata[2:]
-        
-        params_data = calldata[8:]  # Skip function selector
-        
-        # Decode the tuple parameter
-        # Types: address, address, uint24, address, uint256, uint256, uint160
-        decoded = abi_decode(
-            ['address', 'address', 'uint24', 'address', 'uint256', 'uint256', 'uint160'],
-            bytes.fromhex(params_data)
-        )
-        
-        return {
-            "function": "exactInputSingle",
-            "tokenIn": decoded[0],
-            "tokenOut": decoded[1],
-            "fee": decoded[2],
-            "recipient": decoded[3],
-            "amountIn": decoded[4],
-            "amountOutMinimum": decoded[5],
-            "sqrtPriceLimitX96": decoded[6]
-        }
-    except Exception as e:
-        return None
+    tokens = []
+    fees = []
+    offset = 0
+    while offset + 20 <= len(path):
+        tokens.append("0x" + path[offset:offset + 20].hex())
+        offset += 20
+        if offset + 23 > len(path):
+            break
+        fees.append(int.from_bytes(path[offset:offset + 3], "big"))
+        offset += 3
+    return tokens, fees
 
 
-def decode_exact_input(calldata: str) -> Optional[Dict]:
+def _make_decoder(function: str, fields: Tuple[Tuple[str, int], ...], in_tuple: bool) -> Callable[[memoryview], Dict]:
     """
-    Decode exactInput swap function (multi-hop).
-    
-    Function signature:
-    exactInput((bytes path, address recipient, uint256 amountIn, uint256 amountOutMinimum))
-    
+    Build the decoder of one function layout.
+
     Args:
-        calldata: Transaction calldata (hex string)
-    
+        function: Function name put in the result
+        fields: (result key, field kind) of each head word
+        in_tuple: The arguments are a single params struct with a dynamic member,
+                  so the first word is the offset of the struct
+
     Returns:
-        Dict with swap details or None if decoding fails
+        Function decoding the arguments (calldata after the selector) into a dict
     """
-    try:
-        if calldata.startswith("0x"):
-            calldata = calldata[2:]
-        
-        params_data = calldata[8:]
-        
-        # Decode the tuple parameter
-        decoded = abi_decode(
-            ['bytes', 'address', 'uint256', 'uint256'],
-            bytes.fromhex(params_data)
-        )
-        
-        path_bytes = decoded[0]
-        
-        # Parse the encoded path to extract token addresses
-        # Path format: tokenA (20 bytes) + fee (3 bytes) + tokenB (20 bytes) + ...
-        tokens = []
-        offset = 0
-        while offset < len(path_bytes):
-            if offset + 20 <= len(path_bytes):
-                token = "0x" + path_bytes[offset:offset+20].hex()
-                tokens.append(token)
-                offset += 20
-                # Skip fee (3 bytes) if not at the end
-                if offset + 3 <= len(path_bytes):
-                    offset += 3
+    plan = tuple((name, kind, 32 * index) for index, (name, kind) in enumerate(fields) if kind != SKIP)
+    head_size = 32 * len(fields)
+
+    def decode(args: memoryview) -> Dict:
+        base = _read_uint(args, 0) if in_tuple else 0
+        if base + head_size > len(args):
+            raise ValueError("Calldata too short")
+
+        result = {"function": function}
+        for name, kind, position in plan:
+            position += base
+            if kind == UINT:
+                result[name] = int.from_bytes(args[position:position + 32], "big")
+            elif kind == ADDRESS:
+                result[name] = "0x" + args[position + 12:position + 32].hex()
+            elif kind == ADDRESS_ARRAY:
+                result[name] = _read_address_array(args, base, position)
             else:
-                break
-        
-        return {
-            "function": "exactInput",
-            "tokens": tokens,
-            "tokenIn": tokens[0] if tokens else None,
-            "tokenOut": tokens[-1] if len(tokens) > 1 else None,
-            "recipient": decoded[1],
-            "amountIn": decoded[2],
-            "amountOutMinimum": decoded[3],
-            "path": path_bytes.hex()
-        }
-    except Exception as e:
-        return None
+                result[name] = _read_bytes(args, base, position)
+        return result
+
+    return decode
+
+
+def _v3_single(function: str, amount_fields: Tuple[str, str], deadline: bool):
+    fields = [("tokenIn", ADDRESS), ("tokenOut", ADDRESS), ("fee", UINT), ("recipient", ADDRESS)]
+    if deadline:
+        fields.append(("deadline", UINT))
+    fields += [(amount_fields[0], UINT), (amount_fields[1], UINT), ("sqrtPriceLimitX96", UINT)]
+    return _make_decoder(function, tuple(fields), in_tuple=False)
+
+
+def _with_v3_path(decode_args: Callable[[memoryview], Dict], exact_output: bool) -> Callable[[memoryview], Dict]:
+    """Wrap a decoder whose "path" is an encoded V3 path, adding its tokens and fees."""
+    def decode(args: memoryview) -> Dict:
+        result = decode_args(args)
+        tokens, fees = parse_v3_path(result["path"])
+        if exact_output:
+            # Exact-output paths are encoded from the output token backwards
+            tokens.reverse()
+            fees.reverse()
+        result["path"] = result["path"].hex()
+        result["tokens"] = tokens
+        result["fees"] = fees
+        if len(fees) == 1:
+            result["fee"] = fees[0]
+        result["tokenIn"] = tokens[0] if tokens else None
+        result["tokenOut"] = tokens[-1] if len(tokens) > 1 else None
+        return result
+
+    return decode
+
+
+def _with_v2_path(decode_args: Callable[[memoryview], Dict]) -> Callable[[memoryview], Dict]:
+    """Wrap a decoder whose "path" is an address[], adding tokenIn and tokenOut."""
+    def decode(args: memoryview) -> Dict:
+        result = decode_args(args)
+        path = result["path"]
+        result["tokenIn"] = path[0] if path else None
+        result["tokenOut"] = path[-1] if len(path) > 1 else None
+        return result
+
+    return decode
 
 
-def decode_swap_exact_tokens_for_tokens(calldata: str) -> Optional[Dict]:
+def _v3_path(function: str, amount_fields: Tuple[str, str], deadline: bool, exact_output: bool):
+    fields = [("path", BYTES), ("recipient", ADDRESS)]
+    if deadline:
+        fields.append(("deadline", UINT))
+    fields += [(amount_fields[0], UINT), (amount_fields[1], UINT)]
+    return _with_v3_path(_make_decoder(function, tuple(fields), in_tuple=True), exact_output)
+
+
+def _v2(function: str, amount_fields: Tuple[str, ...], referrer: bool = False, deadline: bool = True):
+    fields = [(name, UINT) for name in amount_fields] + [("path", ADDRESS_ARRAY), ("recipient", ADDRESS)]
+    if referrer:
+        fields.append(("referrer", ADDRESS))
+    if deadline:
+        fields.append(("deadline", UINT))
+    return _with_v2_path(_make_decoder(function, tuple(fields), in_tuple=False))
+
+
+EXACT_IN_V3 = ("amountIn", "amountOutMinimum")
+EXACT_OUT_V3 = ("amountOut", "amountInMaximum")
+EXACT_IN_V2 = ("amountIn", "amountOutMin")
+EXACT_OUT_V2 = ("amountOut", "amountInMax")
+EXACT_ETH_IN_V2 = ("amountOutMin",)      # amountIn is the tx value
+EXACT_OUT_ETH_IN_V2 = ("amountOut",)     # amountInMax is the tx value
+
+# 4-byte selector (int) -> decoder of the arguments after the selector
+SWAP_DECODERS: Dict[int, Callable[[memoryview], Dict]] = {
+    # Uniswap V3 SwapRouter
+    0x414bf389: _v3_single("exactInputSingle", EXACT_IN_V3, deadline=True),
+    0xc04b8d59: _v3_path("exactInput", EXACT_IN_V3, deadline=True, exact_output=False),
+    0xdb3e2198: _v3_single("exactOutputSingle", EXACT_OUT_V3, deadline=True),
+    0xf28c0498: _v3_path("exactOutput", EXACT_OUT_V3, deadline=True, exact_output=True),
+
+    # Uniswap V3 SwapRouter02
+    0x04e45aaf: _v3_single("exactInputSingle", EXACT_IN_V3, deadline=False),
+    0xb858183f: _v3_path("exactInput", EXACT_IN_V3, deadline=False, exact_output=False),
+    0x5023b4df: _v3_single("exactOutputSingle", EXACT_OUT_V3, deadline=False),
+    0x09b81346: _v3_path("exactOutput", EXACT_OUT_V3, deadline=False, exact_output=True),
+
+    # Uniswap V2-style routers
+    0x38ed1739: _v2("swapExactTokensForTokens", EXACT_IN_V2),
+    0x8803dbee: _v2("swapTokensForExactTokens", EXACT_OUT_V2),
+    0x7ff36ab5: _v2("swapExactETHForTokens", EXACT_ETH_IN_V2),
+    0x4a25d94a: _v2("swapTokensForExactETH", EXACT_OUT_V2),
+    0x18cbafe5: _v2("swapExactTokensForETH", EXACT_IN_V2),
+    0xfb3bdb41: _v2("swapETHForExactTokens", EXACT_OUT_ETH_IN_V2),
+
+    # Fee-on-transfer variants
+    0x5c11d795: _v2("swapExactTokensForTokensSupportingFeeOnTransferTokens", EXACT_IN_V2),
+    0xb6f9de95: _v2("swapExactETHForTokensSupportingFeeOnTransferTokens", EXACT_ETH_IN_V2),
+    0x791ac947: _v2("swapExactTokensForETHSupportingFeeOnTransferTokens", EXACT_IN_V2),
+
+    # Camelot fee-on-transfer variants with a referrer
+    0xac3893ba: _v2("swapExactTokensForTokensSupportingFeeOnTransferTokens", EXACT_IN_V2, referrer=True),
+    0xb4822be3: _v2("swapExactETHForTokensSupportingFeeOnTransferTokens", EXACT_ETH_IN_V2, referrer=True),
+    0x52aa4c22: _v2("swapExactTokensForETHSupportingFeeOnTransferTokens", EXACT_IN_V2, referrer=True),
+
+    # Uniswap SwapRouter02 V2 entry points (no deadline)
+    0x472b43f3: _v2("swapExactTokensForTokens", EXACT_IN_V2, deadline=False),
+    0x42712a67: _v2("swapTokensForExactTokens", EXACT_OUT_V2, deadline=False),
+}
+
+
+def decode_swap_call(calldata) -> Optional[Dict]:
     """
-    Decode swapExactTokensForTokens function (Uniswap V2 style).
-    
-    Function signature:
-    swapExactTokensForTokens(uint256 amountIn, uint256 amountOutMin, 
-                             address[] path, address to, uint256 deadline)
-    
+    Decode swap calldata from raw bytes, dispatching on the 4-byte selector.
+
     Args:
-        calldata: Transaction calldata (hex string)
-    
+        calldata: Raw calldata (bytes, bytearray or memoryview)
+
     Returns:
-        Dict with swap details or None if decoding fails
+        Dict with swap details or None if the selector is unknown or decoding fails
     """
+    data = memoryview(calldata)
+    if len(data) < 4:
+        return None
+
+    decoder = SWAP_DECODERS.get(int.from_bytes(data[:4], "big"))
+    if decoder is None:
+        return None
+
     try:
-        if calldata.startswith("0x"):
-            calldata = calldata[2:]
-        
-        params_data = calldata[8:]
-        
-        # Decode parameters
-        decoded = abi_decode(
-            ['uint256', 'uint256', 'address[]', 'address', 'uint256'],
-            bytes.fromhex(params_data)
-        )
-        
-        path = decoded[2]
-        
-        return {
-            "function": "swapExactTokensForTokens",
-            "amountIn": decoded[0],
-            "amountOutMin": decoded[1],
-            "path": path,
-            "tokenIn": path[0] if path else None,
-            "tokenOut": path[-1] if len(path) > 1 else None,
-            "recipient": decoded[3],
-            "deadline": decoded[4]
-        }
-    except Exception as e:
+        return decoder(data[4:])
+    except (ValueError, IndexError):
         return None
 
 
-def decode_swap_calldata(calldata: str, function_selector: str) -> Optional[Dict]:
+# --------------------------------------------------------------------------------------
+# Nested calls: Universal Router execute and multicall
+# --------------------------------------------------------------------------------------
+
+# Universal Router command types (the low 6 bits of a command byte; the top bit allows a revert)
+UR_COMMAND_TYPE_MASK = 0x3f
+UR_V3_SWAP_EXACT_IN = 0x00
+UR_V3_SWAP_EXACT_OUT = 0x01
+UR_V2_SWAP_EXACT_IN = 0x08
+UR_V2_SWAP_EXACT_OUT = 0x09
+UR_WRAP_ETH = 0x0b
+UR_UNWRAP_WETH = 0x0c
+
+# Amount meaning "the router's whole balance", used by the commands after the first of a route
+UR_CONTRACT_BALANCE = 1 << 255
+
+
+
+def _with_dex_version(decode_args: Callable[[memoryview], Dict], dex_version: str) -> Callable[[memoryview], Dict]:
+    """Wrap a decoder, tagging its swap with the protocol it trades on (the router itself routes several)."""
+    def decode(args: memoryview) -> Dict:
+        result = decode_args(args)
+        result["dexVersion"] = dex_version
+        return result
+
+    return decode
+
+
+# Command type -> decoder of its input. Commands not listed (permit2 permits and
+# transfers, sweep, pay portion, V4 and NFT commands) carry no swap data and
+# are skipped without reading their input.
+UR_COMMAND_DECODERS: Dict[int, Callable[[memoryview], Dict]] = {
+    UR_V3_SWAP_EXACT_IN: _with_dex_version(_with_v3_path(_make_decoder("V3_SWAP_EXACT_IN", (
+        ("recipient", ADDRESS), ("amountIn", UINT), ("amountOutMinimum", UINT), ("path", BYTES), ("payerIsUser", SKIP)
+    ), in_tuple=False), exact_output=False), "Uniswap V3"),
+    UR_V3_SWAP_EXACT_OUT: _with_dex_version(_with_v3_path(_make_decoder("V3_SWAP_EXACT_OUT", (
+        ("recipient", ADDRESS), ("amountOut", UINT), ("amountInMaximum", UINT), ("path", BYTES), ("payerIsUser", SKIP)
+    ), in_tuple=False), exact_output=True), "Uniswap V3"),
+    UR_V2_SWAP_EXACT_IN: _with_dex_version(_with_v2_path(_make_decoder("V2_SWAP_EXACT_IN", (
+        ("recipient", ADDRESS), ("amountIn", UINT), ("amountOutMin", UINT), ("path", ADDRESS_ARRAY), ("payerIsUser", SKIP)
+    ), in_tuple=False)), "Uniswap V2"),
+    UR_V2_SWAP_EXACT_OUT: _with_dex_version(_with_v2_path(_make_decoder("V2_SWAP_EXACT_OUT", (
+        ("recipient", ADDRESS), ("amountOut", UINT), ("amountInMax", UINT), ("path", ADDRESS_ARRAY), ("payerIsUser", SKIP)
+    ), in_tuple=False)), "Uniswap V2"),
+    UR_WRAP_ETH: _make_decoder("WRAP_ETH", (("recipient", ADDRESS), ("amount", UINT)), in_tuple=False),
+    UR_UNWRAP_WETH: _make_decoder("UNWRAP_WETH", (("recipient", ADDRESS), ("amountMin", UINT)), in_tuple=False),
+}
+
+# execute(bytes commands, bytes[] inputs) and execute(bytes commands, bytes[] inputs, uint256 deadline)
+UNIVERSAL_ROUTER_EXECUTE = frozenset((0x24856bc3, 0x3593564c))
+
+# multicall selector -> head word holding the bytes[] of calls
+MULTICALL_DATA_WORD = {
+    0xac9650d8: 0,  # multicall(bytes[])
+    0x5ae401dc: 1,  # multicall(uint256 deadline, bytes[])
+    0x1f0464d1: 1,  # multicall(bytes32 previousBlockhash, bytes[])
+}
+
+# Levels of multicall nesting followed
+MAX_NESTING_DEPTH = 2
+
+
+def decode_universal_router(args: memoryview) -> List[Dict]:
+    """
+    Decode the swaps of a Universal Router execute call.
+
+    The command string is walked byte by byte and only the inputs of swap
+    and wrap/unwrap commands are read. Each swap is tagged with the protocol
+    of its command as "dexVersion". A WRAP_ETH before the swaps is put on the
+    first swap as "wrapETH" (None when it wraps the router's whole balance),
+    an UNWRAP_WETH on the last one as "unwrapWETH".
+
+    Args:
+        args: Calldata after the execute selector
+
+    Returns:
+        Decoded swaps in command order
+    """
+    commands = _read_bytes_view(args, 0, 0)
+    inputs, count = _read_bytes_array(args, 0, 32)
+    if count != len(commands):
+        raise ValueError("Universal Router commands and inputs length mismatch")
+
+    swaps = []
+    wraps = False
+    wrapped = None
+    unwrapped = None
+    for index, command in enumerate(commands):
+        command_type = command & UR_COMMAND_TYPE_MASK
+        decoder = UR_COMMAND_DECODERS.get(command_type)
+        if decoder is None:
+            continue
+
+        result = decoder(_read_bytes_view(args, inputs, inputs + 32 * index))
+        if command_type == UR_WRAP_ETH:
+            wraps = True
+            wrapped = None if result["amount"] == UR_CONTRACT_BALANCE else result["amount"]
+        elif command_type == UR_UNWRAP_WETH:
+            unwrapped = result["amountMin"]
+        else:
+            if result.get("amountIn") == UR_CONTRACT_BALANCE:
+                # Output of the previous command, not known from the calldata
+                result["amountIn"] = None
+            swaps.append(result)
+
+    if swaps:
+        if wraps:
+            swaps[0]["wrapETH"] = wrapped
+        if unwrapped is not None:
+            swaps[-1]["unwrapWETH"] = unwrapped
+    return swaps
+
+
+def decode_multicall(args: memoryview, data_word: int, max_depth: int) -> List[Dict]:
+    """
+    Decode the swaps of the calls bundled in a multicall.
+
+    Args:
+        args: Calldata after the multicall selector
+        data_word: Head word holding the bytes[] of calls
+        max_depth: Levels of further multicall nesting to follow
+
+    Returns:
+        Decoded swaps in call order
+    """
+    calls, count = _read_bytes_array(args, 0, 32 * data_word)
+    swaps = []
+    for index in range(count):
+        swaps.extend(decode_swap_calls(_read_bytes_view(args, calls, calls + 32 * index), max_depth))
+    return swaps
+
+
+def decode_swap_calls(calldata, max_depth: int = MAX_NESTING_DEPTH) -> List[Dict]:
+    """
+    Decode every swap of a call: a direct router swap, the swaps of a
+    Universal Router execute, or the swaps bundled in a multicall.
+
+    Args:
+        calldata: Raw calldata (bytes, bytearray or memoryview) or a hex string
+        max_depth: Levels of multicall nesting to follow
+
+    Returns:
+        Decoded swaps (empty if none or if decoding fails)
+    """
+    if isinstance(calldata, str):
+        try:
+            calldata = bytes.fromhex(calldata[2:] if calldata.startswith("0x") else calldata)
+        except ValueError:
+            return []
+
+    data = memoryview(calldata)
+    if len(data) < 4:
+        return []
+
+    selector = int.from_bytes(data[:4], "big")
+    try:
+        decoder = SWAP_DECODERS.get(selector)
+        if decoder is not None:
+            return [decoder(data[4:])]
+        if selector in UNIVERSAL_ROUTER_EXECUTE:
+            return decode_universal_router(data[4:])
+        data_word = MULTICALL_DATA_WORD.get(selector)
+        if data_word is not None and max_depth > 0:
+            return decode_multicall(data[4:], data_word, max_depth - 1)
+    except (ValueError, IndexError):
+        return []
+    return []
+
+
+def decode_swap_calldata(calldata, function_selector: str = None) -> Optional[Dict]:
     """
     Main function to decode swap calldata based on function selector.
     
     Args:
-        calldata: Transaction calldata (hex string)
-        function_selector: 4-byte function selector
+        calldata: Transaction calldata, raw bytes or a hex string
+        function_selector: 4-byte function selector (unused, the selector is read from the calldata)
     
     Returns:
-        Dict with decoded swap details or None if decoding fails
+        Dict with the first decoded swap (see decode_swap_calls for all of them) or None if decoding fails
     """
-    # Normalize function selector
-    if not function_selector.startswith("0x"):
-        function_selector = "0x" + function_selector
-    
-    function_selector = function_selector.lower()
-    
-    # Route to appropriate decoder
-    if function_selector == "0x414bf389":  # exactInputSingle
-        return decode_exact_input_single(calldata)
-    
-    elif function_selector == "0xc04b8d59":  # exactInput
-        return decode_exact_input(calldata)
-    
-    elif function_selector == "0x38ed1739":  # swapExactTokensForTokens
-        return decode_swap_exact_tokens_for_tokens(calldata)
-    
-    # Add more decoders as needed for other function types
-    
-    return None
+    swaps = decode_swap_calls(calldata)
+    return swaps[0] if swaps else None
 
 
 def format_swap_info(swap_data: Dict, dex_name: str, tx_hash: str = None, to_address: str = None) -> Dict:
@@ -213,7 +480,7 @@ def format_swap_info(swap_data: Dict, dex_name: str, tx_hash: str = None, to_add
         swap_data: Decoded swap data from decode_swap_calldata
         dex_name: Name of the DEX (e.g., "Uniswap V3")
         tx_hash: Transaction hash (optional)
-        to_address: Router address for DEX version lookup (optional)
+        to_address: Router address for DEX version lookup, if the swap is not tagged with one (optional)
     
     Returns:
         Dict with formatted swap information
@@ -233,8 +500,10 @@ def format_swap_info(swap_data: Dict, dex_name: str, tx_hash: str = None, to_add
         "amountIn": swap_data.get("amountIn"),
     }
     
-    # Add DEX version
-    if to_address:
+    # Add DEX version, preferring the protocol tagged on the swap by its decoder (Universal Router legs)
+    if swap_data.get("dexVersion"):
+        result["dexVersion"] = swap_data["dexVersion"]
+    elif to_address:
         result["dexVersion"] = dex_config.get_dex_version(to_address)
     else:
         result["dexVersion"] = "Unknown"
@@ -249,7 +518,20 @@ def format_swap_info(swap_data: Dict, dex_name: str, tx_hash: str = None, to_add
         result["amountOutMin"] = swap_data["amountOutMinimum"]
     elif "amountOutMin" in swap_data:
         result["amountOutMin"] = swap_data["amountOutMin"]
-    
+
+    # Add exact-output amounts
+    if "amountOut" in swap_data:
+        result["amountOut"] = swap_data["amountOut"]
+    if "amountInMaximum" in swap_data:
+        result["amountInMax"] = swap_data["amountInMaximum"]
+    elif "amountInMax" in swap_data:
+        result["amountInMax"] = swap_data["amountInMax"]
+
+    # Add the ETH wrapped into the first or unwrapped from the last swap of a Universal Router call
+    for key in ("wrapETH", "unwrapWETH"):
+        if key in swap_data:
+            result[key] = swap_data[key]
+
     # Add transaction hash if available
     if tx_hash:
         result["txHash"] = tx_hash
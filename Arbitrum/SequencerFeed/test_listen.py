@@ -16,11 +16,15 @@ from eth_account._utils.signing import hash_of_signed_transaction
 import rlp
 from eth_utils import to_hex
 import csv
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
 # Import DEX swap detection modules
 import dex_config
 import swap_decoder
+from feed_recorder import FeedRecorder, replay_frames
 
 FEED_URL = "wss://sepolia-rollup.arbitrum.io/feed"
 
@@ -33,6 +37,9 @@ SWAPS_ONLY = True
 # CSV output file for swap data
 CSV_OUTPUT_FILE = "dex_swaps.csv"
 
+# Set to a file path to record the raw feed frames for replay (see feed_recorder.py)
+RECORD_FILE = None
+
 # Nitro message kinds
 L2MessageKind_UnsignedUserTx = 0
 L2MessageKind_ContractTx = 1
@@ -64,10 +71,80 @@ def read_bytestring(data, offset):
     offset += length
     return segment, offset
 
+def read_rlp_header(data, offset):
+    """
+    Read the header of an RLP item without decoding its payload.
+
+    Returns:
+        (payload offset, payload length, is_list)
+    """
+    if offset >= len(data):
+        raise ValueError("RLP header out of bounds")
+
+    prefix = data[offset]
+    if prefix < 0x80:
+        # Single byte, it is its own payload
+        return offset, 1, False
+    if prefix < 0xb8:
+        return offset + 1, prefix - 0x80, False
+    if prefix < 0xc0:
+        size = prefix - 0xb7
+        length = int.from_bytes(data[offset + 1:offset + 1 + size], "big")
+        return offset + 1 + size, length, False
+    if prefix < 0xf8:
+        return offset + 1, prefix - 0xc0, True
+    size = prefix - 0xf7
+    length = int.from_bytes(data[offset + 1:offset + 1 + size], "big")
+    return offset + 1 + size, length, True
+
+# Number of RLP fields before `to` in each signed tx type
+TO_FIELD_INDEX = {
+    None: 3,  # Legacy: [nonce, gasPrice, gas, to, ...]
+    1: 4,     # EIP-2930: [chainId, nonce, gasPrice, gas, to, ...]
+    2: 5,     # EIP-1559: [chainId, nonce, maxPriorityFeePerGas, maxFeePerGas, gas, to, ...]
+}
+
+def peek_tx_to(data, offset=0):
+    """
+    Read the `to` field of a signed tx by walking the RLP headers, without
+    decoding, hashing or copying the rest of the tx.
+
+    Args:
+        data: Buffer holding the signed tx
+        offset: Offset of the tx in the buffer (its type byte, or the list header for legacy txs)
+
+    Returns:
+        bytes: 20-byte `to` address, or b"" for contract creations and tx types without a `to` we decode
+    """
+    if offset >= len(data):
+        raise ValueError("Empty transaction bytes")
+
+    tx_type = None
+    if data[offset] <= 0x7f:
+        tx_type = data[offset]
+        offset += 1
+    field_index = TO_FIELD_INDEX.get(tx_type)
+    if field_index is None:
+        return b""
+
+    offset, length, is_list = read_rlp_header(data, offset)
+    if not is_list or offset + length > len(data):
+        raise ValueError("Transaction is not an RLP list")
+
+    for _ in range(field_index):
+        item_offset, item_length, _ = read_rlp_header(data, offset)
+        offset = item_offset + item_length
+
+    offset, length, is_list = read_rlp_header(data, offset)
+    if is_list or length not in (0, 20) or offset + length > len(data):
+        raise ValueError(f"Invalid `to` field of length {length}")
+    return bytes(data[offset:offset + length])
+
 # Global counters for statistics
 total_transactions = 0
 swap_transactions = 0
 decode_errors = 0
+skipped_transactions = 0
 
 def write_swap_to_csv(swap_info: dict, timestamp: str = None):
     """
@@ -109,51 +186,85 @@ def write_swap_to_csv(swap_info: dict, timestamp: str = None):
             print(f"Error writing to CSV: {e}")
 
 
-def analyze_transaction_for_swap(tx_data: dict, tx_hash: str = None) -> dict:
+# V2 ETH-in swaps carry no input amount in their calldata, the tx value is the input
+ETH_IN_AMOUNT_FIELDS = {
+    "swapExactETHForTokens": "amountIn",
+    "swapExactETHForTokensSupportingFeeOnTransferTokens": "amountIn",
+    "swapETHForExactTokens": "amountInMax",
+}
+
+
+def parse_tx_value(value) -> int:
+    """
+    Parse the value of a decoded transaction.
+
+    Args:
+        value: Value as a hex string (RLP-decoded) or an int
+
+    Returns:
+        int: Value in wei (0 if empty)
+    """
+    if isinstance(value, int):
+        return value
+    if not value or value == "0x":
+        return 0
+    return int(value, 16)
+
+
+def analyze_transaction_for_swap(tx_data: dict, tx_hash: str = None, raw_calldata: bytes = None) -> list:
     """
-    Analyze a decoded transaction to check if it's a DEX swap.
+    Analyze a decoded transaction to check if it's a DEX swap, including the
+    swaps nested in Universal Router execute and multicall calls.
     
     Args:
         tx_data: Decoded transaction data containing 'to' and 'data' fields
         tx_hash: Transaction hash string (optional)
+        raw_calldata: Calldata bytes as RLP-decoded (optional), decoded directly instead of tx_data['data']
     
     Returns:
-        dict: Swap information if it's a swap, None otherwise
+        list: Swap information of each swap in the transaction (empty if it is not a swap)
     """
     global swap_transactions
     
     # Check if transaction has required fields
     if not tx_data or 'to' not in tx_data or 'data' not in tx_data:
-        return None
+        return []
     
     to_address = tx_data['to']
     calldata = tx_data['data']
 
     # Check if the 'to' address is a known DEX router
     if not dex_config.is_dex_router(to_address):
-        return None
+        return []
     
     # Get DEX name
     dex_name = dex_config.get_dex_name(to_address)
     
     # Extract function selector from calldata
-    function_selector = swap_decoder.extract_function_selector(calldata)
+    if raw_calldata is not None:
+        function_selector = "0x" + raw_calldata[:4].hex()
+    else:
+        function_selector = swap_decoder.extract_function_selector(calldata)
     
     # Check if it's a known swap function
     if not dex_config.is_swap_function(function_selector):
         if DEBUG:
             print(f"  Unknown function on DEX router: {function_selector}")
-        return None
+        return []
     
     # Decode the swap calldata
-    swap_data = swap_decoder.decode_swap_calldata(calldata, function_selector)
+    swaps = swap_decoder.decode_swap_calls(raw_calldata if raw_calldata is not None else calldata)
+
+    # Take the input of ETH-in swaps from the tx value
+    for swap_data in swaps:
+        amount_field = ETH_IN_AMOUNT_FIELDS.get(swap_data.get("function"))
+        if amount_field is not None and swap_data.get(amount_field) is None:
+            swap_data[amount_field] = parse_tx_value(tx_data.get("value"))
     
-    if swap_data:
+    if swaps:
         swap_transactions += 1
-        # Format the swap info
-        return swap_decoder.format_swap_info(swap_data, dex_name, tx_hash, to_address)
-    
-    return None
+    # Format the swap info
+    return [swap_decoder.format_swap_info(swap_data, dex_name, tx_hash, to_address) for swap_data in swaps]
 
 def decode_L2Message(data):
     # Validate data length
@@ -177,7 +288,20 @@ def decode_L2Message(data):
         
         if not SWAPS_ONLY:
             print("  -> Type: Signed Transaction")
-        
+
+        # Fast path: most txs are not sent to a DEX router, drop them before
+        # hashing or decoding. Malformed txs go through the full decode so
+        # the error is reported as before.
+        if SWAPS_ONLY:
+            try:
+                to_address = peek_tx_to(data, offset)
+            except (ValueError, IndexError):
+                to_address = None
+            if to_address is not None and to_address not in dex_config.DEX_ROUTER_BYTES:
+                global skipped_transactions
+                skipped_transactions += 1
+                return decoded_items
+
         tx_bytes = data[offset:] # The rest of the data is the RLP encoded tx
         
         # Calculate Transaction Hash
@@ -231,7 +355,9 @@ def decode_L2Message(data):
                     tx_data["raw_rlp"] = [to_hex(x) if isinstance(x, bytes) else x for x in decoded_rlp]
 
                 # Check if this is a DEX swap transaction
-                swap_info = analyze_transaction_for_swap(tx_data, tx_hash)
+                data_index = {2: 7, 1: 6}.get(tx_type)
+                raw_calldata = decoded_rlp[data_index] if data_index is not None and len(decoded_rlp) > data_index else None
+                swaps = analyze_transaction_for_swap(tx_data, tx_hash, raw_calldata)
                 
                 tx_item = {
                     "kind": "SignedTx", 
@@ -241,13 +367,13 @@ def decode_L2Message(data):
                 }
                 
                 # Add swap info if detected
-                if swap_info:
-                    tx_item["swap"] = swap_info
+                if swaps:
+                    tx_item["swaps"] = swaps
                     if not SWAPS_ONLY:
-                        print(f" DEX SWAP DETECTED: {swap_info['dex']}")
+                        print(f" DEX SWAP DETECTED: {swaps[0]['dex']}")
                 
                 # Only add to results if not filtering or if it's a swap
-                if not SWAPS_ONLY or swap_info:
+                if not SWAPS_ONLY or swaps:
                     decoded_items.append(tx_item)
                     
             else:
@@ -265,7 +391,7 @@ def decode_L2Message(data):
                             tx_json[name] = val
                 
                 # Check if this is a DEX swap transaction
-                swap_info = analyze_transaction_for_swap(tx_json, tx_hash)
+                swaps = analyze_transaction_for_swap(tx_json, tx_hash, decoded_rlp[5] if len(decoded_rlp) > 5 else None)
                 
                 tx_item = {
                     "kind": "SignedTx", 
@@ -275,13 +401,13 @@ def decode_L2Message(data):
                 }
                 
                 # Add swap info if detected
-                if swap_info:
-                    tx_item["swap"] = swap_info
+                if swaps:
+                    tx_item["swaps"] = swaps
                     if not SWAPS_ONLY:
-                        print(f"DEX SWAP DETECTED: {swap_info['dex']}")
+                        print(f"DEX SWAP DETECTED: {swaps[0]['dex']}")
                 
                 # Only add to results if not filtering or if it's a swap
-                if not SWAPS_ONLY or swap_info:
+                if not SWAPS_ONLY or swaps:
                     decoded_items.append(tx_item)
             
         except Exception as e:
@@ -364,65 +490,278 @@ def decode_L2Message(data):
 
 
 
+# Feed pipeline settings
+FRAME_QUEUE_SIZE = 4096                                 # Raw frames buffered between the receive and decode stages
+DECODE_WORKERS = max(1, (os.cpu_count() or 2) - 1)      # Decoder processes
+MAX_FRAMES_IN_FLIGHT = 2 * DECODE_WORKERS               # Frames submitted to the decoders at once
+STATS_INTERVAL = 10.0                                   # Seconds between throughput reports
+
+
+class FeedStats:
+    """Throughput, backlog and latency counters of the feed pipeline."""
+
+    def __init__(self):
+        self.frames = 0
+        self.messages = 0
+        self.max_queue_depth = 0
+        self.total_latency = 0.0
+        self.duplicates = 0
+        self.gaps = 0
+        self._last_time = time.monotonic()
+        self._last_frames = 0
+        self._last_messages = 0
+
+    def report(self, queue_depth: int, in_flight: int):
+        """Print the rates since the last report and the current backlog."""
+        now = time.monotonic()
+        elapsed = max(now - self._last_time, 1e-9)
+        frame_rate = (self.frames - self._last_frames) / elapsed
+        message_rate = (self.messages - self._last_messages) / elapsed
+        average_latency = self.total_latency / self.frames * 1000 if self.frames else 0.0
+
+        print(
+            f"\nStats: {frame_rate:.1f} frames/s | {message_rate:.1f} msgs/s | "
+            f"queue {queue_depth} (max {self.max_queue_depth}) | in flight {in_flight} | "
+            f"latency {average_latency:.1f} ms | gaps {self.gaps} | duplicates {self.duplicates}"
+        )
+        print(f"       {total_transactions} txs | {skipped_transactions} skipped | {swap_transactions} swaps | {decode_errors} errors")
+
+        self._last_time = now
+        self._last_frames = self.frames
+        self._last_messages = self.messages
+
+
+def decode_frame(raw):
+    """
+    Decode every message of a feed frame. Runs in a decoder process.
+
+    Args:
+        raw: Feed frame as received from the websocket (JSON text)
+
+    Returns:
+        tuple: ([(sequenceNumber, decoded items), ...] in frame order,
+                changes of the (transactions, skipped, swaps, errors) counters of this process)
+    """
+    global decode_errors
+    before = (total_transactions, skipped_transactions, swap_transactions, decode_errors)
+
+    results = []
+    msg = json.loads(raw)
+    for message in msg.get("messages") or []:
+        try:
+            l2msg = message["message"]["message"]["l2Msg"]
+            decoded = decode_L2Message(base64.b64decode(l2msg))
+        except Exception as e:
+            decode_errors += 1
+            decoded = []
+            if DEBUG:
+                print("Decode error:", e)
+        results.append((message.get("sequenceNumber"), decoded))
+
+    after = (total_transactions, skipped_transactions, swap_transactions, decode_errors)
+    return results, tuple(a - b for a, b in zip(after, before))
+
+
+def print_decoded(decoded):
+    """Write the swaps of a decoded message to the CSV file and print them."""
+    for tx in decoded:
+        if "swaps" in tx:
+            for swap in tx["swaps"]:
+                # Write to CSV
+                write_swap_to_csv(swap)
+
+                # Print to console
+                print("\n" + "=" * 60)
+                print(f"DEX SWAP DETECTED!")
+                print(f"  DEX:       {swap['dex']}")
+                print(f"  Version:   {swap.get('dexVersion', 'Unknown')}")
+                print(f"  Function:  {swap['function']}")
+                print(f"  Tx Hash:   {swap.get('txHash', 'N/A')}")
+                print(f"  Pool:      {swap.get('poolAddress', 'Unknown')}")
+                print(f"  Fee Tier:  {swap.get('feeTier', 'N/A')}")
+                print(f"  Token In:  {swap.get('tokenIn', 'N/A')}")
+                print(f"  Token Out: {swap.get('tokenOut', 'N/A')}")
+                print(f"  Amount In: {swap.get('amountIn', 'N/A')}")
+                print(f"  Min Out:   {swap.get('amountOutMin', 'N/A')}")
+                if 'path' in swap and isinstance(swap['path'], list) and len(swap['path']) > 2:
+                    print(f"  Path:      {' -> '.join(swap['path'])}")
+                print("=" * 60)
+        elif not SWAPS_ONLY:
+            print(f"\n[Transaction {total_transactions}]")
+            print(tx)
+
+
+async def receive_frames(ws, frames, stats, recorder=None):
+    """
+    Stage 1: receive raw frames and queue them with their arrival time.
+
+    Nothing is parsed here, so the event loop is always free to read the socket.
+    The frames are also appended to the recorder if one is given.
+    """
+    while True:
+        raw = await ws.recv()
+        if recorder is not None:
+            recorder.write(raw)
+        await frames.put((time.monotonic(), raw))
+
+
+async def dispatch_frames(frames, pending, executor, stats):
+    """
+    Stage 2: submit queued frames to the decoder processes.
+
+    The futures are queued in arrival order, and the bounded pending queue
+    limits how many frames are decoded at once. A None frame (end of a
+    replay) is passed on and stops the stage.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        stats.max_queue_depth = max(stats.max_queue_depth, frames.qsize())
+        item = await frames.get()
+        if item is None:
+            await pending.put(None)
+            return
+        received_at, raw = item
+        future = loop.run_in_executor(executor, decode_frame, raw)
+        await pending.put((received_at, future))
+
+
+async def emit_results(pending, stats):
+    """
+    Stage 3: wait for the decoded frames in arrival order and handle their
+    messages in sequenceNumber order, skipping messages already seen
+    (e.g. replayed after a reconnect) and reporting gaps.
+    """
+    global total_transactions, skipped_transactions, swap_transactions, decode_errors
+
+    next_sequence = None
+    while True:
+        item = await pending.get()
+        if item is None:
+            return
+        received_at, future = item
+        try:
+            messages, counters = await future
+        except Exception as e:
+            decode_errors += 1
+            if DEBUG:
+                print("Decode error:", e)
+            continue
+
+        total_transactions += counters[0]
+        skipped_transactions += counters[1]
+        swap_transactions += counters[2]
+        decode_errors += counters[3]
+
+        for sequence_number, decoded in messages:
+            if sequence_number is not None:
+                if next_sequence is not None:
+                    if sequence_number < next_sequence:
+                        stats.duplicates += 1
+                        continue
+                    if sequence_number > next_sequence:
+                        stats.gaps += 1
+                        if DEBUG:
+                            print(f"Sequence gap: expected {next_sequence}, got {sequence_number}")
+                next_sequence = sequence_number + 1
+
+            stats.messages += 1
+            if decoded:
+                print_decoded(decoded)
+
+        stats.frames += 1
+        stats.total_latency += time.monotonic() - received_at
+
+
+async def report_stats(frames, pending, stats):
+    """Print throughput and queue depth every STATS_INTERVAL seconds."""
+    while True:
+        await asyncio.sleep(STATS_INTERVAL)
+        stats.report(frames.qsize(), pending.qsize())
+
+
 async def listen():
     print(f"Connecting to {FEED_URL}...")
-    
-    async with websockets.connect(FEED_URL) as ws:
-        print("Connected. Listening for transactions...\n")
-
-        message_count = 0
-        while True:
-            raw = await ws.recv()
-            msg = json.loads(raw)
 
-            if "messages" not in msg:
-                continue
+    stats = FeedStats()
+    frames = asyncio.Queue(maxsize=FRAME_QUEUE_SIZE)
+    pending = asyncio.Queue(maxsize=MAX_FRAMES_IN_FLIGHT)
+    recorder = FeedRecorder(RECORD_FILE) if RECORD_FILE else None
 
-            inner = msg["messages"][0]["message"]["message"]
-            l2msg = inner["l2Msg"]
-            data = base64.b64decode(l2msg)
+    with ProcessPoolExecutor(max_workers=DECODE_WORKERS) as executor:
+        async with websockets.connect(FEED_URL) as ws:
+            print(f"Connected. Listening for transactions with {DECODE_WORKERS} decode workers...\n")
+            if recorder is not None:
+                print(f"Recording frames to {RECORD_FILE}")
 
+            tasks = [
+                asyncio.create_task(receive_frames(ws, frames, stats, recorder)),
+                asyncio.create_task(dispatch_frames(frames, pending, executor, stats)),
+                asyncio.create_task(emit_results(pending, stats)),
+                asyncio.create_task(report_stats(frames, pending, stats)),
+            ]
             try:
-                decoded = decode_L2Message(data)
-                if not decoded:
-                    continue
-                
-                message_count += 1
-                
-                # Display swap transactions with formatted output
-                for tx in decoded:
-                    if "swap" in tx:
-                        swap = tx["swap"]
-                        
-                        # Write to CSV
-                        write_swap_to_csv(swap)
-                        
-                        # Print to console
-                        print("\n" + "=" * 60)
-                        print(f"DEX SWAP DETECTED!")
-                        print(f"  DEX:       {swap['dex']}")
-                        print(f"  Version:   {swap.get('dexVersion', 'Unknown')}")
-                        print(f"  Function:  {swap['function']}")
-                        print(f"  Tx Hash:   {swap.get('txHash', 'N/A')}")
-                        print(f"  Pool:      {swap.get('poolAddress', 'Unknown')}")
-                        print(f"  Fee Tier:  {swap.get('feeTier', 'N/A')}")
-                        print(f"  Token In:  {swap.get('tokenIn', 'N/A')}")
-                        print(f"  Token Out: {swap.get('tokenOut', 'N/A')}")
-                        print(f"  Amount In: {swap.get('amountIn', 'N/A')}")
-                        print(f"  Min Out:   {swap.get('amountOutMin', 'N/A')}")
-                        if 'path' in swap and isinstance(swap['path'], list) and len(swap['path']) > 2:
-                            print(f"  Path:      {' -> '.join(swap['path'])}")
-                        print("=" * 60)
-                    elif not SWAPS_ONLY:
-                        print(f"\n[Transaction {total_transactions}]")
-                        print(tx)
-                
-                # Periodic statistics (every 50 messages)
-                if message_count % 50 == 0:
-                    print(f"\nStats: {total_transactions} txs | {swap_transactions} swaps | {decode_errors} errors")
+                await asyncio.gather(*tasks)
+            finally:
+                for task in tasks:
+                    task.cancel()
+                if recorder is not None:
+                    recorder.close()
+
+
+async def replay(path, realtime=False, speed=1.0):
+    """
+    Run a recorded feed through the decode pipeline and print its throughput.
+
+    Args:
+        path: Recording file written with RECORD_FILE set
+        realtime: Keep the recorded pacing instead of replaying as fast as possible
+        speed: Pacing multiplier when realtime
+    """
+    print(f"Replaying {path} {'at recorded pace' if realtime else 'at full speed'} with {DECODE_WORKERS} decode workers...\n")
+
+    stats = FeedStats()
+    frames = asyncio.Queue(maxsize=FRAME_QUEUE_SIZE)
+    pending = asyncio.Queue(maxsize=MAX_FRAMES_IN_FLIGHT)
+    started = time.monotonic()
+
+    with ProcessPoolExecutor(max_workers=DECODE_WORKERS) as executor:
+        stages = [
+            asyncio.create_task(dispatch_frames(frames, pending, executor, stats)),
+            asyncio.create_task(emit_results(pending, stats)),
+        ]
+        reporter = asyncio.create_task(report_stats(frames, pending, stats))
+        try:
+            await replay_frames(path, frames, realtime, speed)
+            await frames.put(None)
+            await asyncio.gather(*stages)
+        finally:
+            reporter.cancel()
+            for task in stages:
+                task.cancel()
+
+    elapsed = max(time.monotonic() - started, 1e-9)
+    average_latency = stats.total_latency / stats.frames * 1000 if stats.frames else 0.0
+    print(
+        f"\nReplayed {stats.frames} frames / {stats.messages} msgs in {elapsed:.2f} s: "
+        f"{stats.frames / elapsed:.1f} frames/s | {stats.messages / elapsed:.1f} msgs/s | "
+        f"latency {average_latency:.1f} ms | max queue {stats.max_queue_depth}"
+    )
+    print(f"{total_transactions} txs | {skipped_transactions} skipped | {swap_transactions} swaps | {decode_errors} errors")
+
+
+if __name__ == "__main__":
+    import argparse
 
-            except Exception as e:
-                if DEBUG:
-                    print("Decode error:", e)
+    parser = argparse.ArgumentParser(description="Listen to the Arbitrum sequencer feed and detect DEX swaps")
+    parser.add_argument("--record", metavar="FILE", help="Record the raw feed frames to FILE")
+    parser.add_argument("--replay", metavar="FILE", help="Replay a recording instead of connecting to the feed")
+    parser.add_argument("--realtime", action="store_true", help="Replay at the recorded pace instead of full speed")
+    parser.add_argument("--speed", type=float, default=1.0, help="Pacing multiplier for --realtime")
+    args = parser.parse_args()
 
-asyncio.run(listen())
+    if args.replay:
+        asyncio.run(replay(args.replay, args.realtime, args.speed))
+    else:
+        if args.record:
+            RECORD_FILE = args.record
+        asyncio.run(listen())
@@ -1,7 +1,8 @@
 import asyncio
-from typing import List, Optional, Dict, Literal, Any
+from typing import List, Optional, Dict, Literal, Any, Union
 from domain.interfaces.blockchain_provider import IBlockchainProvider
 from usecases.arbitrage_detector import ArbitrageDetector
+from usecases.pool_event_applier import PoolEventApplier
 from domain.entities.models import PoolEvent
 from config import TOP_PAIRS_COUNT
 
@@ -13,8 +14,15 @@ class ArbitrageService:
         self.blockchain_provider = blockchain_provider
         self.blockchain = blockchain
 
-        # Queue for pool updates
-        self._pool_event_queue = asyncio.Queue()
+        # Queue of pool events and end-of-block markers (block numbers)
+        self._pool_event_queue: asyncio.Queue[Union[PoolEvent, int]] = asyncio.Queue()
+        self._pool_event_task: Optional[asyncio.Task] = None
+
+        # Applies queued pool events to the simulators and marks the changed pools dirty in the detector
+        self.pool_event_applier = PoolEventApplier(
+            arbitrage_detector.pool_simulator_manager,
+            on_pools_updated=arbitrage_detector.update_pool_prices
+        )
 
         # Flag to indicate if the graph is built
         self.graph_built = False
@@ -29,4 +37,53 @@ class ArbitrageService:
 
         # Mark the graph as built
         self.graph_built = True
-        logger.info("Price graph built")
\ No newline at end of file
+        logger.info("Price graph built")
+
+        # Start applying pool events
+        self._pool_event_task = asyncio.create_task(self.process_pool_events())
+
+    def publish_pool_event(self, event: PoolEvent) -> None:
+        """
+        Queue a decoded pool event for the simulators.
+
+        Args:
+            event: Decoded pool event
+        """
+        self._pool_event_queue.put_nowait(event)
+
+    def publish_block_end(self, block_number: int) -> None:
+        """
+        Signal that every event of a block has been published, so the block can be applied.
+
+        Args:
+            block_number: Block whose events are complete
+        """
+        self._pool_event_queue.put_nowait(block_number)
+
+    async def process_pool_events(self) -> None:
+        """
+        Apply queued pool events until cancelled.
+
+        A block is applied once an event of a later block arrives or its end
+        is signalled with publish_block_end(), never while it may still be
+        missing events.
+        """
+        while True:
+            item = await self._pool_event_queue.get()
+            try:
+                if isinstance(item, int):
+                    self.pool_event_applier.flush(before_block=item + 1)
+                else:
+                    self.pool_event_applier.submit(item)
+
+                # Reorg deeper than the undo journal: reload every pool
+                if self.pool_event_applier.needs_resync:
+                    await self.arbitrage_detector.build_graph(limit=TOP_PAIRS_COUNT, thread_count=12)
+                    self.pool_event_applier.reset()
+            except Exception as e:
+                if isinstance(item, int):
+                    logger.exception(f"Error applying block {item}")
+                else:
+                    logger.exception(f"Error applying pool event {item.get_event_id()}")
+            finally:
+                self._pool_event_queue.task_done()
@@ -38,6 +38,7 @@ REDIS_LOGGING_ENABLED: Final[bool] = os.getenv("REDIS_LOGGING_ENABLED", "False")
 
 # Components Configuration
 TOP_PAIRS_COUNT = 100
+CYCLE_INDEX_DIR: Final[str] = os.getenv("CYCLE_INDEX_DIR", "cycle_index")  # Snapshot of the cycle index for warm restarts
 
   
 # Dex Configuration
@@ -32,6 +32,23 @@ class SwapResult:
     price_after: Decimal
     slippage_percent: Decimal
 
+@dataclass
+class CycleQuote:
+    """Optimal input size and expected result of an arbitrage cycle."""
+    amount_in: int
+    amount_out: int
+    profit: int
+
+@dataclass
+class V3SwapQuote:
+    """Result of a simulated Uniswap V3 swap."""
+    amount_in: int  # Including the fee
+    amount_out: int
+    sqrt_price_x96: int  # Sqrt price after the swap
+    tick: int  # Tick after the swap
+    liquidity: int  # Active liquidity after the swap
+    ticks_crossed: int  # Initialized ticks crossed
+
 
 # Base Pool Event classes
 
@@ -1,7 +1,18 @@
 from abc import ABC, abstractmethod
 from decimal import Decimal
+from itertools import count
 from typing import Dict, List, Tuple, Optional, Any
 
+# Source of pool state versions, unique across all pools so a recreated
+# pool never reuses the version of the object it replaces
+_state_versions = count(1)
+
+
+def next_state_version() -> int:
+    """Get a new, never used pool state version."""
+    return next(_state_versions)
+
+
 class IPool(ABC):
     """Base interface for all pool types."""
     
@@ -41,6 +52,17 @@ class IPool(ABC):
         """Get token1 decimal number."""
         pass
 
+    @property
+    @abstractmethod
+    def state_version(self) -> int:
+        """Get the version of the pool state, changed on every reserve, price, liquidity or tick update."""
+        pass
+
+    @abstractmethod
+    def copy(self) -> 'IPool':
+        """Get an independent copy of the pool state."""
+        pass
+
 
 class IV2Pool(IPool):
     """Interface for Uniswap V2-style pools."""
@@ -55,4 +77,62 @@ class IV2Pool(IPool):
     @abstractmethod
     def reserve1(self) -> int:
         """Get the reserve of token1 in wei units."""
-        pass
\ No newline at end of file
+        pass
+
+    @abstractmethod
+    def get_amount_out(self, amount_in: int, zero_for_one: bool) -> int:
+        """Get the output amount of an exact-input swap in wei units."""
+        pass
+
+    @abstractmethod
+    def get_amount_in(self, amount_out: int, zero_for_one: bool) -> int:
+        """Get the input amount needed for an exact-output swap in wei units."""
+        pass
+
+    @abstractmethod
+    def apply_swap(self, amount_in: int, zero_for_one: bool) -> int:
+        """Swap an exact input amount against the pool state and return the output amount."""
+        pass
+
+
+class IV3Pool(IPool):
+    """Interface for Uniswap V3-style concentrated liquidity pools."""
+
+    @property
+    @abstractmethod
+    def sqrt_price_x96(self) -> int:
+        """Get the current sqrt price as a Q64.96 integer."""
+        pass
+
+    @property
+    @abstractmethod
+    def tick(self) -> int:
+        """Get the current tick."""
+        pass
+
+    @property
+    @abstractmethod
+    def liquidity(self) -> int:
+        """Get the active liquidity."""
+        pass
+
+    @property
+    @abstractmethod
+    def tick_spacing(self) -> int:
+        """Get the tick spacing."""
+        pass
+
+    @abstractmethod
+    def get_amount_out(self, amount_in: int, zero_for_one: bool) -> int:
+        """Get the output amount of an exact-input swap in wei units."""
+        pass
+
+    @abstractmethod
+    def get_amount_in(self, amount_out: int, zero_for_one: bool) -> int:
+        """Get the input amount needed for an exact-output swap in wei units."""
+        pass
+
+    @abstractmethod
+    def apply_swap(self, amount_in: int, zero_for_one: bool) -> int:
+        """Swap an exact input amount against the pool state and return the output amount."""
+        pass
@@ -6,6 +6,8 @@ from infrastructure.data_providers.graph.edge import Edge
 from domain.entities.models import DexTradingPair
 
 class Cycle_3:
+    __slots__ = ('token1', 'token2', 'token3', 'edge1', 'edge2', 'edge3')
+
     def __init__(self, token1: str, token2: str, token3: str, 
                        edge1: Edge, edge2: Edge, edge3: Edge):
         self.token1 = token1
@@ -16,6 +18,8 @@ class Cycle_3:
         self.edge3 = edge3
 
 class Cycle_2:
+    __slots__ = ('token1', 'token2', 'edge1', 'edge2')
+
     def __init__(self, token1: str, token2: str, 
                        edge1: Edge, edge2: Edge):
         self.token1 = token1
@@ -0,0 +1,112 @@
+""" Direct 2- and 3-cycle enumeration over a PriceGraph """
+
+from typing import Iterator, List, NamedTuple, Set, Tuple
+import numpy as np
+
+from infrastructure.data_providers.graph.price_graph import PriceGraph
+
+
+class TokenCycle(NamedTuple):
+    """A directed token cycle with the parallel edges available on every hop."""
+    tokens: Tuple[int, ...]        # Token ids in trading order
+    hops: Tuple[np.ndarray, ...]   # hops[i] = edge ids from tokens[i] to tokens[i + 1]
+
+
+def _undirected_pairs(graph: PriceGraph) -> np.ndarray:
+    """
+    Get every unordered token pair connected by at least one active edge.
+
+    Returns:
+        (m, 2) array of token ids with the smaller id first
+    """
+    active = graph.edge_active
+    if not active.any():
+        return np.zeros((0, 2), dtype=np.int32)
+
+    edge_from = graph.edge_from[active]
+    edge_to = graph.edge_to[active]
+    lo = np.minimum(edge_from, edge_to)
+    hi = np.maximum(edge_from, edge_to)
+    pairs = np.unique(np.stack((lo, hi), axis=1), axis=0)
+    return pairs[pairs[:, 0] != pairs[:, 1]]
+
+
+def _forward_adjacency(graph: PriceGraph, pairs: np.ndarray) -> List[Set[int]]:
+    """
+    Orient every undirected pair from the lower to the higher ranked token.
+
+    Tokens are ranked by degree (ties broken by id), so every token keeps at
+    most O(sqrt(m)) forward neighbours and each triangle is found exactly
+    once, from its lowest ranked token.
+    """
+    n = graph.number_of_nodes()
+    degree = np.bincount(pairs.ravel(), minlength=n)
+    order = np.lexsort((np.arange(n), degree))
+    rank = np.empty(n, dtype=np.int64)
+    rank[order] = np.arange(n)
+
+    forward: List[Set[int]] = [set() for _ in range(n)]
+    for u, v in pairs.tolist():
+        if rank[u] < rank[v]:
+            forward[u].add(v)
+        else:
+            forward[v].add(u)
+    return forward
+
+
+def enumerate_two_cycles(graph: PriceGraph) -> Iterator[TokenCycle]:
+    """
+    Enumerate every token pair that can be traded in both directions.
+
+    Each unordered pair is emitted once, as (u, v) with u < v; its hops hold
+    the u -> v and v -> u edges, so both trading directions are covered by
+    choosing a pool from each hop.
+
+    Args:
+        graph: Price graph
+
+    Returns:
+        Iterator of TokenCycle
+    """
+    for u, v in _undirected_pairs(graph).tolist():
+        forward = graph.edges_between(u, v)
+        if len(forward) == 0:
+            continue
+        backward = graph.edges_between(v, u)
+        if len(backward) == 0:
+            continue
+        yield TokenCycle(tokens=(u, v), hops=(forward, backward))
+
+
+def enumerate_triangles(graph: PriceGraph) -> Iterator[TokenCycle]:
+    """
+    Enumerate every directed 3-cycle using ordered (forward) triangle listing.
+
+    Each token triangle is listed exactly once and emitted in both
+    orientations (a -> b -> c -> a and a -> c -> b -> a, with a the smallest
+    token id) when every hop of that orientation has at least one edge.
+
+    Args:
+        graph: Price graph
+
+    Returns:
+        Iterator of TokenCycle
+    """
+    pairs = _undirected_pairs(graph)
+    if len(pairs) == 0:
+        return
+
+    forward = _forward_adjacency(graph, pairs)
+    for u in range(len(forward)):
+        forward_u = forward[u]
+        for v in forward_u:
+            for w in forward_u & forward[v]:
+                a, b, c = sorted((u, v, w))
+                for tokens in ((a, b, c), (a, c, b)):
+                    hops = (
+                        graph.edges_between(tokens[0], tokens[1]),
+                        graph.edges_between(tokens[1], tokens[2]),
+                        graph.edges_between(tokens[2], tokens[0]),
+                    )
+                    if len(hops[0]) and len(hops[1]) and len(hops[2]):
+                        yield TokenCycle(tokens=tokens, hops=hops)
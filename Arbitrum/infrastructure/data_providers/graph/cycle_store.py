@@ -0,0 +1,196 @@
+""" Compact array-backed cycle storage """
+
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+import numpy as np
+
+from infrastructure.data_providers.graph.edge import Edge
+from infrastructure.data_providers.graph.cycle import Cycle_3, Cycle_2
+from infrastructure.data_providers.graph.edge_index_matrix import EdgeIndexMatrix
+from infrastructure.data_providers.graph.price_graph import PriceGraph
+
+# Provider name -> PoolVersion enum value of OptiArb.sol
+POOL_VERSIONS = {
+    'uniswap_v2': 0,
+    'uniswap_v3': 1,
+    'sushiswap_v2': 2,
+    'pancakeswap_v2': 3,
+    'sushiswap_v3': 4,
+    'pancakeswap_v3': 5,
+}
+
+# PoolVersions quoted by V3_core, which takes fees in pips (1e-6); V2_core takes parts per 10000
+V3_POOL_VERSIONS = frozenset(
+    version for provider, version in POOL_VERSIONS.items() if provider.endswith('_v3')
+)
+V2_FEE_DENOMINATOR = 10_000
+V3_FEE_DENOMINATOR = 1_000_000
+
+
+def fee_denominator(version: int) -> int:
+    """Get the fee unit OptiArb expects for a PoolVersion (fee = abi fee / denominator)."""
+    return V3_FEE_DENOMINATOR if version in V3_POOL_VERSIONS else V2_FEE_DENOMINATOR
+
+
+def abi_fee(fee: float, version: int) -> int:
+    """
+    Convert a fee to the integer OptiArb expects for a PoolVersion.
+
+    Args:
+        fee: Fee as a decimal (e.g., 0.003 for 0.3%)
+        version: PoolVersion enum value
+
+    Returns:
+        Fee in parts per 10000 for V2 versions, in pips for V3 versions
+    """
+    return int(round(fee * fee_denominator(version)))
+
+
+class CycleStore:
+    """
+    Fixed-length cycles stored as rows of graph edge ids.
+
+    A cycle costs one int32 per hop: tokens, pools, fees and providers are
+    all read from the price graph's edge columns through the edge ids.
+    Indexing or iterating the store materializes a Cycle_3 / Cycle_2 view
+    on demand (the Edge objects are cached per graph edge and shared), and
+    to_abi() builds the OptiArb struct tuple directly from the arrays.
+    """
+
+    def __init__(
+        self,
+        price_graph: PriceGraph,
+        width: int,
+        edge_objects: Optional[Dict[int, Edge]] = None,
+        initial_capacity: int = 1024
+    ):
+        """
+        Initialize an empty store.
+
+        Args:
+            price_graph: Price graph the edge ids refer to
+            width: Number of hops per cycle (2 or 3)
+            edge_objects: Edge object cache, shared between stores of the same graph
+            initial_capacity: Number of cycles to preallocate
+        """
+        if width not in (2, 3):
+            raise ValueError(f"Unsupported cycle length: {width}")
+
+        self.price_graph = price_graph
+        self.width = width
+        self.edges = EdgeIndexMatrix(width, initial_capacity)
+        self.edge_objects: Dict[int, Edge] = edge_objects if edge_objects is not None else {}
+
+    def __len__(self) -> int:
+        return len(self.edges)
+
+    def __getitem__(self, cycle_index: int) -> Union[Cycle_3, Cycle_2]:
+        return self.make(self.edges[cycle_index])
+
+    def __iter__(self) -> Iterator[Union[Cycle_3, Cycle_2]]:
+        for cycle_index in range(len(self.edges)):
+            yield self[cycle_index]
+
+    def clear(self) -> None:
+        """Remove all cycles."""
+        self.edges.clear()
+
+    def append(self, edge_ids: Sequence[int]) -> int:
+        """
+        Append a cycle.
+
+        Args:
+            edge_ids: Graph edge ids of the hops, in trading order
+
+        Returns:
+            Index of the new cycle
+        """
+        self.edges.append(edge_ids)
+        return len(self.edges) - 1
+
+    def move(self, source: int, target: int) -> None:
+        """Copy the cycle at source over the cycle at target."""
+        self.edges[target] = self.edges[source]
+
+    def pop(self) -> None:
+        """Remove the last cycle."""
+        self.edges.pop()
+
+    # ------------------------------------------------------------------
+    # Row accessors
+    # ------------------------------------------------------------------
+
+    def edge(self, edge_id: int) -> Edge:
+        """
+        Get the Edge object of a graph edge, creating it on first use.
+
+        Args:
+            edge_id: Graph edge id
+
+        Returns:
+            Edge shared by all cycles using this graph edge
+        """
+        edge = self.edge_objects.get(edge_id)
+        if edge is None:
+            graph = self.price_graph
+            edge = Edge(pool=graph.edge_pool_address(edge_id),
+                        fee=float(graph.edge_fee[edge_id]),
+                        version=graph.edge_provider(edge_id))
+            self.edge_objects[edge_id] = edge
+        return edge
+
+    def row_tokens(self, edge_ids: np.ndarray) -> List[str]:
+        """Get the token addresses of a cycle row, in trading order."""
+        names = self.price_graph.tokens
+        return [names[token_id] for token_id in self.price_graph.edge_from[edge_ids].tolist()]
+
+    def row_pools(self, edge_ids: np.ndarray) -> List[str]:
+        """Get the pool addresses of a cycle row, in trading order."""
+        pools = self.price_graph.pools
+        return [pools[pool_id] for pool_id in self.price_graph.edge_pool[edge_ids].tolist()]
+
+    def make(self, edge_ids: Sequence[int]) -> Union[Cycle_3, Cycle_2]:
+        """
+        Materialize a cycle object from graph edge ids.
+
+        Args:
+            edge_ids: Graph edge ids of the hops, in trading order
+
+        Returns:
+            Cycle_3 or Cycle_2
+        """
+        edge_ids = [int(edge_id) for edge_id in edge_ids]
+        tokens = self.row_tokens(np.asarray(edge_ids, dtype=np.int64))
+        edges = [self.edge(edge_id) for edge_id in edge_ids]
+        if self.width == 3:
+            return Cycle_3(tokens[0], tokens[1], tokens[2], edges[0], edges[1], edges[2])
+        return Cycle_2(tokens[0], tokens[1], edges[0], edges[1])
+
+    def to_abi(self, cycle_index: int) -> Tuple:
+        """
+        Build the OptiArb struct tuple of a cycle.
+
+        Cycle_3 hops are (pool, fee, PoolVersion) tuples, with the fee in
+        parts per 10000 for V2 versions and in pips (1e-6) for V3 versions;
+        Cycle_2 hops are the pool addresses only, as in the contract structs.
+
+        Args:
+            cycle_index: Index of the cycle
+
+        Returns:
+            Tuple to pass as the cycle argument of checkProfit
+        """
+        graph = self.price_graph
+        edge_ids = self.edges[cycle_index]
+        tokens = self.row_tokens(edge_ids)
+        pools = self.row_pools(edge_ids)
+        if self.width == 2:
+            return (tokens[0], tokens[1], pools[0], pools[1])
+
+        hops = []
+        for edge_id, pool in zip(edge_ids.tolist(), pools):
+            provider = graph.edge_provider(edge_id)
+            version = POOL_VERSIONS.get(provider)
+            if version is None:
+                raise ValueError(f"No PoolVersion for provider {provider}")
+            hops.append((pool, abi_fee(float(graph.edge_fee[edge_id]), version), version))
+        return (tokens[0], tokens[1], tokens[2], hops[0], hops[1], hops[2])
@@ -1,6 +1,8 @@
 from decimal import Decimal
 
 class Edge:
+    __slots__ = ('pool', 'fee', 'version')
+
     def __init__(
             self, 
             pool: str,
@@ -0,0 +1,82 @@
+""" Growable (n x k) matrix of graph edge ids """
+
+from typing import Sequence
+import numpy as np
+
+
+class EdgeIndexMatrix:
+    """
+    Dense int32 matrix holding the edge ids of one cycle per row.
+
+    Rows are appended into preallocated storage that doubles when full and
+    removed from the end, which is all the swap-removal of CycleManager
+    needs. The used rows are exposed as a view, so a whole cycle set can be
+    scored with a single gather.
+    """
+
+    def __init__(self, width: int, initial_capacity: int = 1024):
+        """
+        Initialize an empty matrix.
+
+        Args:
+            width: Number of edges per cycle
+            initial_capacity: Number of rows to preallocate
+        """
+        self.width = width
+        self._rows = np.zeros((max(1, initial_capacity), width), dtype=np.int32)
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, row: int) -> np.ndarray:
+        if row >= self._count:
+            raise IndexError(row)
+        return self._rows[row]
+
+    def __setitem__(self, row: int, edge_ids: Sequence[int]) -> None:
+        if row >= self._count:
+            raise IndexError(row)
+        self._rows[row] = edge_ids
+
+    @property
+    def array(self) -> np.ndarray:
+        """View of the used rows."""
+        return self._rows[:self._count]
+
+    def append(self, edge_ids: Sequence[int]) -> None:
+        """Append one row."""
+        if self._count == len(self._rows):
+            rows = np.zeros((2 * len(self._rows), self.width), dtype=np.int32)
+            rows[:self._count] = self._rows
+            self._rows = rows
+        self._rows[self._count] = edge_ids
+        self._count += 1
+
+    def pop(self) -> None:
+        """Remove the last row."""
+        if self._count == 0:
+            raise IndexError("pop from empty EdgeIndexMatrix")
+        self._count -= 1
+
+    def clear(self) -> None:
+        """Remove all rows."""
+        self._count = 0
+
+    def restore(self, rows: np.ndarray) -> None:
+        """
+        Adopt an existing (n x width) array as the used rows.
+
+        The array is not copied (e.g. a copy-on-write memory map) until the
+        matrix has to grow.
+
+        Args:
+            rows: Edge id rows
+        """
+        if rows.ndim != 2 or rows.shape[1] != self.width:
+            raise ValueError(f"Expected an (n x {self.width}) array, got shape {rows.shape}")
+        if len(rows) == 0:
+            self.clear()
+            return
+        self._rows = rows
+        self._count = len(rows)
@@ -0,0 +1,225 @@
+""" Per-pair edge selection for cycle enumeration """
+
+from typing import Dict, List, Optional, Set, Tuple
+import itertools
+import numpy as np
+
+from infrastructure.data_providers.graph.price_graph import PriceGraph
+
+RANK_BY_LIQUIDITY = 'liquidity'
+RANK_BY_RATE = 'rate'
+
+
+class EdgePruner:
+    """
+    Chooses which parallel edges of a directed token pair take part in cycles.
+
+    Without pruning every combination of parallel pools on the hops of a
+    token cycle is its own cycle, so the cycle count grows with the product
+    of the pools per pair. The pruner keeps only the top_k edges of each
+    directed pair, ranked by pool liquidity or by marginal (fee-adjusted)
+    rate.
+
+    In bundle mode each pair is represented by a single edge. Screening
+    scores the representative with the best log rate of all kept edges of
+    the pair, and expand_cycle() turns a cycle that passed screening into
+    the concrete pool combinations, so the cycle count follows the number
+    of token cycles instead of the number of pools.
+
+    Rankings are taken when a pair is selected (on build and when a pool of
+    the pair is added or removed); a full rebuild re-ranks every pair.
+    """
+
+    def __init__(
+        self,
+        price_graph: PriceGraph,
+        top_k: Optional[int] = None,
+        rank_by: str = RANK_BY_LIQUIDITY,
+        bundle: bool = False
+    ):
+        """
+        Initialize the pruner.
+
+        Args:
+            price_graph: Price graph to select edges from
+            top_k: Number of edges to keep per directed pair (all edges if None)
+            rank_by: 'liquidity' or 'rate'
+            bundle: Represent the kept edges of a pair by one bundle edge
+        """
+        if top_k is not None and top_k < 1:
+            raise ValueError(f"Invalid top_k: {top_k}")
+        if rank_by not in (RANK_BY_LIQUIDITY, RANK_BY_RATE):
+            raise ValueError(f"Unknown edge ranking: {rank_by}")
+
+        self.price_graph = price_graph
+        self.top_k = top_k
+        self.rank_by = rank_by
+        self.bundle = bundle
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget all selections."""
+        # (from token id, to token id) -> kept edge ids, best first
+        self.members: Dict[Tuple[int, int], np.ndarray] = {}
+        # Representative edge id -> (from token id, to token id) of its bundle
+        self.bundle_pairs: Dict[int, Tuple[int, int]] = {}
+        self._bundle_arrays: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+    def _rank(self, u: int, v: int, exclude_pool: Optional[int] = None) -> np.ndarray:
+        """Get the kept edges of a pair, best first."""
+        graph = self.price_graph
+        edges = graph.edges_between(u, v)
+        if exclude_pool is not None:
+            edges = edges[graph.edge_pool[edges] != exclude_pool]
+        if len(edges) == 0:
+            return edges
+
+        keys = graph.edge_liquidity[edges] if self.rank_by == RANK_BY_LIQUIDITY else graph.edge_log_rate[edges]
+        order = np.lexsort((edges, -keys))
+        return edges[order][:self.top_k]
+
+    def select(self, u: int, v: int) -> np.ndarray:
+        """
+        Get the edges of a directed pair that cycles are built from.
+
+        Args:
+            u: Source token id
+            v: Target token id
+
+        Returns:
+            Array of edge ids (the representative only in bundle mode)
+        """
+        members = self.members.get((u, v))
+        if members is None:
+            members = self._rank(u, v)
+            self._store(u, v, members)
+        return members[:1] if self.bundle else members
+
+    def refresh(self, u: int, v: int, exclude_pool: Optional[int] = None) -> Tuple[List[int], List[int]]:
+        """
+        Re-select a pair after one of its pools was added or is being removed.
+
+        Args:
+            u: Source token id
+            v: Target token id
+            exclude_pool: Id of a pool whose edges must no longer be selected
+
+        Returns:
+            Edge ids that entered and left the selection
+        """
+        old = set(self.select(u, v).tolist()) if (u, v) in self.members else set()
+        self._store(u, v, self._rank(u, v, exclude_pool))
+        new = self.select(u, v).tolist()
+        return [e for e in new if e not in old], [e for e in old if e not in new]
+
+    def _store(self, u: int, v: int, members: np.ndarray) -> None:
+        old = self.members.get((u, v))
+        if old is not None and len(old):
+            self.bundle_pairs.pop(int(old[0]), None)
+        self.members[(u, v)] = members
+        if len(members):
+            self.bundle_pairs[int(members[0])] = (u, v)
+        self._bundle_arrays = None
+
+    def export_selection(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Get the current selection as flat arrays.
+
+        Returns:
+            (m x 2) token pairs, (m + 1) offsets into the members array, member edge ids
+        """
+        pairs = np.asarray(list(self.members.keys()), dtype=np.int32).reshape(-1, 2)
+        lengths = [len(members) for members in self.members.values()]
+        indptr = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=indptr[1:])
+        if not lengths:
+            return pairs, indptr, np.zeros(0, dtype=np.int32)
+        return pairs, indptr, np.concatenate([members.astype(np.int32) for members in self.members.values()])
+
+    def restore_selection(self, pairs: np.ndarray, indptr: np.ndarray, members: np.ndarray) -> None:
+        """
+        Replace the selection with one returned by export_selection().
+
+        Args:
+            pairs: (m x 2) token pairs
+            indptr: (m + 1) offsets into the members array
+            members: Member edge ids
+        """
+        self.reset()
+        for i, (u, v) in enumerate(pairs.tolist()):
+            self._store(u, v, np.array(members[indptr[i]:indptr[i + 1]], dtype=np.int32))
+
+    # ------------------------------------------------------------------
+    # Bundles
+    # ------------------------------------------------------------------
+
+    def _bundle_index(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Get the flattened (member edge id, representative edge id) arrays."""
+        if self._bundle_arrays is None:
+            member_ids: List[int] = []
+            representative_ids: List[int] = []
+            for representative, pair in self.bundle_pairs.items():
+                members = self.members[pair].tolist()
+                member_ids.extend(members)
+                representative_ids.extend([representative] * len(members))
+            self._bundle_arrays = (
+                np.asarray(member_ids, dtype=np.int64),
+                np.asarray(representative_ids, dtype=np.int64),
+            )
+        return self._bundle_arrays
+
+    def bundle_log_rates(self) -> np.ndarray:
+        """
+        Get the edge log rates with every representative raised to the best rate of its bundle.
+
+        Returns:
+            Array parallel to the graph's edge columns
+        """
+        rates = self.price_graph.edge_log_rate.copy()
+        if self.bundle:
+            member_ids, representative_ids = self._bundle_index()
+            np.maximum.at(rates, representative_ids, rates[member_ids])
+        return rates
+
+    def representatives(self, edge_ids: List[int]) -> Set[int]:
+        """
+        Get the representatives of the bundles containing some edges.
+
+        Args:
+            edge_ids: Edge ids
+
+        Returns:
+            Representative edge ids (the edges themselves outside bundle mode)
+        """
+        if not self.bundle:
+            return set(edge_ids)
+        member_ids, representative_ids = self._bundle_index()
+        return set(representative_ids[np.isin(member_ids, edge_ids)].tolist())
+
+    def hop_members(self, edge_id: int) -> List[int]:
+        """Get the concrete edges a cycle hop stands for."""
+        pair = self.bundle_pairs.get(edge_id) if self.bundle else None
+        if pair is None:
+            return [edge_id]
+        return self.members[pair].tolist()
+
+    def expand_cycle(self, edge_ids: Tuple[int, ...]) -> List[Tuple[int, ...]]:
+        """
+        Expand a cycle over bundle edges into its concrete pool combinations.
+
+        Args:
+            edge_ids: Edge ids of the cycle hops
+
+        Returns:
+            Concrete edge id tuples, best fee-adjusted rate product first
+        """
+        graph = self.price_graph
+        rates = graph.edge_log_rate
+        pool_of = graph.edge_pool
+        combinations = [
+            combination for combination in itertools.product(*(self.hop_members(e) for e in edge_ids))
+            # A 2-cycle must buy and sell on different pools
+            if len(combination) != 2 or pool_of[combination[0]] != pool_of[combination[1]]
+        ]
+        combinations.sort(key=lambda combination: float(rates[list(combination)].sum()), reverse=True)
+        return combinations
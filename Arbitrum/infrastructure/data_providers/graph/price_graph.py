@@ -0,0 +1,449 @@
+""" Array-backed Price Graph Implementation """
+
+from typing import Dict, List, Optional, Tuple
+import math
+import numpy as np
+
+
+class PriceGraph:
+    """
+    Directed multigraph of token prices stored in flat arrays.
+
+    Tokens and pools are interned to dense integer ids. Every edge is a row
+    in a struct-of-arrays table (pool id, from, to, fee, log-weight, pool
+    liquidity, plus the fee-adjusted log rate kept in step with the weight)
+    and the adjacency
+    queries are answered from a CSR index over the source token.
+
+    Edges added after the CSR index was built go to a small per-token
+    pending list and removed pools only clear their edges' active flag, so
+    single pools can be added or removed without rebuilding the index. The
+    index is compacted lazily once the pending list grows too large.
+    """
+
+    def __init__(self, initial_capacity: int = 1024):
+        """
+        Initialize an empty price graph.
+
+        Args:
+            initial_capacity: Number of edge rows to preallocate
+        """
+        self._initial_capacity = max(1, initial_capacity)
+        self.clear()
+
+    def clear(self) -> None:
+        """Remove all tokens, pools and edges."""
+        # Token table
+        self.token_ids: Dict[str, int] = {}
+        self.tokens: List[str] = []
+        self.token_symbols: List[str] = []
+        self.token_decimals: List[int] = []
+
+        # Pool table
+        self.pool_ids: Dict[str, int] = {}
+        self.pools: List[str] = []
+        self.pool_providers: List[str] = []
+        self.pool_edges: List[List[int]] = []
+
+        # Edge table (struct of arrays)
+        capacity = self._initial_capacity
+        self._edge_count = 0
+        self._edge_pool = np.zeros(capacity, dtype=np.int32)
+        self._edge_from = np.zeros(capacity, dtype=np.int32)
+        self._edge_to = np.zeros(capacity, dtype=np.int32)
+        self._edge_fee = np.zeros(capacity, dtype=np.float64)
+        self._edge_weight = np.zeros(capacity, dtype=np.float64)
+        self._edge_log_rate = np.zeros(capacity, dtype=np.float64)
+        self._edge_liquidity = np.zeros(capacity, dtype=np.float64)
+        self._edge_active = np.zeros(capacity, dtype=np.bool_)
+
+        # CSR index over the source token
+        self._csr_dirty = True
+        self._pending_out: Dict[int, List[int]] = {}
+        self._pending_count = 0
+        self._csr_indptr = np.zeros(1, dtype=np.int64)
+        self._csr_edges = np.zeros(0, dtype=np.int32)
+        self._csr_to = np.zeros(0, dtype=np.int32)
+
+    # ------------------------------------------------------------------
+    # Edge columns (views over the used part of the preallocated arrays)
+    # ------------------------------------------------------------------
+
+    @property
+    def edge_pool(self) -> np.ndarray:
+        """Pool id of every edge."""
+        return self._edge_pool[:self._edge_count]
+
+    @property
+    def edge_from(self) -> np.ndarray:
+        """Source token id of every edge."""
+        return self._edge_from[:self._edge_count]
+
+    @property
+    def edge_to(self) -> np.ndarray:
+        """Target token id of every edge."""
+        return self._edge_to[:self._edge_count]
+
+    @property
+    def edge_fee(self) -> np.ndarray:
+        """Fee of every edge as a decimal (e.g., 0.003 for 0.3%)."""
+        return self._edge_fee[:self._edge_count]
+
+    @property
+    def edge_weight(self) -> np.ndarray:
+        """Log price of every edge."""
+        return self._edge_weight[:self._edge_count]
+
+    @property
+    def edge_log_rate(self) -> np.ndarray:
+        """Log of the fee-adjusted exchange rate of every edge (weight + log(1 - fee))."""
+        return self._edge_log_rate[:self._edge_count]
+
+    @property
+    def edge_liquidity(self) -> np.ndarray:
+        """Liquidity of every edge's pool in USD (0 if unknown)."""
+        return self._edge_liquidity[:self._edge_count]
+
+    @property
+    def edge_active(self) -> np.ndarray:
+        """False for edges of removed pools."""
+        return self._edge_active[:self._edge_count]
+
+    def number_of_nodes(self) -> int:
+        """Get the number of interned tokens."""
+        return len(self.tokens)
+
+    def number_of_edges(self) -> int:
+        """Get the number of edge rows, including those of removed pools."""
+        return self._edge_count
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+
+    def add_token(self, address: str, symbol: str = "", decimals: int = 18) -> int:
+        """
+        Intern a token address, returning its id.
+
+        Args:
+            address: Token address
+            symbol: Token symbol
+            decimals: Token decimals
+
+        Returns:
+            Dense integer id of the token
+        """
+        token_id = self.token_ids.get(address)
+        if token_id is not None:
+            return token_id
+
+        token_id = len(self.tokens)
+        self.token_ids[address] = token_id
+        self.tokens.append(address)
+        self.token_symbols.append(symbol)
+        self.token_decimals.append(decimals)
+        return token_id
+
+    def add_pool(self, address: str, provider: str) -> int:
+        """
+        Intern a pool address, returning its id.
+
+        Args:
+            address: Pool address
+            provider: Name of the provider the pool belongs to
+
+        Returns:
+            Dense integer id of the pool
+        """
+        pool_id = self.pool_ids.get(address)
+        if pool_id is not None:
+            return pool_id
+
+        pool_id = len(self.pools)
+        self.pool_ids[address] = pool_id
+        self.pools.append(address)
+        self.pool_providers.append(provider)
+        self.pool_edges.append([])
+        return pool_id
+
+    def remove_pool(self, address: str) -> List[int]:
+        """
+        Deactivate all edges of a pool.
+
+        The pool keeps its id, so re-adding it later reuses the same id.
+
+        Args:
+            address: Pool address
+
+        Returns:
+            Ids of the edges that were deactivated
+        """
+        pool_id = self.pool_ids.get(address)
+        if pool_id is None:
+            return []
+
+        removed = [edge_id for edge_id in self.pool_edges[pool_id] if self._edge_active[edge_id]]
+        self._edge_active[removed] = False
+        self.pool_edges[pool_id] = []
+        return removed
+
+    def add_edge(
+        self, from_token: str, to_token: str, pool: str,
+        weight: float, fee: float, provider: str, liquidity: float = 0.0
+    ) -> int:
+        """
+        Add a directed edge for a pool.
+
+        Args:
+            from_token: Address of the token sold into the pool
+            to_token: Address of the token bought from the pool
+            pool: Pool address
+            weight: Log price of the edge
+            fee: Fee as a decimal (e.g., 0.003 for 0.3%)
+            provider: Name of the provider the pool belongs to
+            liquidity: Liquidity of the pool in USD
+
+        Returns:
+            Id of the new edge
+        """
+        if self._edge_count == len(self._edge_pool):
+            self._grow()
+
+        pool_id = self.add_pool(pool, provider)
+        u = self.add_token(from_token)
+        v = self.add_token(to_token)
+
+        edge_id = self._edge_count
+        self._edge_pool[edge_id] = pool_id
+        self._edge_from[edge_id] = u
+        self._edge_to[edge_id] = v
+        self._edge_fee[edge_id] = fee
+        self._edge_weight[edge_id] = weight
+        self._edge_log_rate[edge_id] = weight + math.log1p(-fee)
+        self._edge_liquidity[edge_id] = liquidity
+        self._edge_active[edge_id] = True
+        self._edge_count += 1
+        self.pool_edges[pool_id].append(edge_id)
+
+        if not self._csr_dirty:
+            self._pending_out.setdefault(u, []).append(edge_id)
+            self._pending_count += 1
+            if self._pending_count > max(64, self._edge_count // 8):
+                self._csr_dirty = True
+        return edge_id
+
+    def set_pool_weight(self, pool: str, from_token: str, weight: float) -> bool:
+        """
+        Update the log price of a pool's edge in one direction.
+
+        Args:
+            pool: Pool address
+            from_token: Address of the token sold into the pool
+            weight: New log price
+
+        Returns:
+            True if the edge exists and was updated
+        """
+        pool_id = self.pool_ids.get(pool)
+        u = self.token_ids.get(from_token)
+        if pool_id is None or u is None:
+            return False
+
+        for edge_id in self.pool_edges[pool_id]:
+            if self._edge_from[edge_id] == u:
+                self._edge_weight[edge_id] = weight
+                self._edge_log_rate[edge_id] = weight + math.log1p(-self._edge_fee[edge_id])
+                return True
+        return False
+
+    # Column name -> attribute, in the order they are exported
+    _COLUMNS = (
+        ('pool', '_edge_pool'), ('from', '_edge_from'), ('to', '_edge_to'), ('fee', '_edge_fee'),
+        ('weight', '_edge_weight'), ('log_rate', '_edge_log_rate'), ('liquidity', '_edge_liquidity'),
+        ('active', '_edge_active'),
+    )
+
+    def export_columns(self) -> Dict[str, np.ndarray]:
+        """
+        Get the used part of every edge column.
+
+        Returns:
+            Column name -> array view
+        """
+        return {name: getattr(self, attribute)[:self._edge_count] for name, attribute in self._COLUMNS}
+
+    def restore(
+        self,
+        tokens: List[str], token_symbols: List[str], token_decimals: List[int],
+        pools: List[str], pool_providers: List[str], columns: Dict[str, np.ndarray]
+    ) -> None:
+        """
+        Replace the graph with previously exported tables.
+
+        The column arrays are adopted as they are (e.g. copy-on-write memory
+        maps) and only copied when the edge table has to grow.
+
+        Args:
+            tokens: Token addresses, by token id
+            token_symbols: Token symbols, by token id
+            token_decimals: Token decimals, by token id
+            pools: Pool addresses, by pool id
+            pool_providers: Provider names, by pool id
+            columns: Edge columns as returned by export_columns()
+        """
+        self.clear()
+        edge_count = len(columns['pool'])
+        if edge_count == 0:
+            return
+
+        self.tokens = list(tokens)
+        self.token_symbols = list(token_symbols)
+        self.token_decimals = list(token_decimals)
+        self.token_ids = {address: token_id for token_id, address in enumerate(self.tokens)}
+
+        self.pools = list(pools)
+        self.pool_providers = list(pool_providers)
+        self.pool_ids = {address: pool_id for pool_id, address in enumerate(self.pools)}
+        self.pool_edges = [[] for _ in self.pools]
+
+        for name, attribute in self._COLUMNS:
+            setattr(self, attribute, columns[name])
+        self._edge_count = edge_count
+
+        for edge_id in np.flatnonzero(self.edge_active).tolist():
+            self.pool_edges[self._edge_pool[edge_id]].append(edge_id)
+
+    def _grow(self) -> None:
+        """Double the capacity of the edge arrays."""
+        capacity = 2 * len(self._edge_pool)
+        for _, name in self._COLUMNS:
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def _ensure_csr(self) -> None:
+        """Rebuild the CSR index over the active edges if it was marked dirty."""
+        if not self._csr_dirty:
+            return
+
+        active = np.flatnonzero(self.edge_active).astype(np.int32)
+        edge_from = self.edge_from[active]
+        edge_to = self.edge_to[active]
+        order = np.lexsort((edge_to, edge_from))
+        counts = np.bincount(edge_from, minlength=len(self.tokens))
+
+        self._csr_indptr = np.zeros(len(self.tokens) + 1, dtype=np.int64)
+        np.cumsum(counts, out=self._csr_indptr[1:])
+        self._csr_edges = active[order]
+        self._csr_to = edge_to[order]
+        self._pending_out = {}
+        self._pending_count = 0
+        self._csr_dirty = False
+
+    def compact(self) -> None:
+        """Fold pending edges into the CSR index and drop removed edges from it."""
+        self._csr_dirty = True
+        self._ensure_csr()
+
+    def _row(self, u: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Get the CSR slice (edge ids, target ids) of a token."""
+        self._ensure_csr()
+        if u + 1 >= len(self._csr_indptr):
+            return self._csr_edges[:0], self._csr_to[:0]
+        lo = self._csr_indptr[u]
+        hi = self._csr_indptr[u + 1]
+        return self._csr_edges[lo:hi], self._csr_to[lo:hi]
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def has_node(self, address: str) -> bool:
+        """Check if a token address is in the graph."""
+        return address in self.token_ids
+
+    def token_id(self, address: str) -> Optional[int]:
+        """Get the id of a token address, or None if unknown."""
+        return self.token_ids.get(address)
+
+    def edge_pool_address(self, edge_id: int) -> str:
+        """Get the pool address of an edge."""
+        return self.pools[self._edge_pool[edge_id]]
+
+    def edge_provider(self, edge_id: int) -> str:
+        """Get the provider name of an edge."""
+        return self.pool_providers[self._edge_pool[edge_id]]
+
+    def pool_id(self, address: str) -> Optional[int]:
+        """Get the id of a pool address, or None if unknown."""
+        return self.pool_ids.get(address)
+
+    def has_pool(self, address: str) -> bool:
+        """Check if a pool has at least one active edge."""
+        pool_id = self.pool_ids.get(address)
+        return pool_id is not None and len(self.pool_edges[pool_id]) > 0
+
+    def out_edges(self, u: int) -> np.ndarray:
+        """
+        Get the active outgoing edges of a token.
+
+        Args:
+            u: Source token id
+
+        Returns:
+            Array of edge ids
+        """
+        edges, _ = self._row(u)
+        pending = self._pending_out.get(u)
+        if pending:
+            edges = np.concatenate((edges, np.asarray(pending, dtype=np.int32)))
+        return edges[self._edge_active[edges]]
+
+    def successors(self, u: int) -> np.ndarray:
+        """
+        Get the distinct tokens reachable from a token in one hop.
+
+        Args:
+            u: Source token id
+
+        Returns:
+            Sorted array of token ids
+        """
+        return np.unique(self._edge_to[self.out_edges(u)])
+
+    def edges_between(self, u: int, v: int) -> np.ndarray:
+        """
+        Get all active parallel edges from one token to another.
+
+        Args:
+            u: Source token id
+            v: Target token id
+
+        Returns:
+            Array of edge ids (empty if there is no edge)
+        """
+        edges, row_to = self._row(u)
+        start = np.searchsorted(row_to, v, side='left')
+        end = np.searchsorted(row_to, v, side='right')
+        edges = edges[start:end]
+
+        pending = self._pending_out.get(u)
+        if pending:
+            extra = [edge_id for edge_id in pending if self._edge_to[edge_id] == v]
+            if extra:
+                edges = np.concatenate((edges, np.asarray(extra, dtype=np.int32)))
+        return edges[self._edge_active[edges]]
+
+    def token_pairs(self) -> List[Tuple[int, int]]:
+        """
+        Get the distinct directed token pairs that have at least one active edge.
+
+        Returns:
+            List of (from token id, to token id) tuples
+        """
+        active = self.edge_active
+        if not active.any():
+            return []
+        pairs = np.unique(np.stack((self.edge_from[active], self.edge_to[active]), axis=1), axis=0)
+        return [(int(u), int(v)) for u, v in pairs]
@@ -0,0 +1,134 @@
+""" Float64 mirror of V2 pool reserves for vectorized screening """
+
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+
+
+class PoolStateMirror:
+    """
+    Float64 copies of the V2 pool state in parallel NumPy arrays, one row per pool.
+
+    The pools write their new reserves here on every update, so the arrays
+    always follow the exact integer state. Cycle screening and optimal-size
+    estimation can then run vectorized over many cycles at once, and the
+    exact integer simulation is only needed for the candidates that pass.
+    Values are approximations (53-bit mantissa) and must not be used to
+    build transactions.
+    """
+
+    def __init__(self, initial_capacity: int = 1024):
+        """
+        Initialize an empty mirror.
+
+        Args:
+            initial_capacity: Number of pool rows to preallocate
+        """
+        self.rows: Dict[str, int] = {}
+        self._free_rows: List[int] = []
+        self._size = 0
+        self._allocate(max(1, initial_capacity))
+
+    def _allocate(self, capacity: int) -> None:
+        old = getattr(self, 'reserve0', None)
+        columns = {}
+        for name in ('reserve0', 'reserve1', 'rate0', 'rate1', 'fee_multiplier', 'scale0', 'scale1'):
+            column = np.zeros(capacity, dtype=np.float64)
+            if old is not None:
+                column[:self._size] = getattr(self, name)[:self._size]
+            columns[name] = column
+        # Reserves in wei units
+        self.reserve0: np.ndarray = columns['reserve0']
+        self.reserve1: np.ndarray = columns['reserve1']
+        # Decimals-adjusted prices: token1 per token0 and token0 per token1
+        self.rate0: np.ndarray = columns['rate0']
+        self.rate1: np.ndarray = columns['rate1']
+        # Input share kept after fees (e.g., 0.997 for 0.3%)
+        self.fee_multiplier: np.ndarray = columns['fee_multiplier']
+        # 10^-decimals of each token, to convert wei to token units
+        self.scale0: np.ndarray = columns['scale0']
+        self.scale1: np.ndarray = columns['scale1']
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __contains__(self, pool_address: str) -> bool:
+        return pool_address in self.rows
+
+    def row(self, pool_address: str) -> Optional[int]:
+        """Get the row of a pool, None if it is not mirrored."""
+        return self.rows.get(pool_address)
+
+    def add(self, pool) -> int:
+        """
+        Mirror a V2 pool and attach the mirror to it, so its reserve updates are copied here.
+
+        Args:
+            pool: V2Pool
+
+        Returns:
+            Row of the pool
+        """
+        row = self.rows.get(pool.address)
+        if row is None:
+            if self._free_rows:
+                row = self._free_rows.pop()
+            else:
+                if self._size == len(self.reserve0):
+                    self._allocate(2 * len(self.reserve0))
+                row = self._size
+                self._size += 1
+            self.rows[pool.address] = row
+
+        self.fee_multiplier[row] = pool.fee_multiplier / 10000
+        self.scale0[row] = 10.0 ** -pool.decimals0
+        self.scale1[row] = 10.0 ** -pool.decimals1
+        self.set_reserves(row, pool.reserve0, pool.reserve1)
+        pool.attach_mirror(self, row)
+        return row
+
+    def remove(self, pool_address: str) -> None:
+        """
+        Stop mirroring a pool; its row is zeroed and reused by the next pool added.
+
+        Args:
+            pool_address: Pool address
+        """
+        row = self.rows.pop(pool_address, None)
+        if row is None:
+            return
+        for column in (self.reserve0, self.reserve1, self.rate0, self.rate1, self.fee_multiplier):
+            column[row] = 0.0
+        self._free_rows.append(row)
+
+    def set_reserves(self, row: int, reserve0: int, reserve1: int) -> None:
+        """
+        Copy new reserves of a pool and refresh its rates.
+
+        Args:
+            row: Row of the pool
+            reserve0: Reserve of token0 in wei units
+            reserve1: Reserve of token1 in wei units
+        """
+        r0 = float(reserve0)
+        r1 = float(reserve1)
+        self.reserve0[row] = r0
+        self.reserve1[row] = r1
+        amount0 = r0 * self.scale0[row]
+        amount1 = r1 * self.scale1[row]
+        self.rate0[row] = amount1 / amount0 if amount0 > 0 else 0.0
+        self.rate1[row] = amount0 / amount1 if amount1 > 0 else 0.0
+
+    def hop_arrays(self, rows: np.ndarray, zero_for_one: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Gather the (reserve in, reserve out, fee multiplier) of swaps.
+
+        Args:
+            rows: Pool rows, any shape
+            zero_for_one: Swap directions, same shape
+
+        Returns:
+            Three float64 arrays of the same shape
+        """
+        reserve_in = np.where(zero_for_one, self.reserve0[rows], self.reserve1[rows])
+        reserve_out = np.where(zero_for_one, self.reserve1[rows], self.reserve0[rows])
+        return reserve_in, reserve_out, self.fee_multiplier[rows]
@@ -0,0 +1,122 @@
+""" Initialized-tick index of a Uniswap V3 pool """
+
+from typing import Dict, Optional, Tuple
+
+
+class TickIndex:
+    """
+    Initialized ticks of a V3 pool with their liquidityNet.
+
+    Next to the tick -> liquidityNet map, a bitmap of 256-bit words over
+    compressed ticks (tick // spacing) is kept in step, so
+    next_initialized_tick_within_one_word() is a mask plus an msb/lsb
+    lookup, exactly like TickBitmap in the pool contract. The swap loop
+    uses it to step word by word, which keeps the per-step rounding
+    identical to the chain. Mint and Burn updates are O(1).
+    """
+
+    def __init__(self, tick_spacing: int, ticks: Optional[Dict[int, int]] = None):
+        """
+        Initialize the index.
+
+        Args:
+            tick_spacing: Tick spacing of the pool
+            ticks: Initialized tick -> liquidityNet
+        """
+        if tick_spacing <= 0:
+            raise ValueError(f"Invalid tick spacing: {tick_spacing}")
+        self.tick_spacing = tick_spacing
+        self.set_ticks(ticks or {})
+
+    def __len__(self) -> int:
+        return len(self._liquidity_net)
+
+    def __contains__(self, tick: int) -> bool:
+        return tick in self._liquidity_net
+
+    def set_ticks(self, ticks: Dict[int, int]) -> None:
+        """
+        Replace all initialized ticks.
+
+        Args:
+            ticks: Initialized tick -> liquidityNet
+        """
+        self._liquidity_net: Dict[int, int] = {}
+        self._bitmap: Dict[int, int] = {}
+        for tick, liquidity_net in ticks.items():
+            self.update(tick, liquidity_net)
+
+    def copy(self) -> 'TickIndex':
+        """Get an independent copy."""
+        clone = TickIndex.__new__(TickIndex)
+        clone.tick_spacing = self.tick_spacing
+        clone._liquidity_net = dict(self._liquidity_net)
+        clone._bitmap = dict(self._bitmap)
+        return clone
+
+    def to_dict(self) -> Dict[int, int]:
+        """Get the initialized ticks as tick -> liquidityNet."""
+        return dict(self._liquidity_net)
+
+    def liquidity_net(self, tick: int) -> int:
+        """Get the liquidityNet of a tick (0 if not initialized)."""
+        return self._liquidity_net.get(tick, 0)
+
+    def update(self, tick: int, liquidity_net_delta: int) -> None:
+        """
+        Add to the liquidityNet of a tick, flipping its bitmap bit when it becomes (un)initialized.
+
+        Args:
+            tick: Tick (a multiple of the tick spacing)
+            liquidity_net_delta: Change of liquidityNet
+        """
+        if tick % self.tick_spacing:
+            raise ValueError(f"Tick {tick} is not a multiple of the tick spacing {self.tick_spacing}")
+        if liquidity_net_delta == 0:
+            return
+
+        before = self._liquidity_net.get(tick, 0)
+        after = before + liquidity_net_delta
+        if after:
+            self._liquidity_net[tick] = after
+        else:
+            del self._liquidity_net[tick]
+        if (before == 0) != (after == 0):
+            self._flip(tick)
+
+    def _flip(self, tick: int) -> None:
+        compressed = tick // self.tick_spacing
+        word_pos = compressed >> 8
+        word = self._bitmap.get(word_pos, 0) ^ (1 << (compressed & 0xFF))
+        if word:
+            self._bitmap[word_pos] = word
+        else:
+            self._bitmap.pop(word_pos, None)
+
+    def next_initialized_tick_within_one_word(self, tick: int, lte: bool) -> Tuple[int, bool]:
+        """
+        Find the next initialized tick within the same 256-tick bitmap word (TickBitmap.nextInitializedTickWithinOneWord).
+
+        Args:
+            tick: Starting tick
+            lte: Search at or below the tick (zero for one) instead of above it
+
+        Returns:
+            (next tick, or the word boundary if the word has none; whether it is initialized)
+        """
+        spacing = self.tick_spacing
+        compressed = tick // spacing
+
+        if lte:
+            bit_pos = compressed & 0xFF
+            masked = self._bitmap.get(compressed >> 8, 0) & ((2 << bit_pos) - 1)
+            if masked:
+                return (compressed - bit_pos + masked.bit_length() - 1) * spacing, True
+            return (compressed - bit_pos) * spacing, False
+
+        compressed += 1
+        bit_pos = compressed & 0xFF
+        masked = self._bitmap.get(compressed >> 8, 0) >> bit_pos
+        if masked:
+            return (compressed + (masked & -masked).bit_length() - 1) * spacing, True
+        return (compressed + 0xFF - bit_pos) * spacing, False
@@ -1,11 +1,13 @@
 """ Uniswap V2 Pool Implementation """
 
 from decimal import Decimal
+import copy
 import decimal
 import math
-from typing import Optional, Tuple
+from typing import List, Optional, Sequence, Tuple, Union
+import numpy as np
 
-from domain.entities.pool_models import IV2Pool
+from domain.entities.pool_models import IV2Pool, next_state_version
 
 class V2Pool(IV2Pool):
     def __init__(
@@ -45,9 +47,12 @@ class V2Pool(IV2Pool):
         self._fee_pct = fee  # For compatibility with SimulatedV2Pool
         self._block_number = block_number
         self._protocol = protocol
+        self._state_version = next_state_version()
+        # (PoolStateMirror, row) receiving the reserves on every update
+        self._mirror = None
         
         # Pre-calculate fee multiplier for integer arithmetic (fee as parts per 10000)
-        self._fee_multiplier = int((1 - fee) * 10000)  # e.g., 9970 for 0.3% fee
+        self._fee_multiplier = int(round((1 - fee) * 10000))  # e.g., 9970 for 0.3% fee
 
     @property
     def block_number(self) -> int:
@@ -58,8 +63,13 @@ class V2Pool(IV2Pool):
     def protocol(self) -> str:
         """Get the protocol name."""
         return self._protocol
+
+    @property
+    def state_version(self) -> int:
+        """Get the version of the reserves, changed on every update."""
+        return self._state_version
     
-    property
+    @property
     def decimals0(self) -> int:
         """Get the decimals for token0."""
         return self._decimals0
@@ -120,7 +130,163 @@ class V2Pool(IV2Pool):
             return Decimal(0)
         return (Decimal(self._reserve0) / Decimal(self._reserve1)) / Decimal(10 ** (self.decimals0 - self.decimals1))
     
+    @property
+    def fee_multiplier(self) -> int:
+        """Get the input share kept after fees in parts per 10000 (e.g., 9970 for 0.3%)."""
+        return self._fee_multiplier
+
     @property
     def fee(self) -> float:
         """Get the fee as a decimal (e.g., 0.003 for 0.3%)."""
-        return self._fee
\ No newline at end of file
+        return self._fee
+
+    def update_reserves(self, reserve0: int, reserve1: int, block_number: Optional[int] = None) -> None:
+        """
+        Set the reserves to a new on-chain state.
+
+        Args:
+            reserve0: Reserve of token0 in wei units
+            reserve1: Reserve of token1 in wei units
+            block_number: Block the state was observed at
+        """
+        self._reserve0 = reserve0
+        self._reserve1 = reserve1
+        self._state_version = next_state_version()
+        if self._mirror is not None:
+            mirror, row = self._mirror
+            mirror.set_reserves(row, reserve0, reserve1)
+        if block_number is not None:
+            self._block_number = block_number
+
+    def attach_mirror(self, mirror, row: int) -> None:
+        """
+        Copy the reserves into a PoolStateMirror row on every update.
+
+        Args:
+            mirror: PoolStateMirror (None to detach)
+            row: Row of this pool in the mirror
+        """
+        self._mirror = (mirror, row) if mirror is not None else None
+
+    def copy(self) -> 'V2Pool':
+        """Get an independent copy of the pool, detached from the float mirror."""
+        clone = copy.copy(self)
+        clone._mirror = None
+        return clone
+
+    def apply_swap(self, amount_in: int, zero_for_one: bool) -> int:
+        """
+        Swap an exact input amount and move the reserves accordingly.
+
+        Args:
+            amount_in: Input amount in wei units
+            zero_for_one: True to sell token0 for token1
+
+        Returns:
+            Output amount in wei units
+        """
+        amount_out = self.get_amount_out(amount_in, zero_for_one)
+        if zero_for_one:
+            self.update_reserves(self._reserve0 + amount_in, self._reserve1 - amount_out)
+        else:
+            self.update_reserves(self._reserve0 - amount_out, self._reserve1 + amount_in)
+        return amount_out
+
+    def _swap_reserves(self, zero_for_one: bool) -> Tuple[int, int]:
+        """Get the (reserve in, reserve out) of a swap direction."""
+        if zero_for_one:
+            return self._reserve0, self._reserve1
+        return self._reserve1, self._reserve0
+
+    def get_amount_out(self, amount_in: int, zero_for_one: bool) -> int:
+        """
+        Get the output amount of an exact-input swap, as V2_core.getAmountsOut computes it.
+
+        Args:
+            amount_in: Input amount in wei units
+            zero_for_one: True to sell token0 for token1
+
+        Returns:
+            Output amount in wei units
+        """
+        reserve_in, reserve_out = self._swap_reserves(zero_for_one)
+        if amount_in <= 0:
+            raise ValueError("INSUFFICIENT_INPUT_AMOUNT")
+        if reserve_in <= 0 or reserve_out <= 0:
+            raise ValueError("INSUFFICIENT_LIQUIDITY")
+
+        amount_in_with_fee = amount_in * self._fee_multiplier
+        numerator = amount_in_with_fee * reserve_out
+        denominator = reserve_in * 10000 + amount_in_with_fee
+        return numerator // denominator
+
+    def get_amount_in(self, amount_out: int, zero_for_one: bool) -> int:
+        """
+        Get the smallest input amount for which get_amount_out returns at least amount_out.
+
+        Args:
+            amount_out: Desired output amount in wei units
+            zero_for_one: True to sell token0 for token1
+
+        Returns:
+            Input amount in wei units
+        """
+        reserve_in, reserve_out = self._swap_reserves(zero_for_one)
+        if amount_out <= 0:
+            raise ValueError("INSUFFICIENT_OUTPUT_AMOUNT")
+        if reserve_in <= 0 or reserve_out <= amount_out:
+            raise ValueError("INSUFFICIENT_LIQUIDITY")
+
+        numerator = reserve_in * amount_out * 10000
+        denominator = (reserve_out - amount_out) * self._fee_multiplier
+        return -(-numerator // denominator)
+
+    def get_amounts_out(
+        self, amounts_in: Union[Sequence[int], np.ndarray], zero_for_one: bool
+    ) -> Union[List[int], np.ndarray]:
+        """
+        Get the output amounts of many exact-input swaps against the current reserves.
+
+        The arithmetic runs elementwise on a NumPy object array, so every
+        amount stays an exact Python integer.
+
+        Args:
+            amounts_in: Input amounts in wei units (amounts <= 0 give 0)
+            zero_for_one: True to sell token0 for token1
+
+        Returns:
+            Output amounts, as an object array if amounts_in is an ndarray, else as a list
+        """
+        reserve_in, reserve_out = self._swap_reserves(zero_for_one)
+        amounts = np.asarray(amounts_in, dtype=object)
+        if reserve_in <= 0 or reserve_out <= 0:
+            raise ValueError("INSUFFICIENT_LIQUIDITY")
+
+        amounts = np.where(amounts > 0, amounts, 0)
+        amounts_with_fee = amounts * self._fee_multiplier
+        amounts_out = amounts_with_fee * reserve_out // (amounts_with_fee + reserve_in * 10000)
+        return amounts_out if isinstance(amounts_in, np.ndarray) else amounts_out.tolist()
+
+    def get_amounts_in(
+        self, amounts_out: Union[Sequence[int], np.ndarray], zero_for_one: bool
+    ) -> Union[List[int], np.ndarray]:
+        """
+        Get the input amounts of many exact-output swaps against the current reserves.
+
+        Args:
+            amounts_out: Desired output amounts in wei units (amounts <= 0 give 0)
+            zero_for_one: True to sell token0 for token1
+
+        Returns:
+            Input amounts, as an object array if amounts_out is an ndarray, else as a list
+        """
+        reserve_in, reserve_out = self._swap_reserves(zero_for_one)
+        amounts = np.asarray(amounts_out, dtype=object)
+        if reserve_in <= 0 or (amounts >= reserve_out).any():
+            raise ValueError("INSUFFICIENT_LIQUIDITY")
+
+        positive = amounts > 0
+        amounts = np.where(positive, amounts, 0)
+        amounts_in = -(-reserve_in * 10000 * amounts // ((reserve_out - amounts) * self._fee_multiplier))
+        amounts_in = np.where(positive, amounts_in, 0)
+        return amounts_in if isinstance(amounts_out, np.ndarray) else amounts_in.tolist()
@@ -0,0 +1,339 @@
+""" Uniswap V3 swap math (SqrtPriceMath, SwapMath and TickMath) on Python integers """
+
+from functools import lru_cache
+from typing import List, Tuple
+
+Q96 = 1 << 96
+MAX_UINT160 = (1 << 160) - 1
+MAX_UINT256 = (1 << 256) - 1
+
+MIN_TICK = -887272
+MAX_TICK = -MIN_TICK
+MIN_SQRT_RATIO = 4295128739
+MAX_SQRT_RATIO = 1461446703485210103287273052203988822378723970342
+
+# Fees are in hundredths of a bip (e.g., 3000 for 0.3%)
+FEE_DENOMINATOR = 1_000_000
+
+
+def mul_div(a: int, b: int, denominator: int) -> int:
+    """FullMath.mulDiv: floor(a * b / denominator)."""
+    return a * b // denominator
+
+
+def mul_div_rounding_up(a: int, b: int, denominator: int) -> int:
+    """FullMath.mulDivRoundingUp: ceil(a * b / denominator)."""
+    return -(-a * b // denominator)
+
+
+def div_rounding_up(x: int, y: int) -> int:
+    """UnsafeMath.divRoundingUp: ceil(x / y)."""
+    return -(-x // y)
+
+
+# ---------------------------------------------------------------------------
+# TickMath
+# ---------------------------------------------------------------------------
+
+# Q128.128 factors sqrt(1.0001)^-(2^i) of TickMath.getSqrtRatioAtTick, for bits 1 .. 19 of |tick|
+_SQRT_RATIO_FACTORS = (
+    0xfff97272373d413259a46990580e213a,
+    0xfff2e50f5f656932ef12357cf3c7fdcc,
+    0xffe5caca7e10e4e61c3624eaa0941cd0,
+    0xffcb9843d60f6159c9db58835c926644,
+    0xff973b41fa98c081472e6896dfb254c0,
+    0xff2ea16466c96a3843ec78b326b52861,
+    0xfe5dee046a99a2a811c461f1969c3053,
+    0xfcbe86c7900a88aedcffc83b479aa3a4,
+    0xf987a7253ac413176f2b074cf7815e54,
+    0xf3392b0822b70005940c7a398e4b70f3,
+    0xe7159475a2c29b7443b29c7fa6e889d9,
+    0xd097f3bdfd2022b8845ad8f792aa5825,
+    0xa9f746462d870fdf8a65dc1f90e061e5,
+    0x70d869a156d2a1b890bb3df62baf32f7,
+    0x31be135f97d08fd981231505542fcfa6,
+    0x9aa508b5b7a84e1c677de54f3e99bc9,
+    0x5d6af8dedb81196699c329225ee604,
+    0x2216e584f5fa1ea926041bedfe98,
+    0x48a170391f7dc42444e8fa2,
+)
+
+
+def get_sqrt_ratio_at_tick(tick: int) -> int:
+    """
+    Get sqrt(1.0001^tick) * 2^96, bit-identical to TickMath.getSqrtRatioAtTick.
+
+    Args:
+        tick: Tick between MIN_TICK and MAX_TICK
+
+    Returns:
+        Sqrt price as a Q64.96 integer
+    """
+    abs_tick = -tick if tick < 0 else tick
+    if abs_tick > MAX_TICK:
+        raise ValueError(f"Tick out of range: {tick}")
+
+    ratio = 0xfffcb933bd6fad37aa2d162d1a594001 if abs_tick & 0x1 else 0x100000000000000000000000000000000
+    bits = abs_tick >> 1
+    for factor in _SQRT_RATIO_FACTORS:
+        if not bits:
+            break
+        if bits & 1:
+            ratio = (ratio * factor) >> 128
+        bits >>= 1
+
+    if tick > 0:
+        ratio = MAX_UINT256 // ratio
+
+    # Q128.128 -> Q64.96, rounding up so get_tick_at_sqrt_ratio of the result is consistent
+    return (ratio >> 32) + (1 if ratio & 0xFFFFFFFF else 0)
+
+
+def get_tick_at_sqrt_ratio(sqrt_price_x96: int) -> int:
+    """
+    Get the greatest tick whose sqrt ratio is less than or equal to a sqrt price, bit-identical to TickMath.getTickAtSqrtRatio.
+
+    Args:
+        sqrt_price_x96: Sqrt price as a Q64.96 integer
+
+    Returns:
+        Tick
+    """
+    if not MIN_SQRT_RATIO <= sqrt_price_x96 < MAX_SQRT_RATIO:
+        raise ValueError(f"Sqrt price out of range: {sqrt_price_x96}")
+
+    ratio = sqrt_price_x96 << 32
+    msb = ratio.bit_length() - 1
+    r = ratio >> (msb - 127) if msb >= 128 else ratio << (127 - msb)
+
+    # Integer part of log2 from the msb, then 14 fractional bits by repeated squaring
+    log_2 = (msb - 128) << 64
+    for bit in range(63, 49, -1):
+        r = (r * r) >> 127
+        f = r >> 128
+        log_2 |= f << bit
+        r >>= f
+
+    log_sqrt10001 = log_2 * 255738958999603826347141  # Q128.128
+
+    tick_low = (log_sqrt10001 - 3402992956809132418596140100660247210) >> 128
+    tick_high = (log_sqrt10001 + 291339464771989622907027621153398088495) >> 128
+    if tick_low == tick_high:
+        return tick_low
+    return tick_high if get_sqrt_ratio_at_tick(tick_high) <= sqrt_price_x96 else tick_low
+
+
+class SqrtRatioTable:
+    """
+    Precomputed get_sqrt_ratio_at_tick for every multiple of one tick spacing.
+
+    A swap only evaluates the sqrt ratio at initialized ticks and bitmap
+    word boundaries, which are all multiples of the pool's tick spacing,
+    so hot pools can trade the multiply chain for a list lookup. Other
+    ticks (e.g. MIN_TICK / MAX_TICK) fall back to the computation.
+    """
+
+    def __init__(self, tick_spacing: int):
+        """
+        Build the table.
+
+        Args:
+            tick_spacing: Tick spacing of the pools using the table
+        """
+        if tick_spacing <= 0:
+            raise ValueError(f"Invalid tick spacing: {tick_spacing}")
+        self.tick_spacing = tick_spacing
+        self.min_compressed = -(MAX_TICK // tick_spacing)
+        self.ratios: List[int] = [
+            get_sqrt_ratio_at_tick(compressed * tick_spacing)
+            for compressed in range(self.min_compressed, -self.min_compressed + 1)
+        ]
+
+    def get(self, tick: int) -> int:
+        """
+        Get the sqrt ratio at a tick.
+
+        Args:
+            tick: Tick between MIN_TICK and MAX_TICK
+
+        Returns:
+            Sqrt price as a Q64.96 integer
+        """
+        compressed, remainder = divmod(tick, self.tick_spacing)
+        index = compressed - self.min_compressed
+        if remainder or not 0 <= index < len(self.ratios):
+            return get_sqrt_ratio_at_tick(tick)
+        return self.ratios[index]
+
+
+@lru_cache(maxsize=None)
+def sqrt_ratio_table(tick_spacing: int) -> SqrtRatioTable:
+    """
+    Get the shared table of a tick spacing, building it on first use.
+
+    Args:
+        tick_spacing: Tick spacing
+
+    Returns:
+        SqrtRatioTable shared by all pools with this spacing
+    """
+    return SqrtRatioTable(tick_spacing)
+
+
+# ---------------------------------------------------------------------------
+# SqrtPriceMath
+# ---------------------------------------------------------------------------
+
+def get_next_sqrt_price_from_amount0_rounding_up(sqrt_price_x96: int, liquidity: int, amount: int, add: bool) -> int:
+    """Get the sqrt price after adding or removing an amount of token0, rounded up."""
+    if amount == 0:
+        return sqrt_price_x96
+
+    numerator1 = liquidity << 96
+    product = amount * sqrt_price_x96
+    if add:
+        # The contract falls back to a less precise formula when the product overflows 256 bits
+        if product <= MAX_UINT256 and numerator1 + product <= MAX_UINT256:
+            return mul_div_rounding_up(numerator1, sqrt_price_x96, numerator1 + product)
+        return div_rounding_up(numerator1, numerator1 // sqrt_price_x96 + amount)
+
+    if product > MAX_UINT256 or numerator1 <= product:
+        raise ValueError("Not enough liquidity for the token0 amount")
+    next_sqrt_price = mul_div_rounding_up(numerator1, sqrt_price_x96, numerator1 - product)
+    if next_sqrt_price > MAX_UINT160:
+        raise ValueError("Sqrt price overflows uint160")
+    return next_sqrt_price
+
+
+def get_next_sqrt_price_from_amount1_rounding_down(sqrt_price_x96: int, liquidity: int, amount: int, add: bool) -> int:
+    """Get the sqrt price after adding or removing an amount of token1, rounded down."""
+    if add:
+        next_sqrt_price = sqrt_price_x96 + (amount << 96) // liquidity
+        if next_sqrt_price > MAX_UINT160:
+            raise ValueError("Sqrt price overflows uint160")
+        return next_sqrt_price
+
+    quotient = div_rounding_up(amount << 96, liquidity)
+    if sqrt_price_x96 <= quotient:
+        raise ValueError("Not enough liquidity for the token1 amount")
+    return sqrt_price_x96 - quotient
+
+
+def get_next_sqrt_price_from_input(sqrt_price_x96: int, liquidity: int, amount_in: int, zero_for_one: bool) -> int:
+    """Get the sqrt price after swapping an input amount (rounded so it does not pass the target)."""
+    if sqrt_price_x96 <= 0 or liquidity <= 0:
+        raise ValueError("Invalid sqrt price or liquidity")
+    if zero_for_one:
+        return get_next_sqrt_price_from_amount0_rounding_up(sqrt_price_x96, liquidity, amount_in, True)
+    return get_next_sqrt_price_from_amount1_rounding_down(sqrt_price_x96, liquidity, amount_in, True)
+
+
+def get_next_sqrt_price_from_output(sqrt_price_x96: int, liquidity: int, amount_out: int, zero_for_one: bool) -> int:
+    """Get the sqrt price after swapping for an output amount (rounded so it passes the target)."""
+    if sqrt_price_x96 <= 0 or liquidity <= 0:
+        raise ValueError("Invalid sqrt price or liquidity")
+    if zero_for_one:
+        return get_next_sqrt_price_from_amount1_rounding_down(sqrt_price_x96, liquidity, amount_out, False)
+    return get_next_sqrt_price_from_amount0_rounding_up(sqrt_price_x96, liquidity, amount_out, False)
+
+
+def get_amount0_delta(sqrt_ratio_a_x96: int, sqrt_ratio_b_x96: int, liquidity: int, round_up: bool) -> int:
+    """Get the token0 amount between two sqrt prices."""
+    if sqrt_ratio_a_x96 > sqrt_ratio_b_x96:
+        sqrt_ratio_a_x96, sqrt_ratio_b_x96 = sqrt_ratio_b_x96, sqrt_ratio_a_x96
+    if sqrt_ratio_a_x96 <= 0:
+        raise ValueError("Invalid sqrt price")
+
+    numerator1 = liquidity << 96
+    numerator2 = sqrt_ratio_b_x96 - sqrt_ratio_a_x96
+    if round_up:
+        return div_rounding_up(mul_div_rounding_up(numerator1, numerator2, sqrt_ratio_b_x96), sqrt_ratio_a_x96)
+    return mul_div(numerator1, numerator2, sqrt_ratio_b_x96) // sqrt_ratio_a_x96
+
+
+def get_amount1_delta(sqrt_ratio_a_x96: int, sqrt_ratio_b_x96: int, liquidity: int, round_up: bool) -> int:
+    """Get the token1 amount between two sqrt prices."""
+    if sqrt_ratio_a_x96 > sqrt_ratio_b_x96:
+        sqrt_ratio_a_x96, sqrt_ratio_b_x96 = sqrt_ratio_b_x96, sqrt_ratio_a_x96
+    if round_up:
+        return mul_div_rounding_up(liquidity, sqrt_ratio_b_x96 - sqrt_ratio_a_x96, Q96)
+    return mul_div(liquidity, sqrt_ratio_b_x96 - sqrt_ratio_a_x96, Q96)
+
+
+# ---------------------------------------------------------------------------
+# SwapMath
+# ---------------------------------------------------------------------------
+
+def compute_swap_step(
+    sqrt_price_current_x96: int,
+    sqrt_price_target_x96: int,
+    liquidity: int,
+    amount_remaining: int,
+    fee_pips: int
+) -> Tuple[int, int, int, int]:
+    """
+    Compute one swap step within a single liquidity range (SwapMath.computeSwapStep).
+
+    Args:
+        sqrt_price_current_x96: Current sqrt price
+        sqrt_price_target_x96: Sqrt price the step may not pass
+        liquidity: Active liquidity
+        amount_remaining: Input left to swap (exact input, >= 0) or negated output left to receive (exact output)
+        fee_pips: Pool fee in hundredths of a bip
+
+    Returns:
+        (sqrt price after the step, amount in, amount out, fee amount)
+    """
+    zero_for_one = sqrt_price_current_x96 >= sqrt_price_target_x96
+    exact_in = amount_remaining >= 0
+    amount_in = 0
+    amount_out = 0
+
+    if exact_in:
+        amount_remaining_less_fee = mul_div(amount_remaining, FEE_DENOMINATOR - fee_pips, FEE_DENOMINATOR)
+        if zero_for_one:
+            amount_in = get_amount0_delta(sqrt_price_target_x96, sqrt_price_current_x96, liquidity, True)
+        else:
+            amount_in = get_amount1_delta(sqrt_price_current_x96, sqrt_price_target_x96, liquidity, True)
+        if amount_remaining_less_fee >= amount_in:
+            sqrt_price_next_x96 = sqrt_price_target_x96
+        else:
+            sqrt_price_next_x96 = get_next_sqrt_price_from_input(
+                sqrt_price_current_x96, liquidity, amount_remaining_less_fee, zero_for_one
+            )
+    else:
+        if zero_for_one:
+            amount_out = get_amount1_delta(sqrt_price_target_x96, sqrt_price_current_x96, liquidity, False)
+        else:
+            amount_out = get_amount0_delta(sqrt_price_current_x96, sqrt_price_target_x96, liquidity, False)
+        if -amount_remaining >= amount_out:
+            sqrt_price_next_x96 = sqrt_price_target_x96
+        else:
+            sqrt_price_next_x96 = get_next_sqrt_price_from_output(
+                sqrt_price_current_x96, liquidity, -amount_remaining, zero_for_one
+            )
+
+    reached_target = sqrt_price_target_x96 == sqrt_price_next_x96
+
+    if zero_for_one:
+        if not (reached_target and exact_in):
+            amount_in = get_amount0_delta(sqrt_price_next_x96, sqrt_price_current_x96, liquidity, True)
+        if not (reached_target and not exact_in):
+            amount_out = get_amount1_delta(sqrt_price_next_x96, sqrt_price_current_x96, liquidity, False)
+    else:
+        if not (reached_target and exact_in):
+            amount_in = get_amount1_delta(sqrt_price_current_x96, sqrt_price_next_x96, liquidity, True)
+        if not (reached_target and not exact_in):
+            amount_out = get_amount0_delta(sqrt_price_current_x96, sqrt_price_next_x96, liquidity, False)
+
+    # Cap the output amount to not exceed the remaining output amount
+    if not exact_in and amount_out > -amount_remaining:
+        amount_out = -amount_remaining
+
+    if exact_in and sqrt_price_next_x96 != sqrt_price_target_x96:
+        # Whatever input was not used to move the price is taken as fee
+        fee_amount = amount_remaining - amount_in
+    else:
+        fee_amount = mul_div_rounding_up(amount_in, fee_pips, FEE_DENOMINATOR - fee_pips)
+
+    return sqrt_price_next_x96, amount_in, amount_out, fee_amount
@@ -0,0 +1,356 @@
+""" Uniswap V3 Pool Implementation """
+
+import copy
+from decimal import Decimal
+from typing import Dict, Optional, Tuple
+
+from domain.entities.models import V3SwapQuote
+from domain.entities.pool_models import IV3Pool, next_state_version
+from infrastructure.data_providers.pools.tick_index import TickIndex
+from infrastructure.data_providers.pools.v3_math import FEE_DENOMINATOR, Q96, get_sqrt_ratio_at_tick, sqrt_ratio_table
+from infrastructure.data_providers.pools.v3_swap import quote_exact_input, quote_exact_output, simulate_swap
+
+
+class V3Pool(IV3Pool):
+    def __init__(
+        self,
+        address: str,
+        token0: str,
+        token1: str,
+        sqrt_price_x96: int,
+        tick: int,
+        liquidity: int,
+        tick_spacing: int,
+        ticks: Optional[Dict[int, int]] = None,
+        fee: float = 0.003,  # Default fee is 0.3%
+        decimals0: int = 18,
+        decimals1: int = 18,
+        block_number: int = None,
+        protocol: str = "uniswap_v3",
+        use_sqrt_ratio_table: bool = False
+    ):
+        """
+        Initialize a V3 pool.
+
+        Args:
+            address: Pool contract address
+            token0: Address of token0
+            token1: Address of token1
+            sqrt_price_x96: Current sqrt price (slot0.sqrtPriceX96)
+            tick: Current tick (slot0.tick)
+            liquidity: Active liquidity
+            tick_spacing: Tick spacing of the fee tier
+            ticks: Initialized tick -> liquidityNet
+            fee: Fee percentage as a decimal (e.g., 0.003 for 0.3%)
+            decimals0: Decimals for token0 (default: 18)
+            decimals1: Decimals for token1 (default: 18)
+            use_sqrt_ratio_table: Look tick sqrt ratios up in the shared table of the tick spacing
+        """
+        if tick_spacing <= 0:
+            raise ValueError(f"Invalid tick spacing: {tick_spacing}")
+
+        self._address = address
+        self._token0 = token0
+        self._token1 = token1
+        self._sqrt_price_x96 = sqrt_price_x96
+        self._tick = tick
+        self._liquidity = liquidity
+        self._tick_spacing = tick_spacing
+        self._fee = fee
+        self._decimals0 = decimals0
+        self._decimals1 = decimals1
+        self._block_number = block_number
+        self._protocol = protocol
+        self._state_version = next_state_version()
+
+        # Fee in hundredths of a bip for integer arithmetic, e.g., 3000 for 0.3%
+        self._fee_pips = int(round(fee * FEE_DENOMINATOR))
+
+        self._sqrt_ratio_at_tick = get_sqrt_ratio_at_tick
+        if use_sqrt_ratio_table:
+            self.use_sqrt_ratio_table()
+
+        self._tick_index = TickIndex(tick_spacing, ticks)
+        # Set on copies: the tick index is shared until one side changes its ticks
+        self._shares_tick_index = False
+
+    @property
+    def block_number(self) -> int:
+        """Get the block number."""
+        return self._block_number
+
+    @property
+    def protocol(self) -> str:
+        """Get the protocol name."""
+        return self._protocol
+
+    @property
+    def state_version(self) -> int:
+        """Get the version of the pool state, changed on every slot0, liquidity or tick update."""
+        return self._state_version
+
+    @property
+    def decimals0(self) -> int:
+        """Get the decimals for token0."""
+        return self._decimals0
+
+    @property
+    def decimals1(self) -> int:
+        """Get the decimals for token1."""
+        return self._decimals1
+
+    @property
+    def address(self) -> str:
+        """Get the pool contract address."""
+        return self._address
+
+    @property
+    def token0(self) -> str:
+        """Get the address of token0."""
+        return self._token0
+
+    @property
+    def token1(self) -> str:
+        """Get the address of token1."""
+        return self._token1
+
+    @property
+    def fee(self) -> float:
+        """Get the fee as a decimal (e.g., 0.003 for 0.3%)."""
+        return self._fee
+
+    @property
+    def fee_pips(self) -> int:
+        """Get the fee in hundredths of a bip (e.g., 3000 for 0.3%)."""
+        return self._fee_pips
+
+    @property
+    def sqrt_price_x96(self) -> int:
+        """Get the current sqrt price as a Q64.96 integer."""
+        return self._sqrt_price_x96
+
+    @property
+    def tick(self) -> int:
+        """Get the current tick."""
+        return self._tick
+
+    @property
+    def liquidity(self) -> int:
+        """Get the active liquidity."""
+        return self._liquidity
+
+    @property
+    def tick_spacing(self) -> int:
+        """Get the tick spacing."""
+        return self._tick_spacing
+
+    @property
+    def ticks(self) -> Dict[int, int]:
+        """Get the initialized ticks as tick -> liquidityNet."""
+        return self._tick_index.to_dict()
+
+    @property
+    def price0(self) -> Decimal:
+        """Price of token0 in terms of token1."""
+        return (Decimal(self._sqrt_price_x96) / Decimal(Q96)) ** 2 / Decimal(10) ** (self.decimals1 - self.decimals0)
+
+    @property
+    def price1(self) -> Decimal:
+        """Price of token1 in terms of token0."""
+        if self._sqrt_price_x96 == 0:
+            return Decimal(0)
+        return (Decimal(Q96) / Decimal(self._sqrt_price_x96)) ** 2 / Decimal(10) ** (self.decimals0 - self.decimals1)
+
+    def get_price(self) -> Decimal:
+        """
+        Get the current price (token1/token0).
+
+        Returns:
+            Current price as token1/token0
+        """
+        return self.price0
+
+    def use_sqrt_ratio_table(self) -> None:
+        """Switch tick sqrt ratios to the precomputed table of the pool's tick spacing (built on first use)."""
+        self._sqrt_ratio_at_tick = sqrt_ratio_table(self._tick_spacing).get
+
+    def update_state(
+        self, sqrt_price_x96: int, tick: int, liquidity: int, block_number: Optional[int] = None
+    ) -> None:
+        """
+        Set slot0 and the active liquidity to a new on-chain state.
+
+        Args:
+            sqrt_price_x96: Sqrt price as a Q64.96 integer
+            tick: Current tick
+            liquidity: Active liquidity
+            block_number: Block the state was observed at
+        """
+        self._sqrt_price_x96 = sqrt_price_x96
+        self._tick = tick
+        self._liquidity = liquidity
+        self._state_version = next_state_version()
+        if block_number is not None:
+            self._block_number = block_number
+
+    @property
+    def tick_index(self) -> TickIndex:
+        """Get the initialized-tick index (change it through the pool methods, so state_version follows)."""
+        return self._tick_index
+
+    def _own_tick_index(self) -> None:
+        """Copy a shared tick index before changing it."""
+        if self._shares_tick_index:
+            self._tick_index = self._tick_index.copy()
+            self._shares_tick_index = False
+
+    def copy(self) -> 'V3Pool':
+        """Get an independent copy of the pool; the tick index is copied only once either side changes its ticks."""
+        clone = copy.copy(self)
+        clone._shares_tick_index = True
+        self._shares_tick_index = True
+        return clone
+
+    def set_ticks(self, ticks: Dict[int, int]) -> None:
+        """
+        Replace the initialized tick table.
+
+        Args:
+            ticks: Initialized tick -> liquidityNet
+        """
+        self._own_tick_index()
+        self._tick_index.set_ticks(ticks)
+        self._state_version = next_state_version()
+
+    def update_tick(self, tick: int, liquidity_net_delta: int) -> None:
+        """
+        Add to the liquidityNet of a tick.
+
+        Args:
+            tick: Tick (a multiple of the tick spacing)
+            liquidity_net_delta: Change of liquidityNet
+        """
+        self._own_tick_index()
+        self._tick_index.update(tick, liquidity_net_delta)
+        self._state_version = next_state_version()
+
+    def update_position(self, tick_lower: int, tick_upper: int, liquidity_delta: int) -> None:
+        """
+        Apply a Mint (liquidity_delta > 0) or Burn (< 0) of a position.
+
+        Args:
+            tick_lower: Lower tick of the position
+            tick_upper: Upper tick of the position
+            liquidity_delta: Change of the position liquidity
+        """
+        self._own_tick_index()
+        self._tick_index.update(tick_lower, liquidity_delta)
+        self._tick_index.update(tick_upper, -liquidity_delta)
+        if tick_lower <= self._tick < tick_upper:
+            self._liquidity += liquidity_delta
+        self._state_version = next_state_version()
+
+    def next_initialized_tick_within_one_word(self, tick: int, lte: bool) -> Tuple[int, bool]:
+        """
+        Find the next initialized tick within the same 256-tick bitmap word.
+
+        Args:
+            tick: Starting tick
+            lte: Search at or below the tick (zero for one) instead of above it
+
+        Returns:
+            (next tick, whether it is initialized)
+        """
+        return self._tick_index.next_initialized_tick_within_one_word(tick, lte)
+
+    def simulate_swap(
+        self, amount_specified: int, zero_for_one: bool, sqrt_price_limit_x96: Optional[int] = None
+    ) -> V3SwapQuote:
+        """
+        Simulate UniswapV3Pool.swap without changing the pool state.
+
+        Args:
+            amount_specified: Exact input amount (> 0) or negated exact output amount (< 0)
+            zero_for_one: True to sell token0 for token1
+            sqrt_price_limit_x96: Sqrt price the swap may not pass (the range bound if None)
+
+        Returns:
+            V3SwapQuote, possibly partially filled if the price limit was reached
+        """
+        return simulate_swap(
+            self._sqrt_price_x96, self._tick, self._liquidity, self._tick_index, self._fee_pips,
+            amount_specified, zero_for_one, sqrt_price_limit_x96, self._sqrt_ratio_at_tick
+        )
+
+    def quote_exact_input(self, amount_in: int, zero_for_one: bool) -> V3SwapQuote:
+        """
+        Quote an exact-input swap.
+
+        Args:
+            amount_in: Input amount in wei units
+            zero_for_one: True to sell token0 for token1
+
+        Returns:
+            V3SwapQuote with the output amount, final sqrt price, tick and ticks crossed
+        """
+        return quote_exact_input(
+            self._sqrt_price_x96, self._tick, self._liquidity, self._tick_index, self._fee_pips,
+            amount_in, zero_for_one, self._sqrt_ratio_at_tick
+        )
+
+    def quote_exact_output(self, amount_out: int, zero_for_one: bool) -> V3SwapQuote:
+        """
+        Quote an exact-output swap.
+
+        Args:
+            amount_out: Desired output amount in wei units
+            zero_for_one: True to sell token0 for token1
+
+        Returns:
+            V3SwapQuote with the required input, final sqrt price, tick and ticks crossed
+        """
+        return quote_exact_output(
+            self._sqrt_price_x96, self._tick, self._liquidity, self._tick_index, self._fee_pips,
+            amount_out, zero_for_one, self._sqrt_ratio_at_tick
+        )
+
+    def get_amount_out(self, amount_in: int, zero_for_one: bool) -> int:
+        """
+        Get the output amount of an exact-input swap, crossing initialized ticks as needed.
+
+        Args:
+            amount_in: Input amount in wei units
+            zero_for_one: True to sell token0 for token1
+
+        Returns:
+            Output amount in wei units
+        """
+        return self.quote_exact_input(amount_in, zero_for_one).amount_out
+
+    def get_amount_in(self, amount_out: int, zero_for_one: bool) -> int:
+        """
+        Get the input amount needed for an exact-output swap, crossing initialized ticks as needed.
+
+        Args:
+            amount_out: Desired output amount in wei units
+            zero_for_one: True to sell token0 for token1
+
+        Returns:
+            Input amount in wei units
+        """
+        return self.quote_exact_output(amount_out, zero_for_one).amount_in
+
+    def apply_swap(self, amount_in: int, zero_for_one: bool) -> int:
+        """
+        Swap an exact input amount and move slot0 and the active liquidity accordingly.
+
+        Args:
+            amount_in: Input amount in wei units
+            zero_for_one: True to sell token0 for token1
+
+        Returns:
+            Output amount in wei units
+        """
+        quote = self.quote_exact_input(amount_in, zero_for_one)
+        self.update_state(quote.sqrt_price_x96, quote.tick, quote.liquidity)
+        return quote.amount_out
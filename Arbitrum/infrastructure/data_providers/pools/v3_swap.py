@@ -0,0 +1,172 @@
+""" Uniswap V3 swap simulation over a TickIndex """
+
+from typing import Callable, Optional
+
+from domain.entities.models import V3SwapQuote
+from infrastructure.data_providers.pools.tick_index import TickIndex
+from infrastructure.data_providers.pools.v3_math import (
+    MIN_TICK, MAX_TICK, MIN_SQRT_RATIO, MAX_SQRT_RATIO,
+    compute_swap_step, get_sqrt_ratio_at_tick, get_tick_at_sqrt_ratio,
+)
+
+
+def simulate_swap(
+    sqrt_price_x96: int,
+    tick: int,
+    liquidity: int,
+    tick_index: TickIndex,
+    fee_pips: int,
+    amount_specified: int,
+    zero_for_one: bool,
+    sqrt_price_limit_x96: Optional[int] = None,
+    sqrt_ratio_at_tick: Callable[[int], int] = get_sqrt_ratio_at_tick
+) -> V3SwapQuote:
+    """
+    Replay the UniswapV3Pool.swap loop on a pool state without changing it.
+
+    Each step ends at the next initialized tick or bitmap word boundary, as
+    in the contract, and crossing an initialized tick applies its
+    liquidityNet. The swap stops early at the price limit, so the quote may
+    be partially filled.
+
+    Args:
+        sqrt_price_x96: Current sqrt price
+        tick: Current tick
+        liquidity: Active liquidity
+        tick_index: Initialized ticks of the pool
+        fee_pips: Pool fee in hundredths of a bip
+        amount_specified: Exact input amount (> 0) or negated exact output amount (< 0)
+        zero_for_one: True to sell token0 for token1
+        sqrt_price_limit_x96: Sqrt price the swap may not pass (the range bound if None)
+        sqrt_ratio_at_tick: Tick to sqrt price function (e.g. a SqrtRatioTable lookup)
+
+    Returns:
+        V3SwapQuote
+    """
+    if amount_specified == 0:
+        raise ValueError("Amount specified must not be zero")
+    if sqrt_price_limit_x96 is None:
+        sqrt_price_limit_x96 = MIN_SQRT_RATIO + 1 if zero_for_one else MAX_SQRT_RATIO - 1
+
+    exact_input = amount_specified > 0
+    amount_remaining = amount_specified
+    amount_calculated = 0
+    ticks_crossed = 0
+
+    next_initialized_tick = tick_index.next_initialized_tick_within_one_word
+    liquidity_net_at = tick_index.liquidity_net
+
+    while amount_remaining != 0 and sqrt_price_x96 != sqrt_price_limit_x96:
+        sqrt_price_start_x96 = sqrt_price_x96
+        tick_next, initialized = next_initialized_tick(tick, zero_for_one)
+        tick_next = max(MIN_TICK, min(MAX_TICK, tick_next))
+        sqrt_price_next_x96 = sqrt_ratio_at_tick(tick_next)
+
+        if zero_for_one:
+            sqrt_price_target_x96 = max(sqrt_price_next_x96, sqrt_price_limit_x96)
+        else:
+            sqrt_price_target_x96 = min(sqrt_price_next_x96, sqrt_price_limit_x96)
+
+        sqrt_price_x96, amount_in, amount_out, fee_amount = compute_swap_step(
+            sqrt_price_x96, sqrt_price_target_x96, liquidity, amount_remaining, fee_pips
+        )
+
+        if exact_input:
+            amount_remaining -= amount_in + fee_amount
+            amount_calculated += amount_out
+        else:
+            amount_remaining += amount_out
+            amount_calculated += amount_in + fee_amount
+
+        if sqrt_price_x96 == sqrt_price_next_x96:
+            if initialized:
+                liquidity_net = liquidity_net_at(tick_next)
+                liquidity += -liquidity_net if zero_for_one else liquidity_net
+                if liquidity < 0:
+                    raise ValueError(f"Negative liquidity after crossing tick {tick_next}")
+                ticks_crossed += 1
+            tick = tick_next - 1 if zero_for_one else tick_next
+        elif sqrt_price_x96 != sqrt_price_start_x96:
+            tick = get_tick_at_sqrt_ratio(sqrt_price_x96)
+
+    if exact_input:
+        amount_in, amount_out = amount_specified - amount_remaining, amount_calculated
+    else:
+        amount_in, amount_out = amount_calculated, -amount_specified + amount_remaining
+    return V3SwapQuote(amount_in, amount_out, sqrt_price_x96, tick, liquidity, ticks_crossed)
+
+
+def quote_exact_input(
+    sqrt_price_x96: int,
+    tick: int,
+    liquidity: int,
+    tick_index: TickIndex,
+    fee_pips: int,
+    amount_in: int,
+    zero_for_one: bool,
+    sqrt_ratio_at_tick: Callable[[int], int] = get_sqrt_ratio_at_tick
+) -> V3SwapQuote:
+    """
+    Quote a swap of an exact input amount.
+
+    Args:
+        sqrt_price_x96: Current sqrt price
+        tick: Current tick
+        liquidity: Active liquidity
+        tick_index: Initialized ticks of the pool
+        fee_pips: Pool fee in hundredths of a bip
+        amount_in: Input amount in wei units, fee included
+        zero_for_one: True to sell token0 for token1
+        sqrt_ratio_at_tick: Tick to sqrt price function
+
+    Returns:
+        V3SwapQuote with the output amount and the state after the swap
+    """
+    if amount_in <= 0:
+        raise ValueError("INSUFFICIENT_INPUT_AMOUNT")
+
+    quote = simulate_swap(
+        sqrt_price_x96, tick, liquidity, tick_index, fee_pips, amount_in, zero_for_one,
+        sqrt_ratio_at_tick=sqrt_ratio_at_tick
+    )
+    if quote.amount_in != amount_in:
+        raise ValueError("INSUFFICIENT_LIQUIDITY")
+    return quote
+
+
+def quote_exact_output(
+    sqrt_price_x96: int,
+    tick: int,
+    liquidity: int,
+    tick_index: TickIndex,
+    fee_pips: int,
+    amount_out: int,
+    zero_for_one: bool,
+    sqrt_ratio_at_tick: Callable[[int], int] = get_sqrt_ratio_at_tick
+) -> V3SwapQuote:
+    """
+    Quote the input needed to receive an exact output amount.
+
+    Args:
+        sqrt_price_x96: Current sqrt price
+        tick: Current tick
+        liquidity: Active liquidity
+        tick_index: Initialized ticks of the pool
+        fee_pips: Pool fee in hundredths of a bip
+        amount_out: Desired output amount in wei units
+        zero_for_one: True to sell token0 for token1
+        sqrt_ratio_at_tick: Tick to sqrt price function
+
+    Returns:
+        V3SwapQuote with the required input (fee included) and the state after the swap
+    """
+    if amount_out <= 0:
+        raise ValueError("INSUFFICIENT_OUTPUT_AMOUNT")
+
+    quote = simulate_swap(
+        sqrt_price_x96, tick, liquidity, tick_index, fee_pips, -amount_out, zero_for_one,
+        sqrt_ratio_at_tick=sqrt_ratio_at_tick
+    )
+    if quote.amount_out != amount_out:
+        raise ValueError("INSUFFICIENT_LIQUIDITY")
+    return quote
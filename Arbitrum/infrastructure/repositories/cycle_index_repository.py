@@ -0,0 +1,132 @@
+"""On-disk snapshots of the price graph and cycle index."""
+
+import hashlib
+import json
+import os
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+from logger import logger
+
+# Bump when the set or meaning of the stored arrays changes
+FORMAT_VERSION = 1
+
+HEADER_FILE = "header.json"
+
+
+def pool_set_hash(pools: Iterable[Tuple[str, str]]) -> str:
+    """
+    Hash a set of pools independently of their order.
+
+    Args:
+        pools: (provider name, pool address) tuples
+
+    Returns:
+        Hex digest
+    """
+    digest = hashlib.sha256()
+    for provider, address in sorted(set(pools)):
+        digest.update(f"{provider}:{address.lower()}\n".encode())
+    return digest.hexdigest()
+
+
+class CycleIndexRepository:
+    """
+    Versioned snapshot of named numpy arrays plus a JSON header.
+
+    Every save writes a new generation of .npy files whose names start with
+    the pool-set hash, then atomically replaces header.json to point at
+    them, and finally deletes the previous generation. Readers therefore
+    never see a half-written snapshot, and arrays of the previous generation
+    that are still memory-mapped stay valid after their files are unlinked.
+
+    Arrays are loaded as copy-on-write memory maps: pages are read on first
+    access and only copied when written.
+    """
+
+    def __init__(self, directory: str):
+        """
+        Initialize the repository.
+
+        Args:
+            directory: Directory holding the snapshot (created on first save)
+        """
+        self.directory = directory
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def save(self, metadata: Dict, arrays: Dict[str, np.ndarray], pool_hash: str) -> None:
+        """
+        Write a new snapshot.
+
+        Args:
+            metadata: JSON-serialisable values (token and pool tables, configuration)
+            arrays: Array name -> array
+            pool_hash: Hash of the pool set the snapshot was built from
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        previous = self._read_header()
+
+        generation = f"{pool_hash[:16]}-{time.time_ns()}"
+        files = {}
+        for name, array in arrays.items():
+            file_name = f"{generation}.{name}.npy"
+            with open(self._path(file_name), "wb") as f:
+                np.save(f, np.ascontiguousarray(array))
+            files[name] = file_name
+
+        header = {
+            "format_version": FORMAT_VERSION,
+            "pool_set_hash": pool_hash,
+            "created_at": time.time(),
+            "files": files,
+            "metadata": metadata,
+        }
+        temp_path = self._path(HEADER_FILE + ".tmp")
+        with open(temp_path, "w") as f:
+            json.dump(header, f)
+        os.replace(temp_path, self._path(HEADER_FILE))
+
+        if previous:
+            for file_name in previous.get("files", {}).values():
+                try:
+                    os.remove(self._path(file_name))
+                except OSError:
+                    pass
+
+    def _read_header(self) -> Optional[Dict]:
+        try:
+            with open(self._path(HEADER_FILE)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.error(f"Unreadable cycle index header in {self.directory}: {e}")
+            return None
+
+    def load(self) -> Optional[Tuple[Dict, Dict[str, np.ndarray]]]:
+        """
+        Memory-map the current snapshot.
+
+        Returns:
+            (header, arrays) or None if there is no usable snapshot
+        """
+        header = self._read_header()
+        if header is None:
+            return None
+        if header.get("format_version") != FORMAT_VERSION:
+            logger.info(f"Ignoring cycle index with format version {header.get('format_version')}")
+            return None
+
+        try:
+            arrays = {
+                name: np.load(self._path(file_name), mmap_mode="c")
+                for name, file_name in header["files"].items()
+            }
+        except (OSError, ValueError, KeyError) as e:
+            logger.error(f"Error loading cycle index from {self.directory}: {e}")
+            return None
+        return header, arrays
@@ -16,9 +16,10 @@ from usecases.arbitrage_detector import ArbitrageDetector
 # infrastructure
 from infrastructure.data_providers.market_data.uniswap_v2_market_data_provider import UniswapV2MarketDataProvider
 from infrastructure.data_providers.chains.arbitrum_blockchain_provider import ArbitrumBlockchainProvider
+from infrastructure.repositories.cycle_index_repository import CycleIndexRepository
 
 from config import (
-    THEGRAPH_API_KEY, INFURA_API_KEY, UNISWAP_V2_THEGRAPH
+    THEGRAPH_API_KEY, INFURA_API_KEY, UNISWAP_V2_THEGRAPH, CYCLE_INDEX_DIR
 )
 
 async def main():
@@ -41,7 +42,8 @@ async def main():
     arbitrage_detector = ArbitrageDetector(
         market_data_providers={
             "uniswap_v2": uniswap_v2_market_provider
-        }
+        },
+        cycle_index_repository=CycleIndexRepository(CYCLE_INDEX_DIR)
     )
     
     # Initialize services
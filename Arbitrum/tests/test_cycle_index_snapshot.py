@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from infrastructure.repositories.cycle_index_repository import CycleIndexRepository
+from usecases.arbitrage_detector import ArbitrageDetector
+
+TOKENS = ["0xa", "0xb", "0xc", "0xd"]
+POOLS = [
+    ("0xp1", "0xa", "0xb"), ("0xp2", "0xb", "0xc"), ("0xp3", "0xc", "0xa"),
+    ("0xp4", "0xa", "0xb"), ("0xp5", "0xc", "0xd"), ("0xp6", "0xd", "0xa"),
+]
+
+
+def _detector(directory, **kwargs) -> ArbitrageDetector:
+    return ArbitrageDetector({}, cycle_index_repository=CycleIndexRepository(str(directory)), **kwargs)
+
+
+def _cycle_pools(detector: ArbitrageDetector):
+    graph = detector.price_graph
+    edge_pool = graph.export_columns()["pool"]
+    cycles = set()
+    for rows in (detector.cycle_manager.cycle_3_edges.array, detector.cycle_manager.cycle_2_edges.array):
+        for row in rows.tolist():
+            cycles.add(tuple(graph.pools[edge_pool[edge_id]] for edge_id in row))
+    return cycles
+
+
+@pytest.mark.parametrize("kwargs", [{}, {"max_edges_per_pair": 1}])
+def test_saved_snapshot_drops_removed_pools(tmp_path, kwargs):
+    detector = _detector(tmp_path, **kwargs)
+    graph = detector.price_graph
+    for i, (pool, token0, token1) in enumerate(POOLS):
+        graph.add_edge(token0, token1, pool, 0.001 * i, 0.003, "uniswap_v2", liquidity=1000.0 + i)
+        graph.add_edge(token1, token0, pool, -0.001 * i, 0.003, "uniswap_v2", liquidity=1000.0 + i)
+    detector.cycle_manager.build()
+    detector.remove_pool("0xp4")
+    detector.remove_pool("0xp5")
+    detector.save_cycle_index()
+
+    restored = _detector(tmp_path, **kwargs)
+    assert restored.load_cycle_index()
+
+    columns = restored.price_graph.export_columns()
+    assert len(columns["pool"]) == 2 * (len(POOLS) - 2)
+    assert columns["active"].all()
+    assert sorted(restored.price_graph.pools) == ["0xp1", "0xp2", "0xp3", "0xp6"]
+    assert _cycle_pools(restored) == _cycle_pools(detector)
+    assert all(pool not in ("0xp4", "0xp5") for cycle in _cycle_pools(restored) for pool in cycle)
+    if kwargs:
+        pairs, indptr, members = restored.cycle_manager.edge_pruner.export_selection()
+        assert np.all(members < len(columns["pool"]))
+
+
+def test_snapshot_with_mismatched_pool_hash_is_ignored(tmp_path):
+    detector = _detector(tmp_path)
+    for pool, token0, token1 in POOLS[:3]:
+        detector.price_graph.add_edge(token0, token1, pool, 0.0, 0.003, "uniswap_v2")
+        detector.price_graph.add_edge(token1, token0, pool, 0.0, 0.003, "uniswap_v2")
+    detector.cycle_manager.build()
+    detector.save_cycle_index()
+
+    repository = detector.cycle_index_repository
+    header, arrays = repository.load()
+    repository.save(header["metadata"], {name: np.array(array) for name, array in arrays.items()}, "0" * 64)
+
+    assert not _detector(tmp_path).load_cycle_index()
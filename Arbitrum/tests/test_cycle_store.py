@@ -0,0 +1,23 @@
+from infrastructure.data_providers.graph.cycle_store import CycleStore, POOL_VERSIONS, fee_denominator
+from infrastructure.data_providers.graph.price_graph import PriceGraph
+
+
+def test_to_abi_fee_units_round_trip():
+    graph = PriceGraph()
+    edge_ids = [
+        graph.add_edge("a", "b", "v2pool", 0.0, 0.003, "uniswap_v2"),
+        graph.add_edge("b", "c", "v3pool", 0.0, 0.003, "uniswap_v3"),
+        graph.add_edge("c", "a", "v3pool2", 0.0, 0.0005, "pancakeswap_v3"),
+    ]
+    store = CycleStore(graph, 3)
+    store.append(edge_ids)
+
+    cycle = store.to_abi(0)
+    hops = cycle[3:]
+    # V2_core takes 10000 - fee, V3_core takes pips
+    assert hops[0] == ("v2pool", 30, POOL_VERSIONS["uniswap_v2"])
+    assert hops[1] == ("v3pool", 3000, POOL_VERSIONS["uniswap_v3"])
+    assert hops[2] == ("v3pool2", 500, POOL_VERSIONS["pancakeswap_v3"])
+
+    for edge_id, (_, fee, version) in zip(edge_ids, hops):
+        assert fee / fee_denominator(version) == float(graph.edge_fee[edge_id])
@@ -0,0 +1,43 @@
+import random
+
+from infrastructure.data_providers.graph.price_graph import PriceGraph
+from usecases.long_cycle_finder import LongCycleFinder
+
+
+def _random_graph(rng: random.Random, tokens: int = 9, pools: int = 24):
+    graph = PriceGraph()
+    pairs = []
+    for i in range(pools):
+        a, b = rng.sample(range(tokens), 2)
+        pool = f"pool{i}"
+        weight = rng.gauss(0.0, 0.02)
+        graph.add_edge(f"t{a}", f"t{b}", pool, weight, 0.003, "test")
+        graph.add_edge(f"t{b}", f"t{a}", pool, -weight, 0.003, "test")
+        pairs.append((pool, f"t{a}", f"t{b}"))
+    return graph, pairs
+
+
+def _summary(cycles):
+    return [(LongCycleFinder._canonical(cycle.edges), round(cycle.score, 12)) for cycle in cycles]
+
+
+def test_incremental_search_matches_full_search():
+    rng = random.Random(7)
+    graph, pairs = _random_graph(rng)
+    bases = ["t0", "t1"]
+    incremental = LongCycleFinder(graph, bases, min_hops=4, max_hops=5, max_results=8, candidate_pool=12)
+    incremental.search()
+
+    for _ in range(40):
+        changed = rng.sample(pairs, 3)
+        for pool, a, b in changed:
+            weight = rng.gauss(0.0, 0.02)
+            graph.set_pool_weight(pool, a, weight)
+            graph.set_pool_weight(pool, b, -weight)
+        incremental.mark_pools_dirty(pool for pool, _, _ in changed)
+
+        full = LongCycleFinder(graph, bases, min_hops=4, max_hops=5, max_results=8)
+        assert _summary(incremental.search()) == _summary(full.search())
+
+    # Most passes must be answered from the cache without a full search
+    assert incremental.full_searches < 20
@@ -0,0 +1,41 @@
+import random
+
+import numpy as np
+
+from infrastructure.data_providers.pools.v2_pool import V2Pool
+
+
+def test_get_amount_in_exact_division():
+    # 10000 * 997 * 10000 / ((10997 - 997) * 9970) is exactly 1000, the router formula would give 1001
+    pool = V2Pool("0xpool", "0xa", "0xb", reserve0=10000, reserve1=10997, fee=0.003)
+    assert pool.get_amount_in(997, True) == 1000
+    assert pool.get_amount_out(1000, True) == 997
+    assert pool.get_amount_out(999, True) < 997
+
+
+def test_get_amount_in_is_smallest_input():
+    rng = random.Random(7)
+    for _ in range(500):
+        pool = V2Pool(
+            "0xpool", "0xa", "0xb",
+            reserve0=rng.randint(10 ** 3, 10 ** 24), reserve1=rng.randint(10 ** 3, 10 ** 24),
+            fee=rng.choice([0.0, 0.0005, 0.003, 0.01]),
+        )
+        zero_for_one = rng.random() < 0.5
+        reserve_out = pool.reserve1 if zero_for_one else pool.reserve0
+        amount_out = rng.randint(1, reserve_out - 1)
+        amount_in = pool.get_amount_in(amount_out, zero_for_one)
+        assert pool.get_amount_out(amount_in, zero_for_one) >= amount_out
+        assert pool.get_amount_out(amount_in - 1, zero_for_one) < amount_out
+
+
+def test_get_amounts_in_matches_scalar():
+    pool = V2Pool("0xpool", "0xa", "0xb", reserve0=10000, reserve1=10997, fee=0.003)
+    assert pool.get_amounts_in([997], True) == [pool.get_amount_in(997, True)] == [1000]
+
+    rng = random.Random(11)
+    pool = V2Pool("0xpool", "0xa", "0xb", reserve0=rng.randint(10 ** 6, 10 ** 24), reserve1=10 ** 20, fee=0.003)
+    amounts_out = [0, -5] + [rng.randint(1, 10 ** 20 - 1) for _ in range(200)]
+    expected = [pool.get_amount_in(amount, False) if amount > 0 else 0 for amount in amounts_out]
+    assert pool.get_amounts_in(amounts_out, False) == expected
+    assert pool.get_amounts_in(np.array(amounts_out, dtype=object), False).tolist() == expected
@@ -1,37 +1,59 @@
-from typing import List, Optional, Dict, Any, Set, Tuple
+from typing import List, Optional, Dict, Any, Set, Tuple, Iterable
 from decimal import Decimal
-import networkx as nx
 import math
 import asyncio
+import numpy as np
 import time
 from logger import logger
 
-from infrastructure.data_providers.graph.edge import Edge
-from infrastructure.data_providers.graph.cycle import Cycle_3, Cycle_2
-from domain.entities.models import DexTradingPair, TradingPairFilter
+from infrastructure.data_providers.graph.cycle_store import CycleStore
+from infrastructure.data_providers.graph.price_graph import PriceGraph
+from infrastructure.data_providers.graph.edge_pruning import EdgePruner, RANK_BY_LIQUIDITY
+from infrastructure.repositories.cycle_index_repository import CycleIndexRepository, pool_set_hash
+from domain.entities.models import CycleQuote, DexTradingPair, TradingPairFilter
 from domain.interfaces.market_data_provider import MarketDataProvider
 from usecases.pool_simulator_manager import PoolSimulatorManager
+from usecases.cycle_manager import CycleManager
+from usecases.long_cycle_finder import LongCycleFinder, LongCycle
+from usecases.v2_cycle_sizer import V2CycleSizer
 
 
 class ArbitrageDetector:
     def __init__(
             self,
-            market_data_providers: Dict[str, MarketDataProvider]
+            market_data_providers: Dict[str, MarketDataProvider],
+            base_tokens: Optional[List[str]] = None,
+            max_edges_per_pair: Optional[int] = None,
+            edge_rank_by: str = RANK_BY_LIQUIDITY,
+            bundle_parallel_pools: bool = False,
+            cycle_index_repository: Optional[CycleIndexRepository] = None
     ):
         self.market_data_providers = market_data_providers
-        self.price_graph = nx.MultiDiGraph()
+        self.price_graph = PriceGraph()
         self.pool_simulator_manager = PoolSimulatorManager()
 
-        self.cycle_cache: Dict[str, bool] = {}
-        self.cycles_3: List[Cycle_3] = []
-        self.cycles_2: List[Cycle_2] = []
-        self.vertice_to_cycles: Dict[str, (int, List[int])] = {}
-    
-    def _create_cycle_by_tokens_cache_key(self, token0: str, token1: str, token2: str) -> str:
-        tokens = [token0.lower(), token1.lower(), token2.lower()]
-        tokens.sort()
-        return f'{tokens[0]}_{tokens[1]}_{tokens[2]}'
+        # Keep only the best parallel pools per token pair (or bundle them) so cycles grow linearly with pools
+        edge_pruner = None
+        if max_edges_per_pair is not None or bundle_parallel_pools:
+            edge_pruner = EdgePruner(self.price_graph, max_edges_per_pair, edge_rank_by, bundle_parallel_pools)
+        self.cycle_manager = CycleManager(self.price_graph, edge_pruner)
+        # Snapshot of the graph and cycle index, so restarts only reconcile changed pools
+        self.cycle_index_repository = cycle_index_repository
+        self.v2_cycle_sizer = V2CycleSizer(self.pool_simulator_manager)
+
+        # Search for 4-6 hop cycles through the base tokens (e.g. WETH, USDC) if configured
+        self.long_cycle_finder: Optional[LongCycleFinder] = None
+        if base_tokens:
+            self.long_cycle_finder = LongCycleFinder(self.price_graph, base_tokens)
 
+    @property
+    def cycles_3(self) -> CycleStore:
+        return self.cycle_manager.cycles_3
+
+    @property
+    def cycles_2(self) -> CycleStore:
+        return self.cycle_manager.cycles_2
+    
     def _is_v2_provider(self, provider_name: str) -> bool:
         """
         Check if the provider is a Uniswap V2 or Pancake V2 provider.
@@ -44,6 +66,54 @@ class ArbitrageDetector:
         """
         return provider_name in ['uniswap_v2', 'pancakeswap_v2', 'sushiswap_v2', 'fraxswap_v2', 'shibaswap_v2']
 
+    def _add_pair_to_graph(self, pair: DexTradingPair, provider_name: str) -> None:
+        """
+        Add the tokens and both directed edges of a pair to the price graph.
+
+        Args:
+            pair: Trading pair
+            provider_name: Name of the provider
+        """
+        token0_address = pair.token0_address
+        token1_address = pair.token1_address
+
+        # TODO: Check the self.ETH_USD_PRICE
+        self.price_graph.add_token(
+            token0_address,
+            symbol=pair.token0_symbol,
+            # USD_price = pair.token0_derivedETH * self.ETH_USD_PRICE,
+            decimals=pair.token0_decimals
+        )
+        self.price_graph.add_token(
+            token1_address,
+            symbol=pair.token1_symbol,
+            # USD_price = pair.token1_derivedETH * self.ETH_USD_PRICE,
+            decimals=pair.token1_decimals
+        )
+
+        # Add edges with weight as log(price)
+        if pair.token1_price > 0:
+            self.price_graph.add_edge(
+                from_token=token0_address,
+                to_token=token1_address,
+                pool=pair.pair_address,
+                weight=math.log(Decimal(pair.token1_price)),
+                fee=pair.fee_tier/1000000.0,  # Convert fee tier from percentage to decimal
+                provider=provider_name,
+                liquidity=float(pair.total_liquidity_usd)
+            )
+
+        if pair.token0_price > 0:
+            self.price_graph.add_edge(
+                from_token=token1_address,
+                to_token=token0_address,
+                pool=pair.pair_address,
+                weight=math.log(Decimal(pair.token0_price)),
+                fee=pair.fee_tier/1000000.0,
+                provider=provider_name,
+                liquidity=float(pair.total_liquidity_usd)
+            )
+
     async def _add_pairs_to_graph_parallel(self, pairs: List[DexTradingPair], provider_name: str, thread_count: int):
         if not pairs:
             logger.debug(f"No pairs to add from {provider_name}")
@@ -62,48 +132,7 @@ class ArbitrageDetector:
                         continue
 
                     async with graph_lock:
-                        token0_address = pair.token0_address
-                        token1_address = pair.token1_address
-
-                        # TODO: Check the self.ETH_USD_PRICE
-                        if not self.price_graph.has_node(token0_address):
-                            self.price_graph.add_node(
-                                token0_address, 
-                                symbol=pair.token0_symbol,
-                                # USD_price = pair.token0_derivedETH * self.ETH_USD_PRICE,
-                                decimals=pair.token0_decimals
-                            )
-                        
-                        if not self.price_graph.has_node(token1_address):
-                            self.price_graph.add_node(
-                                token1_address,
-                                symbol=pair.token1_symbol,
-                                # USD_price = pair.token1_derivedETH * self.ETH_USD_PRICE,
-                                decimals=pair.token1_decimals
-                            )
-                                                    
-                        # Add edges with weight as -log(price)
-                        if pair.token1_price > 0:
-                            self.price_graph.add_edge(
-                                u_for_edge= token0_address,
-                                v_for_edge= token1_address,
-                                key=pair.pair_address,
-                                weight = math.log(Decimal(pair.token1_price)),
-                                price = pair.token1_price,
-                                provider = provider_name,
-                                fee = pair.fee_tier/1000000.0  # Convert fee tier from percentage to decimal
-                            )
-
-                        if pair.token0_price > 0:
-                            self.price_graph.add_edge(
-                                u_for_edge= token1_address,
-                                v_for_edge= token0_address,
-                                key=pair.pair_address,
-                                weight = math.log(Decimal(pair.token0_price)),
-                                price= pair.token0_price,
-                                provider=provider_name,
-                                fee = pair.fee_tier/1000000.0
-                            )
+                        self._add_pair_to_graph(pair, provider_name)
                 except Exception as e:
                     logger.exception(f"Error processing pair")
     
@@ -136,6 +165,13 @@ class ArbitrageDetector:
     async def build_graph(self, limit: int = 100, thread_count: int = 4) -> None:
         self.price_graph.clear()
         self.pool_simulator_manager.clear()
+        self.cycle_manager.clear()
+        if self.long_cycle_finder:
+            self.long_cycle_finder.reset()
+
+        # Warm start: map the saved index and only reconcile the pools that changed
+        warm = self.cycle_index_repository is not None and self.load_cycle_index()
+        fetched_pools: Set[str] = set()
 
         for provider_name, provider in self.market_data_providers.items():
             try:
@@ -148,14 +184,211 @@ class ArbitrageDetector:
                 )
                 pairs = await provider.get_all_pairs(limit=limit, filter_options=filter_options, order_by_liquidity=True)
             
-                # Add pairs to graph in parallel
-                await self._add_pairs_to_graph_parallel(pairs, provider_name, thread_count)
+                if warm:
+                    await self._reconcile_pairs(pairs, provider_name)
+                else:
+                    # Add pairs to graph in parallel
+                    await self._add_pairs_to_graph_parallel(pairs, provider_name, thread_count)
+                fetched_pools.update(pair.pair_address for pair in pairs)
                 
                 logger.info(f"Successfully fetched {len(pairs)} pairs from {provider_name}")
             except Exception as e:
                 logger.exception(f"Error fetching pairs from {provider_name}: {e}")
         
-        self.cache_triangular_arbitrage_cycles()
+        if warm:
+            stale_pools = [pool for pool in self.price_graph.pools
+                           if self.price_graph.has_pool(pool) and pool not in fetched_pools]
+            for pool in stale_pools:
+                self.remove_pool(pool)
+            logger.info(f"Removed {len(stale_pools)} pools no longer in the top pairs from the cycle index")
+        else:
+            self.cache_triangular_arbitrage_cycles()
+
+        if self.cycle_index_repository is not None:
+            self.save_cycle_index()
+
+    def _set_pair_weights(self, pair: DexTradingPair) -> None:
+        """
+        Refresh the edge weights of a pool already in the graph from fetched pair data.
+
+        Args:
+            pair: Trading pair
+        """
+        if pair.token1_price > 0:
+            self.price_graph.set_pool_weight(pair.pair_address, pair.token0_address, math.log(Decimal(pair.token1_price)))
+        if pair.token0_price > 0:
+            self.price_graph.set_pool_weight(pair.pair_address, pair.token1_address, math.log(Decimal(pair.token0_price)))
+
+    async def _reconcile_pairs(self, pairs: List[DexTradingPair], provider_name: str) -> None:
+        """
+        Bring a loaded cycle index up to date with freshly fetched pairs.
+
+        Known pools only get their edge weights refreshed; new pools are
+        added to the graph and get their cycles indexed incrementally.
+
+        Args:
+            pairs: Fetched trading pairs
+            provider_name: Name of the provider
+        """
+        added = 0
+        for pair in pairs:
+            if not isinstance(pair, DexTradingPair):
+                continue
+
+            try:
+                if self.price_graph.has_pool(pair.pair_address):
+                    self._set_pair_weights(pair)
+                else:
+                    self._add_pair_to_graph(pair, provider_name)
+                    self.cycle_manager.add_pool(pair.pair_address)
+                    added += 1
+            except Exception as e:
+                logger.exception(f"Error reconciling pair {pair.pair_address}")
+                continue
+
+            if self._is_v2_provider(provider_name):
+                await self.pool_simulator_manager.create_and_store_v2_pool_simulator(
+                    pair.pair_address,
+                    pair.token0_address,
+                    pair.token1_address,
+                    pair.token0_decimals,
+                    pair.token1_decimals,
+                    pair.reserve0,
+                    pair.reserve1,
+                    pair.fee_tier,
+                    pair.block_number,
+                    provider_name
+                )
+
+        logger.info(f"Reconciled {len(pairs)} pairs from {provider_name}: {added} new pools")
+
+    def _edge_pruner_config(self) -> Optional[Dict[str, Any]]:
+        edge_pruner = self.cycle_manager.edge_pruner
+        if edge_pruner is None:
+            return None
+        return {"top_k": edge_pruner.top_k, "rank_by": edge_pruner.rank_by, "bundle": edge_pruner.bundle}
+
+    def _compacted_snapshot(self) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+        """
+        Build the snapshot tables with removed edges and pools left out.
+
+        Removed pools only have their edges deactivated in the live graph, so
+        the saved edge and pool ids are renumbered and the cycle rows and
+        pruner members remapped to the new edge ids.
+
+        Returns:
+            (pool and edge tables, cycle and pruner arrays)
+        """
+        graph = self.price_graph
+        columns = graph.export_columns()
+        active = columns["active"].astype(bool)
+
+        edge_map = np.full(len(active), -1, dtype=np.int64)
+        edge_map[active] = np.arange(np.count_nonzero(active))
+        kept_pools = np.unique(columns["pool"][active])
+        pool_map = np.full(len(graph.pools), -1, dtype=np.int64)
+        pool_map[kept_pools] = np.arange(len(kept_pools))
+
+        columns = {name: column[active] for name, column in columns.items()}
+        columns["pool"] = pool_map[columns["pool"]].astype(columns["pool"].dtype)
+        tables = {
+            "pools": [graph.pools[pool_id] for pool_id in kept_pools.tolist()],
+            "pool_providers": [graph.pool_providers[pool_id] for pool_id in kept_pools.tolist()],
+            "columns": columns,
+        }
+
+        def remap_cycles(rows: np.ndarray) -> np.ndarray:
+            mapped = edge_map[rows]
+            return mapped[(mapped >= 0).all(axis=1)].astype(rows.dtype)
+
+        arrays = {
+            "cycle_3_edges": remap_cycles(self.cycle_manager.cycle_3_edges.array),
+            "cycle_2_edges": remap_cycles(self.cycle_manager.cycle_2_edges.array),
+        }
+        if self.cycle_manager.edge_pruner is not None:
+            pairs, indptr, members = self.cycle_manager.edge_pruner.export_selection()
+            kept_pairs, lengths, kept_members = [], [], []
+            for i, pair in enumerate(pairs):
+                mapped = edge_map[members[indptr[i]:indptr[i + 1]]]
+                mapped = mapped[mapped >= 0]
+                if len(mapped):
+                    kept_pairs.append(pair)
+                    lengths.append(len(mapped))
+                    kept_members.append(mapped)
+            new_indptr = np.zeros(len(lengths) + 1, dtype=np.int64)
+            np.cumsum(lengths, out=new_indptr[1:])
+            arrays["pruner_pairs"] = np.asarray(kept_pairs, dtype=np.int32).reshape(-1, 2)
+            arrays["pruner_indptr"] = new_indptr
+            arrays["pruner_members"] = (
+                np.concatenate(kept_members).astype(np.int32) if kept_members else np.zeros(0, dtype=np.int32)
+            )
+        return tables, arrays
+
+    def save_cycle_index(self) -> None:
+        """
+        Write the token table, edge arrays and cycle index to the repository.
+        """
+        graph = self.price_graph
+        tables, arrays = self._compacted_snapshot()
+        metadata = {
+            "tokens": graph.tokens,
+            "token_symbols": graph.token_symbols,
+            "token_decimals": [int(decimals) for decimals in graph.token_decimals],
+            "pools": tables["pools"],
+            "pool_providers": tables["pool_providers"],
+            "edge_pruner": self._edge_pruner_config(),
+        }
+        arrays.update({f"edge_{name}": column for name, column in tables["columns"].items()})
+        pool_hash = pool_set_hash(zip(tables["pool_providers"], tables["pools"]))
+
+        try:
+            self.cycle_index_repository.save(metadata, arrays, pool_hash)
+            logger.info(f"Saved cycle index: {len(self.cycles_3)} 3-cycles, {len(self.cycles_2)} 2-cycles")
+        except Exception as e:
+            logger.exception(f"Error saving cycle index")
+
+    def load_cycle_index(self) -> bool:
+        """
+        Restore the graph and cycle index from the repository.
+
+        Returns:
+            True if a compatible snapshot was loaded
+        """
+        loaded = self.cycle_index_repository.load()
+        if loaded is None:
+            return False
+
+        header, arrays = loaded
+        metadata = header["metadata"]
+        if metadata.get("edge_pruner") != self._edge_pruner_config():
+            logger.info("Ignoring cycle index built with a different edge pruning configuration")
+            return False
+        if pool_set_hash(zip(metadata["pool_providers"], metadata["pools"])) != header.get("pool_set_hash"):
+            logger.info("Ignoring cycle index whose pool table does not match its pool set hash")
+            return False
+
+        try:
+            columns = {name[len("edge_"):]: array for name, array in arrays.items() if name.startswith("edge_")}
+            self.price_graph.restore(
+                metadata["tokens"], metadata["token_symbols"], metadata["token_decimals"],
+                metadata["pools"], metadata["pool_providers"], columns
+            )
+            self.cycle_manager.restore(arrays["cycle_3_edges"], arrays["cycle_2_edges"])
+            if self.cycle_manager.edge_pruner is not None:
+                self.cycle_manager.edge_pruner.restore_selection(
+                    arrays["pruner_pairs"], arrays["pruner_indptr"], arrays["pruner_members"]
+                )
+        except Exception as e:
+            logger.exception(f"Error restoring cycle index")
+            self.price_graph.clear()
+            self.cycle_manager.clear()
+            return False
+
+        logger.info(
+            f"Loaded cycle index: {len(self.cycles_3)} 3-cycles, {len(self.cycles_2)} 2-cycles "
+            f"(pool set {header['pool_set_hash'][:16]})"
+        )
+        return True
 
 
     def cache_triangular_arbitrage_cycles(self) -> None:
@@ -163,104 +396,146 @@ class ArbitrageDetector:
         Cache all found triangular arbitrage cycles.
         """
         try:
-            for node_cycle in nx.simple_cycles(self.price_graph, 3):
-                if len(node_cycle) > 3:
-                    continue
+            self.cycle_manager.build()
+        except Exception as e:
+            logger.error(f"Error caching arbitrage cycles: {e}")
 
-                if len(node_cycle) == 2:
-                    if node_cycle[0] == node_cycle[1]:
-                        continue
-                    
-                    u = node_cycle[0]
-                    v = node_cycle[1]
+    async def add_pool(self, pair: DexTradingPair, provider_name: str) -> None:
+        """
+        Make a newly discovered pool tradable without rebuilding the graph.
 
-                    cycle_key = self._create_cycle_by_tokens_cache_key(node_cycle[0], node_cycle[1], "0")
-                    if cycle_key in self.cycle_cache:
-                        continue
-                    self.cycle_cache[cycle_key] = True
+        Only the cycles closed by the new pool's edges are indexed.
 
-                    edge_data = self.price_graph.get_edge_data(u, v)
-                    if not edge_data:
-                        logger.error(f"No edge data found for {u} -> {v} in cycle {node_cycle}")
-                        self.cycle_cache.pop(cycle_key, None)
-                        continue
+        Args:
+            pair: Trading pair of the new pool
+            provider_name: Name of the provider
+        """
+        if self.price_graph.has_pool(pair.pair_address):
+            return
 
-                    pairs = []
-                    for pair_address in edge_data.keys():
-                        cur = Edge(pool=pair_address, 
-                                    fee=edge_data[pair_address]['fee'], 
-                                    version=edge_data[pair_address]['provider'])
-                        pairs.append(cur)
-
-                    if u > v:
-                        u, v = v, u
-
-                    for i in range(len(pairs)):
-                        for j in range(i + 1, len(pairs)):
-                            cycle = Cycle_2(
-                                token1=node_cycle[0],
-                                token2=node_cycle[1],
-                                edge1=pairs[i],
-                                edge2=pairs[j]
-                            )
-                            cycle_index = len(self.cycles_2)
-                            self.cycles_2.append(cycle)
-
-                            # Map vertices to cycles
-                            for vertex in node_cycle:
-                                if vertex not in self.vertice_to_cycles:
-                                    self.vertice_to_cycles[vertex] = (2, [])
-                                self.vertice_to_cycles[vertex][1].append(cycle_index)
-                    continue
-
-                cycle_key = self._create_cycle_by_tokens_cache_key(node_cycle[0], node_cycle[1], node_cycle[2])
-                if cycle_key in self.cycle_cache:
-                        continue
-                self.cycle_cache[cycle_key] = True
-                
-                if node_cycle[0] == node_cycle[1] or node_cycle[1] == node_cycle[2] or node_cycle[2] == node_cycle[0]:
-                    continue
-                
-                pairs = [[], [], []]
-
-                for i in range(len(node_cycle)):
-                    u = node_cycle[i]
-                    v = node_cycle[(i + 1) % len(node_cycle)]
-                    
-                    edge_data = self.price_graph.get_edge_data(u, v)
-                    if not edge_data:
-                        logger.error(f"No edge data found for {u} -> {v} in cycle {node_cycle}")
-                        self.cycle_cache.pop(cycle_key, None)
-                        break
-                    
-                    for pair_address in edge_data.keys():
-                        cur = Edge(pool=pair_address, 
-                                    fee=edge_data[pair_address]['fee'], 
-                                    version=edge_data[pair_address]['provider'])
-                        pairs[i].append(cur)
-                
-                for first_pair in pairs[0]:
-                    for second_pair in pairs[1]:
-                        for third_pair in pairs[2]:
-
-                            cycle = Cycle_3(
-                                token1=node_cycle[0],
-                                token2=node_cycle[1],
-                                token3=node_cycle[2],
-                                edge1=first_pair,
-                                edge2=second_pair,
-                                edge3=third_pair
-                            )
-                            cycle_index = len(self.cycles_3)
-                            self.cycles_3.append(cycle)
-
-                            # print(cycle_index, cycle.token1, cycle.token2, cycle.token3, cycle.edge1, cycle.edge2, cycle.edge3)
-
-                            # Map vertices to cycles
-                            for vertex in node_cycle:
-                                if vertex not in self.vertice_to_cycles:
-                                    self.vertice_to_cycles[vertex] = (3, [])
-                                self.vertice_to_cycles[vertex][1].append(cycle_index)
-                        
+        try:
+            self._add_pair_to_graph(pair, provider_name)
+            new_3, new_2 = self.cycle_manager.add_pool(pair.pair_address)
+            if self.long_cycle_finder:
+                self.long_cycle_finder.mark_pools_dirty([pair.pair_address])
         except Exception as e:
-            logger.error(f"Error caching arbitrage cycles: {e}")
+            logger.exception(f"Error adding pool {pair.pair_address}")
+            return
+
+        if self._is_v2_provider(provider_name):
+            await self.pool_simulator_manager.create_and_store_v2_pool_simulator(
+                pair.pair_address,
+                pair.token0_address,
+                pair.token1_address,
+                pair.token0_decimals,
+                pair.token1_decimals,
+                pair.reserve0,
+                pair.reserve1,
+                pair.fee_tier,
+                pair.block_number,
+                provider_name
+            )
+
+        logger.debug(f"Added pool {pair.pair_address}: {new_3} new 3-cycles, {new_2} new 2-cycles")
+
+    def remove_pool(self, pool_address: str) -> None:
+        """
+        Drop a pool and every cycle that uses it.
+
+        Args:
+            pool_address: Pool address
+        """
+        removed_3, removed_2 = self.cycle_manager.remove_pool(pool_address)
+        self.price_graph.remove_pool(pool_address)
+        self.pool_simulator_manager.remove_simulator(pool_address)
+        if self.long_cycle_finder:
+            self.long_cycle_finder.mark_pools_dirty([pool_address])
+
+        logger.debug(f"Removed pool {pool_address}: {removed_3} 3-cycles, {removed_2} 2-cycles")
+
+    def update_pool_prices(self, pool_addresses: Iterable[str]) -> None:
+        """
+        Refresh the graph edges of pools from their simulators and mark them dirty.
+
+        Args:
+            pool_addresses: Addresses of the pools whose state changed
+        """
+        updated = []
+        for pool_address in pool_addresses:
+            pool_simulator = self.pool_simulator_manager.get_simulator(pool_address)
+            if pool_simulator is None:
+                continue
+
+            price0 = pool_simulator.price0
+            price1 = pool_simulator.price1
+            if price0 > 0:
+                self.price_graph.set_pool_weight(pool_address, pool_simulator.token0, math.log(price0))
+            if price1 > 0:
+                self.price_graph.set_pool_weight(pool_address, pool_simulator.token1, math.log(price1))
+            updated.append(pool_address)
+
+        self.cycle_manager.mark_pools_dirty(updated)
+        if self.long_cycle_finder:
+            self.long_cycle_finder.mark_pools_dirty(updated)
+
+    def rescore_dirty_cycles(self, min_score: float = 0.0) -> Tuple[List[int], List[int]]:
+        """
+        Rescore only the cycles touching pools updated since the last call.
+
+        Args:
+            min_score: Minimum log rate product for a cycle to be reported
+
+        Returns:
+            Indexes of the profitable 3-cycles and 2-cycles
+        """
+        dirty_3, dirty_2 = self.cycle_manager.drain_dirty_cycles()
+        dirty_3 = np.asarray(dirty_3, dtype=np.int64)
+        dirty_2 = np.asarray(dirty_2, dtype=np.int64)
+
+        profitable_3 = dirty_3[self.cycle_manager.score_cycles_3(dirty_3) > min_score]
+        profitable_2 = dirty_2[self.cycle_manager.score_cycles_2(dirty_2) > min_score]
+        return profitable_3.tolist(), profitable_2.tolist()
+
+    def screen_all_cycles(self, min_score: float = 0.0) -> Tuple[List[int], List[int]]:
+        """
+        Screen every cached cycle with one vectorized pass.
+
+        Args:
+            min_score: Minimum log rate product for a cycle to be reported
+
+        Returns:
+            Indexes of the profitable 3-cycles and 2-cycles
+        """
+        profitable_3, profitable_2 = self.cycle_manager.screen(min_score)
+        return profitable_3.tolist(), profitable_2.tolist()
+
+    def size_v2_cycles(
+        self, cycle_indexes_3: Iterable[int], cycle_indexes_2: Iterable[int]
+    ) -> Tuple[List[Optional[CycleQuote]], List[Optional[CycleQuote]]]:
+        """
+        Compute the optimal input and exact profit of cached all-V2 cycles.
+
+        Args:
+            cycle_indexes_3: Indexes into cycles_3 (e.g. from screen_all_cycles)
+            cycle_indexes_2: Indexes into cycles_2
+
+        Returns:
+            Quotes for the 3-cycles and 2-cycles, None where a cycle is not all-V2 or not profitable
+        """
+        quotes_3 = self.v2_cycle_sizer.size_cycles([self.cycles_3[i] for i in cycle_indexes_3])
+        quotes_2 = self.v2_cycle_sizer.size_cycles([self.cycles_2[i] for i in cycle_indexes_2])
+        return quotes_3, quotes_2
+
+    def find_long_cycles(self) -> List[LongCycle]:
+        """
+        Update the best 4-6 hop cycles through the base tokens.
+
+        Only cycles through pools updated since the last call are searched
+        again, so this can run on every block.
+
+        Returns:
+            Best long cycles, highest score first (empty if no base tokens are configured)
+        """
+        if not self.long_cycle_finder:
+            return []
+        return self.long_cycle_finder.search()
@@ -1,11 +1,495 @@
-from infrastructure.data_providers.graph.cycle import Cycle
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+import numpy as np
+
+from infrastructure.data_providers.graph.edge import Edge
+from infrastructure.data_providers.graph.cycle import Cycle_3, Cycle_2
+from infrastructure.data_providers.graph.price_graph import PriceGraph
+from infrastructure.data_providers.graph.edge_index_matrix import EdgeIndexMatrix
+from infrastructure.data_providers.graph.cycle_store import CycleStore
+from infrastructure.data_providers.graph.edge_pruning import EdgePruner
+from infrastructure.data_providers.graph.cycle_enumerator import enumerate_two_cycles, enumerate_triangles
 
 
 class CycleManager:
     """
     Manages the creation and storage of trading cycles.
+
+    Cycles are kept in dense CycleStores as rows of the graph edge ids they
+    use; Cycle_3 / Cycle_2 objects are only built when a cycle is read.
+    Removing a cycle moves the last cycle into the freed slot, so indexes
+    stay contiguous and the reverse indexes are patched in place.
+
+    Scoring gathers the graph's edge log rates through the (n_cycles x k)
+    edge id matrices and sums each row, so the whole cycle set is screened
+    with one vectorized expression.
+
+    Pools whose state changed are collected in a dirty set; once per batch
+    drain_dirty_cycles() returns the deduplicated cycles touching them, so
+    rescoring work follows the pool's degree rather than its tokens'.
+
+    With an EdgePruner only the selected edges of every directed token pair
+    are combined into cycles; in bundle mode each cycle hop stands for all
+    kept pools of its pair until the cycle is expanded.
     """
 
-    def __init__(self):
-        self.cycle_managers: dict[str, Cycle] = {}
-    
\ No newline at end of file
+    def __init__(self, price_graph: PriceGraph, edge_pruner: Optional[EdgePruner] = None):
+        self.price_graph = price_graph
+        self.edge_pruner = edge_pruner
+
+        # Cycles as rows of graph edge ids; objects are materialized on access
+        self._edge_objects: Dict[int, Edge] = {}
+        self.cycles_3 = CycleStore(price_graph, 3, self._edge_objects)
+        self.cycles_2 = CycleStore(price_graph, 2, self._edge_objects)
+        self.cycle_3_edges = self.cycles_3.edges
+        self.cycle_2_edges = self.cycles_2.edges
+
+        # Token address -> indexes of the cycles through that token
+        self.vertice_to_cycles_3: Dict[str, Set[int]] = {}
+        self.vertice_to_cycles_2: Dict[str, Set[int]] = {}
+
+        # Pool address -> indexes of the cycles trading on that pool
+        self.pool_to_cycles_3: Dict[str, Set[int]] = {}
+        self.pool_to_cycles_2: Dict[str, Set[int]] = {}
+
+        self.dirty_pools: Set[str] = set()
+
+    def clear(self) -> None:
+        self.cycles_3.clear()
+        self.cycles_2.clear()
+        self.vertice_to_cycles_3.clear()
+        self.vertice_to_cycles_2.clear()
+        self.pool_to_cycles_3.clear()
+        self.pool_to_cycles_2.clear()
+        self.dirty_pools.clear()
+        self._edge_objects.clear()
+        if self.edge_pruner is not None:
+            self.edge_pruner.reset()
+
+    def _hop_edges(self, u: int, v: int) -> np.ndarray:
+        """Get the edges from one token to another that cycles are built from."""
+        if self.edge_pruner is None:
+            return self.price_graph.edges_between(u, v)
+        return self.edge_pruner.select(u, v)
+
+    def _pair_allowed(self, first: int, second: int) -> bool:
+        """Check if two opposite edges form a 2-cycle (bundle edges may share a pool before expansion)."""
+        if self.edge_pruner is not None and self.edge_pruner.bundle:
+            return True
+        pool_of = self.price_graph.edge_pool
+        return pool_of[first] != pool_of[second]
+
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _append_cycle(
+        store: CycleStore, vertex_index: Dict[str, Set[int]], pool_index: Dict[str, Set[int]],
+        edge_ids: Tuple[int, ...]
+    ) -> None:
+        cycle_index = store.append(edge_ids)
+        row = store.edges[cycle_index]
+
+        # Map vertices and pools to cycles
+        for vertex in store.row_tokens(row):
+            vertex_index.setdefault(vertex, set()).add(cycle_index)
+        for pool in store.row_pools(row):
+            pool_index.setdefault(pool, set()).add(cycle_index)
+
+    def _append_cycle_3(self, edge_ids: Tuple[int, int, int]) -> None:
+        self._append_cycle(self.cycles_3, self.vertice_to_cycles_3, self.pool_to_cycles_3, edge_ids)
+
+    def _append_cycle_2(self, edge_ids: Tuple[int, int]) -> None:
+        self._append_cycle(self.cycles_2, self.vertice_to_cycles_2, self.pool_to_cycles_2, edge_ids)
+
+    @staticmethod
+    def _swap_remove(
+        store: CycleStore,
+        indexes: List[Tuple[Dict[str, Set[int]], Callable]], cycle_index: int
+    ) -> None:
+        """
+        Remove one cycle by moving the last cycle into its slot.
+
+        Args:
+            store: Cycle store
+            indexes: (reverse index, function returning the keys of an edge id row) pairs
+            cycle_index: Index of the cycle to remove
+        """
+        last = len(store) - 1
+        removed = store.edges[cycle_index]
+        moved = store.edges[last]
+
+        for index, keys_of in indexes:
+            # set(): a bundle 2-cycle may use the same pool on both hops
+            for key in set(keys_of(removed)):
+                members = index[key]
+                members.discard(cycle_index)
+                if not members:
+                    del index[key]
+
+            if cycle_index != last:
+                for key in set(keys_of(moved)):
+                    members = index[key]
+                    members.discard(last)
+                    members.add(cycle_index)
+
+        if cycle_index != last:
+            store.move(last, cycle_index)
+        store.pop()
+
+    def _remove_cycles_3(self, cycle_indexes: Set[int]) -> None:
+        store = self.cycles_3
+        indexes = [(self.vertice_to_cycles_3, store.row_tokens), (self.pool_to_cycles_3, store.row_pools)]
+        # Highest index first, so a cycle moved into a freed slot is never one still to be removed
+        for cycle_index in sorted(cycle_indexes, reverse=True):
+            self._swap_remove(store, indexes, cycle_index)
+
+    def _remove_cycles_2(self, cycle_indexes: Set[int]) -> None:
+        store = self.cycles_2
+        indexes = [(self.vertice_to_cycles_2, store.row_tokens), (self.pool_to_cycles_2, store.row_pools)]
+        for cycle_index in sorted(cycle_indexes, reverse=True):
+            self._swap_remove(store, indexes, cycle_index)
+
+    def restore(self, cycle_3_edges: np.ndarray, cycle_2_edges: np.ndarray) -> None:
+        """
+        Replace the cycles with previously saved edge id rows and rebuild the reverse indexes.
+
+        Args:
+            cycle_3_edges: (n x 3) edge ids of the 3-cycles
+            cycle_2_edges: (n x 2) edge ids of the 2-cycles
+        """
+        edge_pruner = self.edge_pruner
+        self.edge_pruner = None  # Keep the pruner selection, which is restored separately
+        self.clear()
+        self.edge_pruner = edge_pruner
+
+        self.cycle_3_edges.restore(cycle_3_edges)
+        self.cycle_2_edges.restore(cycle_2_edges)
+        self._index_rows(self.cycles_3, self.vertice_to_cycles_3, self.pool_to_cycles_3)
+        self._index_rows(self.cycles_2, self.vertice_to_cycles_2, self.pool_to_cycles_2)
+
+    def _index_rows(
+        self, store: CycleStore, vertex_index: Dict[str, Set[int]], pool_index: Dict[str, Set[int]]
+    ) -> None:
+        """Fill the reverse indexes of a whole store, grouping the cycles by key with one sort."""
+        rows = store.edges.array
+        if len(rows) == 0:
+            return
+
+        graph = self.price_graph
+        cycle_ids = np.repeat(np.arange(len(rows)), rows.shape[1])
+        for key_ids, names, index in ((graph.edge_from[rows], graph.tokens, vertex_index),
+                                      (graph.edge_pool[rows], graph.pools, pool_index)):
+            keys = key_ids.ravel()
+            order = np.argsort(keys, kind='stable')
+            keys = keys[order]
+            members = cycle_ids[order]
+            boundaries = np.flatnonzero(np.diff(keys)) + 1
+            for key_group, member_group in zip(np.split(keys, boundaries), np.split(members, boundaries)):
+                index[names[key_group[0]]] = set(member_group.tolist())
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+
+    def build(self) -> None:
+        """
+        Rebuild every 2- and 3-cycle from the current price graph.
+        """
+        self.clear()
+
+        for token_cycle in enumerate_two_cycles(self.price_graph):
+            u, v = token_cycle.tokens
+            # Buy on one pool and sell on another, in both directions
+            for first in self._hop_edges(u, v).tolist():
+                for second in self._hop_edges(v, u).tolist():
+                    if self._pair_allowed(first, second):
+                        self._append_cycle_2((first, second))
+
+        for token_cycle in enumerate_triangles(self.price_graph):
+            a, b, c = token_cycle.tokens
+            first_hop, second_hop, third_hop = (
+                self._hop_edges(x, y).tolist() for x, y in ((a, b), (b, c), (c, a))
+            )
+            for first in first_hop:
+                for second in second_hop:
+                    for third in third_hop:
+                        self._append_cycle_3((first, second, third))
+
+    @staticmethod
+    def _canonical_rotation(tokens: Tuple[int, int, int]) -> Tuple[Tuple[int, int, int], int]:
+        """Rotate a directed triangle to start at its smallest token id, as build() emits it."""
+        rotation = tokens.index(min(tokens))
+        return tokens[rotation:] + tokens[:rotation], rotation
+
+    def _add_edge_cycles(self, edge_id: int, skip: Set[int]) -> None:
+        """
+        Index the cycles that start with a newly selected edge.
+
+        Args:
+            edge_id: Graph edge id
+            skip: Edges already processed in the same batch, whose cycles exist
+        """
+        graph = self.price_graph
+        u = int(graph.edge_from[edge_id])
+        v = int(graph.edge_to[edge_id])
+
+        # 2-cycles: this edge one way, any other pool back
+        for back in self._hop_edges(v, u).tolist():
+            if back in skip or not self._pair_allowed(edge_id, back):
+                continue
+            if u < v:
+                self._append_cycle_2((edge_id, back))
+            else:
+                self._append_cycle_2((back, edge_id))
+
+        # 3-cycles: u -> v on this edge, then v -> w -> u
+        for w in graph.successors(v).tolist():
+            if w == u:
+                continue
+            closing = [e for e in self._hop_edges(w, u).tolist() if e not in skip]
+            if not closing:
+                continue
+            _, rotation = self._canonical_rotation((u, v, w))
+            for second in self._hop_edges(v, w).tolist():
+                if second in skip:
+                    continue
+                for third in closing:
+                    edge_ids = (edge_id, second, third)
+                    self._append_cycle_3(edge_ids[rotation:] + edge_ids[:rotation])
+
+    def _add_selected_edges(self, edge_ids: List[int]) -> None:
+        """Index the cycles of edges that entered the selection, creating each cycle once."""
+        processed: Set[int] = set()
+        for edge_id in edge_ids:
+            self._add_edge_cycles(edge_id, processed)
+            processed.add(edge_id)
+
+    def _remove_edge_cycles(self, edge_ids: List[int]) -> None:
+        """Drop the cycles that use edges which left the selection."""
+        cycles_3: Set[int] = set()
+        cycles_2: Set[int] = set()
+        for edge_id in edge_ids:
+            pool = self.price_graph.edge_pool_address(edge_id)
+            cycles_3.update(i for i in self.pool_to_cycles_3.get(pool, ()) if edge_id in self.cycle_3_edges[i])
+            cycles_2.update(i for i in self.pool_to_cycles_2.get(pool, ()) if edge_id in self.cycle_2_edges[i])
+            self._edge_objects.pop(edge_id, None)
+        self._remove_cycles_3(cycles_3)
+        self._remove_cycles_2(cycles_2)
+
+    def _pool_pairs(self, pool_id: int) -> Set[Tuple[int, int]]:
+        """Get the directed token pairs of a pool's edges."""
+        graph = self.price_graph
+        return {(int(graph.edge_from[e]), int(graph.edge_to[e])) for e in graph.pool_edges[pool_id]}
+
+    def add_pool(self, pool_address: str) -> Tuple[int, int]:
+        """
+        Index the cycles created by a pool whose edges were just added to the graph.
+
+        Only the 2-cycles with the parallel pools of the same pair and the
+        triangles closed through the common neighbours of the pool's tokens
+        are visited. With an edge pruner, edges pushed out of their pair's
+        selection by the new pool lose their cycles.
+
+        Args:
+            pool_address: Pool address
+
+        Returns:
+            Number of new 3-cycles and 2-cycles (net of evicted cycles when pruning)
+        """
+        graph = self.price_graph
+        pool_id = graph.pool_id(pool_address)
+        if pool_id is None:
+            return 0, 0
+
+        count_3 = len(self.cycles_3)
+        count_2 = len(self.cycles_2)
+
+        if self.edge_pruner is None:
+            added = list(graph.pool_edges[pool_id])
+        else:
+            added = []
+            for u, v in self._pool_pairs(pool_id):
+                entered, evicted = self.edge_pruner.refresh(u, v)
+                self._remove_edge_cycles(evicted)
+                added.extend(entered)
+
+        self._add_selected_edges(added)
+        return len(self.cycles_3) - count_3, len(self.cycles_2) - count_2
+
+    def remove_pool(self, pool_address: str) -> Tuple[int, int]:
+        """
+        Drop the cycles that use a pool.
+
+        Must be called before the pool is removed from the graph. With an
+        edge pruner, the edges that replace the pool in its pairs' selection
+        get their cycles indexed.
+
+        Args:
+            pool_address: Pool address
+
+        Returns:
+            Number of removed 3-cycles and 2-cycles
+        """
+        cycles_3 = set(self.pool_to_cycles_3.get(pool_address, ()))
+        cycles_2 = set(self.pool_to_cycles_2.get(pool_address, ()))
+        self._remove_cycles_3(cycles_3)
+        self._remove_cycles_2(cycles_2)
+
+        pool_id = self.price_graph.pool_id(pool_address)
+        if pool_id is not None:
+            for edge_id in self.price_graph.pool_edges[pool_id]:
+                self._edge_objects.pop(edge_id, None)
+
+            if self.edge_pruner is not None:
+                added = []
+                for u, v in self._pool_pairs(pool_id):
+                    entered, _ = self.edge_pruner.refresh(u, v, exclude_pool=pool_id)
+                    added.extend(entered)
+                self._add_selected_edges(added)
+        self.dirty_pools.discard(pool_address)
+
+        return len(cycles_3), len(cycles_2)
+
+    # ------------------------------------------------------------------
+    # Bundle expansion
+    # ------------------------------------------------------------------
+
+    def expand_cycle_3(self, cycle_index: int) -> List[Cycle_3]:
+        """
+        Get the concrete pool combinations of a 3-cycle that passed screening.
+
+        Args:
+            cycle_index: Index into cycles_3
+
+        Returns:
+            Cycles over single pools, best rate product first
+        """
+        if self.edge_pruner is None or not self.edge_pruner.bundle:
+            return [self.cycles_3[cycle_index]]
+
+        edge_ids = tuple(self.cycle_3_edges[cycle_index].tolist())
+        return [self.cycles_3.make(combination)
+                for combination in self.edge_pruner.expand_cycle(edge_ids)]
+
+    def expand_cycle_2(self, cycle_index: int) -> List[Cycle_2]:
+        """
+        Get the concrete pool combinations of a 2-cycle that passed screening.
+
+        Args:
+            cycle_index: Index into cycles_2
+
+        Returns:
+            Cycles over two different pools, best rate product first
+        """
+        if self.edge_pruner is None or not self.edge_pruner.bundle:
+            return [self.cycles_2[cycle_index]]
+
+        edge_ids = tuple(self.cycle_2_edges[cycle_index].tolist())
+        return [self.cycles_2.make(combination)
+                for combination in self.edge_pruner.expand_cycle(edge_ids)]
+
+    # ------------------------------------------------------------------
+    # Dirty-set rescoring
+    # ------------------------------------------------------------------
+
+    def mark_pools_dirty(self, pool_addresses: Iterable[str]) -> None:
+        """
+        Record pools whose state changed since the last rescoring.
+
+        In bundle mode the pools of the bundle representatives are marked
+        too, since the cycles are indexed under them.
+
+        Args:
+            pool_addresses: Pool addresses
+        """
+        pool_addresses = list(pool_addresses)
+        self.dirty_pools.update(pool_addresses)
+
+        if self.edge_pruner is not None and self.edge_pruner.bundle:
+            graph = self.price_graph
+            edge_ids = []
+            for pool in pool_addresses:
+                pool_id = graph.pool_id(pool)
+                if pool_id is not None:
+                    edge_ids.extend(graph.pool_edges[pool_id])
+            for representative in self.edge_pruner.representatives(edge_ids):
+                self.dirty_pools.add(graph.edge_pool_address(representative))
+
+    def drain_dirty_cycles(self) -> Tuple[List[int], List[int]]:
+        """
+        Get the cycles touching dirty pools, once each, and reset the dirty set.
+
+        Returns:
+            Sorted indexes of the affected 3-cycles and 2-cycles
+        """
+        cycles_3: Set[int] = set()
+        cycles_2: Set[int] = set()
+        for pool in self.dirty_pools:
+            cycles_3.update(self.pool_to_cycles_3.get(pool, ()))
+            cycles_2.update(self.pool_to_cycles_2.get(pool, ()))
+        self.dirty_pools.clear()
+        return sorted(cycles_3), sorted(cycles_2)
+
+    def _score(self, cycle_edges: EdgeIndexMatrix, cycle_indexes=None) -> np.ndarray:
+        """
+        Gather and sum the edge log rates of cycles.
+
+        Args:
+            cycle_edges: Edge id matrix
+            cycle_indexes: Rows to score (all rows if None)
+
+        Returns:
+            Array of scores
+        """
+        edge_ids = cycle_edges.array
+        if cycle_indexes is not None:
+            edge_ids = edge_ids[np.asarray(cycle_indexes, dtype=np.int64)]
+        if self.edge_pruner is not None and self.edge_pruner.bundle:
+            rates = self.edge_pruner.bundle_log_rates()
+        else:
+            rates = self.price_graph.edge_log_rate
+        return rates[edge_ids].sum(axis=1)
+
+    def score_cycles_3(self, cycle_indexes=None) -> np.ndarray:
+        """
+        Get the log of the fee-adjusted rate product of 3-cycles.
+
+        A cycle is profitable before slippage when its score is positive.
+        In bundle mode every hop scores with the best pool of its bundle.
+
+        Args:
+            cycle_indexes: Indexes into cycles_3 (all cycles if None)
+
+        Returns:
+            Array of scores, parallel to cycle_indexes
+        """
+        return self._score(self.cycle_3_edges, cycle_indexes)
+
+    def score_cycles_2(self, cycle_indexes=None) -> np.ndarray:
+        """
+        Get the log of the fee-adjusted rate product of 2-cycles.
+
+        Args:
+            cycle_indexes: Indexes into cycles_2 (all cycles if None)
+
+        Returns:
+            Array of scores, parallel to cycle_indexes
+        """
+        return self._score(self.cycle_2_edges, cycle_indexes)
+
+    def screen(self, min_score: float = 0.0) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Score every cycle and keep those above a profitability threshold.
+
+        Args:
+            min_score: Minimum log rate product
+
+        Returns:
+            Indexes of the 3-cycles and 2-cycles scoring above min_score
+        """
+        return (
+            np.flatnonzero(self.score_cycles_3() > min_score),
+            np.flatnonzero(self.score_cycles_2() > min_score),
+        )
+
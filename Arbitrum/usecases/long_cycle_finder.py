@@ -0,0 +1,311 @@
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+import heapq
+import numpy as np
+
+from infrastructure.data_providers.graph.price_graph import PriceGraph
+
+
+class LongCycle(NamedTuple):
+    """A profitable cycle of more than three hops."""
+    tokens: Tuple[int, ...]   # Token ids in trading order, starting at the base token
+    edges: Tuple[int, ...]    # edges[i] = edge id from tokens[i] to tokens[i + 1]
+    score: float              # Sum of fee-adjusted edge log rates
+
+
+class LongCycleFinder:
+    """
+    Bounded-length profitable cycle search over the price graph.
+
+    Cycles of min_hops..max_hops edges through a set of base tokens are
+    found with a depth-bounded DFS from every base. Before each search a
+    hop-bounded Bellman-Ford relaxation (one vectorized pass per hop over
+    the edge arrays) computes, for every token, the best log rate sum that
+    can still lead back to the base in the remaining hops; branches whose
+    bound cannot beat the current threshold are pruned.
+
+    After the first full search only cycles through edges of dirty pools
+    are searched: a second bound table tracks the best return path that
+    uses at least one dirty edge, and cached results through dirty edges
+    are rescored instead of rediscovered.
+
+    The cache holds a candidate pool wider than max_results, and
+    uncached_bound is an upper bound on the score of every cycle outside
+    it (cycles only leave the cache or get pruned below that score). As
+    long as the max_results-th best cached cycle still reaches the bound,
+    no uncached cycle can beat it and the incremental result is exact;
+    otherwise, e.g. after cached cycles lost their edge, the search falls
+    back to a full pass.
+    """
+
+    def __init__(
+        self,
+        price_graph: PriceGraph,
+        base_tokens: Iterable[str],
+        min_hops: int = 4,
+        max_hops: int = 6,
+        max_results: int = 50,
+        min_score: float = 0.0,
+        candidate_pool: Optional[int] = None
+    ):
+        """
+        Initialize the finder.
+
+        Args:
+            price_graph: Price graph to search
+            base_tokens: Addresses of the tokens cycles must start and end at (e.g. WETH, USDC)
+            min_hops: Minimum cycle length
+            max_hops: Maximum cycle length
+            max_results: Number of best cycles to keep
+            min_score: Minimum log rate product for a cycle to be kept
+            candidate_pool: Number of cycles cached between searches (4 * max_results if None)
+        """
+        if min_hops < 2 or max_hops < min_hops:
+            raise ValueError(f"Invalid hop bounds: {min_hops}..{max_hops}")
+
+        self.price_graph = price_graph
+        self.base_tokens = list(base_tokens)
+        self.min_hops = min_hops
+        self.max_hops = max_hops
+        self.max_results = max_results
+        self.min_score = min_score
+        self.candidate_pool = max(max_results, candidate_pool or 4 * max_results)
+
+        self.dirty_pools: Set[str] = set()
+        # Canonical edge tuple -> cycle
+        self.cycles: Dict[Tuple[int, ...], LongCycle] = {}
+        # Upper bound on the score of any cycle not in self.cycles
+        self.uncached_bound = min_score
+        self._searched = False
+
+        self.full_searches = 0
+        self.incremental_searches = 0
+
+    def mark_pools_dirty(self, pool_addresses: Iterable[str]) -> None:
+        """
+        Record pools whose state changed since the last search.
+
+        Args:
+            pool_addresses: Pool addresses
+        """
+        self.dirty_pools.update(pool_addresses)
+
+    def reset(self) -> None:
+        """Forget cached cycles so the next search covers the whole graph."""
+        self.cycles.clear()
+        self.dirty_pools.clear()
+        self.uncached_bound = self.min_score
+        self._searched = False
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+
+    def search(self) -> List[LongCycle]:
+        """
+        Update the best cycles after the graph changed.
+
+        The first call searches every cycle through the base tokens; later
+        calls only search cycles through edges of pools marked dirty since,
+        falling back to a full search when that cannot prove the result exact.
+
+        Returns:
+            Best cycles, highest score first
+        """
+        graph = self.price_graph
+        rates = graph.edge_log_rate
+        active = graph.edge_active
+
+        if not self._searched:
+            return self._full_search(rates, active)
+        if not self.dirty_pools:
+            return self.best()
+
+        dirty_mask = np.zeros(graph.number_of_edges(), dtype=np.bool_)
+        for pool in self.dirty_pools:
+            pool_id = graph.pool_id(pool)
+            if pool_id is not None:
+                dirty_mask[graph.pool_edges[pool_id]] = True
+        self.dirty_pools.clear()
+
+        self._rescore_cached(rates, active, dirty_mask)
+        self._run(rates, active, dirty_mask)
+        self.incremental_searches += 1
+
+        if self.uncached_bound > self.min_score:
+            ranked = self.best()
+            if len(ranked) < self.max_results or ranked[-1].score < self.uncached_bound:
+                # An uncached cycle may now beat the cached ones
+                return self._full_search(rates, active)
+        return self.best()
+
+    def _full_search(self, rates: np.ndarray, active: np.ndarray) -> List[LongCycle]:
+        """Search every cycle through the base tokens, replacing the cache."""
+        self.cycles.clear()
+        self.dirty_pools.clear()
+        self.uncached_bound = self.min_score
+        self._searched = True
+        self._run(rates, active, None)
+        self.full_searches += 1
+        return self.best()
+
+    def _run(self, rates: np.ndarray, active: np.ndarray, dirty_mask: Optional[np.ndarray]) -> None:
+        """Search from every base (only through dirty edges if a mask is given) and update the cache and its bound."""
+        graph = self.price_graph
+        active_ids = np.flatnonzero(active)
+        results: List[Tuple[float, Tuple[int, ...], LongCycle]] = [
+            (cycle.score, key, cycle) for key, cycle in self.cycles.items()
+        ]
+        heapq.heapify(results)
+        while len(results) > self.candidate_pool:
+            evicted = heapq.heappop(results)
+            self.uncached_bound = max(self.uncached_bound, evicted[0])
+
+        for base_address in self.base_tokens:
+            base = graph.token_id(base_address)
+            if base is None:
+                continue
+            reach, reach_dirty = self._bound_tables(base, rates, active_ids, dirty_mask)
+            self._dfs(base, rates, reach, reach_dirty, dirty_mask, results)
+
+        # Cycles evicted or pruned by the DFS scored at most the smallest kept one
+        if len(results) >= self.candidate_pool:
+            self.uncached_bound = max(self.uncached_bound, results[0][0])
+        self.cycles = {key: cycle for _, key, cycle in results}
+
+    def best(self) -> List[LongCycle]:
+        """Get the best max_results cached cycles, highest score first."""
+        ranked = sorted(self.cycles.values(), key=lambda cycle: cycle.score, reverse=True)
+        return ranked[:self.max_results]
+
+    def _rescore_cached(self, rates: np.ndarray, active: np.ndarray, dirty_mask: np.ndarray) -> None:
+        """Rescore cached cycles through dirty edges and drop the ones that no longer qualify."""
+        for key, cycle in list(self.cycles.items()):
+            edges = np.asarray(cycle.edges, dtype=np.int64)
+            if not active[edges].all():
+                del self.cycles[key]
+                continue
+            if not dirty_mask[edges].any():
+                continue
+            score = float(rates[edges].sum())
+            if score <= self.min_score:
+                del self.cycles[key]
+            else:
+                self.cycles[key] = cycle._replace(score=score)
+
+    def _bound_tables(
+        self, base: int, rates: np.ndarray, active_ids: np.ndarray, dirty_mask: Optional[np.ndarray]
+    ) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """
+        Compute the best log rate sums back to the base for every remaining hop budget.
+
+        Args:
+            base: Base token id
+            rates: Edge log rates
+            active_ids: Ids of the active edges
+            dirty_mask: Dirty flag per edge, or None for a full search
+
+        Returns:
+            reach[d][v]: best sum of a v -> base walk that closes a cycle of valid
+            length when d hops were already taken; reach_dirty[d][v]: same for
+            walks using at least one dirty edge (None for a full search)
+        """
+        n = self.price_graph.number_of_nodes()
+        edge_from = self.price_graph.edge_from[active_ids]
+        edge_to = self.price_graph.edge_to[active_ids]
+        edge_rates = rates[active_ids]
+
+        # best[k][v] = best sum of a k-hop walk from v to the base
+        best = np.full((self.max_hops + 1, n), -np.inf)
+        best[0, base] = 0.0
+        best_dirty = None
+        if dirty_mask is not None:
+            edge_dirty = dirty_mask[active_ids]
+            best_dirty = np.full((self.max_hops + 1, n), -np.inf)
+
+        for k in range(1, self.max_hops + 1):
+            np.maximum.at(best[k], edge_from, edge_rates + best[k - 1][edge_to])
+            if best_dirty is not None:
+                tail = np.where(edge_dirty, best[k - 1][edge_to], best_dirty[k - 1][edge_to])
+                np.maximum.at(best_dirty[k], edge_from, edge_rates + tail)
+
+        def collapse(table: np.ndarray) -> np.ndarray:
+            reach = np.full((self.max_hops, n), -np.inf)
+            for depth in range(self.max_hops):
+                lo = max(1, self.min_hops - depth)
+                hi = self.max_hops - depth
+                reach[depth] = table[lo:hi + 1].max(axis=0)
+            return reach
+
+        return collapse(best), collapse(best_dirty) if best_dirty is not None else None
+
+    def _dfs(
+        self,
+        base: int,
+        rates: np.ndarray,
+        reach: np.ndarray,
+        reach_dirty: Optional[np.ndarray],
+        dirty_mask: Optional[np.ndarray],
+        results: List[Tuple[float, Tuple[int, ...], LongCycle]]
+    ) -> None:
+        """Depth-bounded DFS from the base, pruned with the bound tables."""
+        graph = self.price_graph
+        adjacency: Dict[int, List[Tuple[int, int, float]]] = {}
+        path_tokens = [base]
+        path_edges: List[int] = []
+        visited = {base}
+
+        def threshold() -> float:
+            if len(results) < self.candidate_pool:
+                return self.min_score
+            return max(self.min_score, results[0][0])
+
+        def out_edges(v: int) -> List[Tuple[int, int, float]]:
+            row = adjacency.get(v)
+            if row is None:
+                edge_ids = graph.out_edges(v)
+                row = list(zip(edge_ids.tolist(), graph.edge_to[edge_ids].tolist(), rates[edge_ids].tolist()))
+                adjacency[v] = row
+            return row
+
+        def visit(v: int, total: float, used_dirty: bool) -> None:
+            depth = len(path_edges)
+            table = reach if reach_dirty is None or used_dirty else reach_dirty
+            if total + table[depth][v] <= threshold():
+                return
+
+            for edge_id, x, rate in out_edges(v):
+                next_total = total + rate
+                next_dirty = used_dirty or (dirty_mask is not None and dirty_mask[edge_id])
+
+                if x == base:
+                    if depth + 1 < self.min_hops or (reach_dirty is not None and not next_dirty):
+                        continue
+                    if next_total <= threshold():
+                        continue
+                    edges = self._canonical(tuple(path_edges) + (edge_id,))
+                    if any(edges == entry[1] for entry in results):
+                        continue
+                    cycle = LongCycle(tokens=tuple(path_tokens), edges=tuple(path_edges) + (edge_id,), score=next_total)
+                    heapq.heappush(results, (next_total, edges, cycle))
+                    if len(results) > self.candidate_pool:
+                        heapq.heappop(results)
+                    continue
+
+                if x in visited or depth + 1 >= self.max_hops:
+                    continue
+
+                visited.add(x)
+                path_tokens.append(x)
+                path_edges.append(edge_id)
+                visit(x, next_total, next_dirty)
+                path_edges.pop()
+                path_tokens.pop()
+                visited.discard(x)
+
+        visit(base, 0.0, False)
+
+    @staticmethod
+    def _canonical(edges: Tuple[int, ...]) -> Tuple[int, ...]:
+        """Rotate a cycle's edges to start at the smallest edge id, so a cycle through two bases is kept once."""
+        start = edges.index(min(edges))
+        return edges[start:] + edges[:start]
@@ -0,0 +1,253 @@
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+from logger import logger
+
+from domain.entities.models import PoolEvent, V2Sync, V2Swap, V2Mint, V2Burn
+from infrastructure.data_providers.pools.v2_pool import V2Pool
+from usecases.pool_simulator_manager import PoolSimulatorManager
+from usecases.pool_state_journal import PoolStateJournal
+
+
+class PoolEventApplier:
+    """
+    Keeps the V2 pool simulators in step with decoded pool events.
+
+    Events are buffered per block and applied in (block, log_index) order
+    once a later block shows up or flush() is called. Each pool is written
+    at most once per block:
+
+    - A V2 pair emits Sync with the new reserves right before every Swap,
+      Mint and Burn, so when a pool has Syncs in the block the last one is
+      its final state and the other events are already contained in it.
+    - Without a Sync (e.g. only Swap logs are subscribed) the reserve deltas
+      of the Swap/Mint/Burn events are summed and applied once.
+
+    The pools that changed are returned and passed to on_pools_updated
+    (e.g. ArbitrageDetector.update_pool_prices) after every applied batch.
+
+    Every write is journaled with the pool's previous state, so a reorg
+    (an event with is_reorg set for an applied block) rolls the touched
+    pools back to the block before it; the canonical events that follow
+    are then applied as usual. A reorg deeper than the journal sets
+    needs_resync, and the pools must be reloaded from scratch.
+    """
+
+    def __init__(
+        self,
+        pool_simulator_manager: PoolSimulatorManager,
+        on_pools_updated: Optional[Callable[[Set[str]], None]] = None,
+        journal_depth: int = 64
+    ):
+        """
+        Initialize the applier.
+
+        Args:
+            pool_simulator_manager: Manager holding the pool simulators to update
+            on_pools_updated: Called with the addresses of the pools changed by each applied batch
+            journal_depth: Number of most recent blocks that can be rolled back
+        """
+        self.pool_simulator_manager = pool_simulator_manager
+        self.on_pools_updated = on_pools_updated
+        self.journal = PoolStateJournal(journal_depth)
+        self.needs_resync = False
+
+        # Block number -> event id -> event, for blocks not applied yet
+        self._pending: Dict[int, Dict[str, PoolEvent]] = {}
+        self.last_applied_block: Optional[int] = None
+
+        self.events_applied = 0
+        self.pool_writes = 0
+
+    def submit(self, event: PoolEvent) -> Set[str]:
+        """
+        Buffer an event, applying every earlier block that is now complete.
+
+        Args:
+            event: Decoded pool event
+
+        Returns:
+            Addresses of the pools updated by this call
+        """
+        if event.is_reorg:
+            return self._remove_event(event)
+
+        if self.last_applied_block is not None and event.block_number < self.last_applied_block:
+            logger.warning(
+                f"Dropping event {event.get_event_id()} of block {event.block_number}, "
+                f"block {self.last_applied_block} was already applied"
+            )
+            return set()
+
+        self._pending.setdefault(event.block_number, {})[event.get_event_id()] = event
+        return self.flush(before_block=event.block_number)
+
+    def apply_events(self, events: Iterable[PoolEvent]) -> Set[str]:
+        """
+        Apply a batch of events, including those of the last block.
+
+        Args:
+            events: Decoded pool events in any order
+
+        Returns:
+            Addresses of the updated pools
+        """
+        for event in events:
+            if self.last_applied_block is None or event.block_number >= self.last_applied_block:
+                self._pending.setdefault(event.block_number, {})[event.get_event_id()] = event
+        return self.flush()
+
+    def _remove_event(self, event: PoolEvent) -> Set[str]:
+        """Forget an event that was removed from the canonical chain."""
+        pending = self._pending.get(event.block_number)
+        if pending is not None and pending.pop(event.get_event_id(), None) is not None:
+            return set()
+
+        if self.last_applied_block is None or event.block_number > self.last_applied_block:
+            return set()
+
+        updated = self.rollback(event.block_number - 1)
+        return updated if updated is not None else set()
+
+    def rollback(self, block_number: int) -> Optional[Set[str]]:
+        """
+        Restore the pools written after a block to their state at the end of it.
+
+        Buffered events of later blocks are kept, so they are applied again
+        (replayed) on the next flush.
+
+        Args:
+            block_number: Last block to keep
+
+        Returns:
+            Addresses of the restored pools, or None if the reorg is deeper than the journal
+        """
+        restored = self.journal.rollback(block_number)
+        if restored is None:
+            logger.error(
+                f"Cannot roll back to block {block_number}, journal starts at block {self.journal.oldest_block}"
+            )
+            self.needs_resync = True
+            return None
+
+        for pool_address, (reserve0, reserve1, state_block) in restored.items():
+            pool = self.pool_simulator_manager.writable_simulator(pool_address)
+            if isinstance(pool, V2Pool):
+                pool.update_reserves(reserve0, reserve1, state_block)
+
+        if self.last_applied_block is not None:
+            self.last_applied_block = min(self.last_applied_block, block_number)
+
+        updated = set(restored)
+        logger.info(f"Rolled back {len(updated)} pools to block {block_number}")
+        if updated and self.on_pools_updated is not None:
+            try:
+                self.on_pools_updated(updated)
+            except Exception as e:
+                logger.exception(f"Error publishing {len(updated)} restored pools")
+        return updated
+
+    def reorg(self, block_number: int, events: Iterable[PoolEvent]) -> Optional[Set[str]]:
+        """
+        Roll back to a block and replay the canonical events after it.
+
+        Args:
+            block_number: Last block both chains share
+            events: Canonical events of the blocks after it
+
+        Returns:
+            Addresses of the pools changed by the rollback or the replay, or None if the reorg is too deep
+        """
+        restored = self.rollback(block_number)
+        if restored is None:
+            return None
+        return restored | self.apply_events(events)
+
+    def reset(self) -> None:
+        """Forget buffered events and the journal, e.g. after the pools were reloaded."""
+        self._pending.clear()
+        self.journal.clear()
+        self.last_applied_block = None
+        self.needs_resync = False
+
+    def flush(self, before_block: Optional[int] = None) -> Set[str]:
+        """
+        Apply the buffered blocks in order.
+
+        Args:
+            before_block: Only apply blocks lower than this one (all blocks if None)
+
+        Returns:
+            Addresses of the updated pools
+        """
+        blocks = sorted(block for block in self._pending if before_block is None or block < before_block)
+        updated: Set[str] = set()
+        for block in blocks:
+            updated |= self._apply_block(block, self._pending.pop(block).values())
+            self.last_applied_block = block
+
+        if updated and self.on_pools_updated is not None:
+            try:
+                self.on_pools_updated(updated)
+            except Exception as e:
+                logger.exception(f"Error publishing {len(updated)} updated pools")
+        return updated
+
+    def _apply_block(self, block_number: int, events: Iterable[PoolEvent]) -> Set[str]:
+        """
+        Apply the events of one block with one reserve write per pool.
+
+        Args:
+            block_number: Block number
+            events: Events of the block
+
+        Returns:
+            Addresses of the updated pools
+        """
+        by_pool: Dict[str, List[PoolEvent]] = {}
+        for event in sorted(events, key=lambda e: e.log_index):
+            by_pool.setdefault(event.pool_address, []).append(event)
+
+        updated: Set[str] = set()
+        for pool_address, pool_events in by_pool.items():
+            pool = self.pool_simulator_manager.writable_simulator(pool_address)
+            if not isinstance(pool, V2Pool):
+                continue
+
+            reserves = self._final_reserves(pool, pool_events)
+            self.events_applied += len(pool_events)
+            if reserves is None:
+                continue
+
+            reserve0, reserve1 = reserves
+            if reserve0 < 0 or reserve1 < 0:
+                logger.error(f"Negative reserves for {pool_address} in block {block_number}, keeping previous state")
+                continue
+
+            self.journal.record(block_number, pool_address, (pool.reserve0, pool.reserve1, pool.block_number))
+            pool.update_reserves(reserve0, reserve1, block_number)
+            self.pool_writes += 1
+            updated.add(pool_address)
+        return updated
+
+    @staticmethod
+    def _final_reserves(pool: V2Pool, events: List[PoolEvent]) -> Optional[Tuple[int, int]]:
+        """Get the reserves of a pool after its events of one block (in log order)."""
+        syncs = [event for event in events if isinstance(event, V2Sync)]
+        if syncs:
+            return syncs[-1].reserve0, syncs[-1].reserve1
+
+        delta0 = 0
+        delta1 = 0
+        for event in events:
+            if isinstance(event, V2Swap):
+                delta0 += event.amount0_in - event.amount0_out
+                delta1 += event.amount1_in - event.amount1_out
+            elif isinstance(event, V2Mint):
+                delta0 += event.amount0
+                delta1 += event.amount1
+            elif isinstance(event, V2Burn):
+                delta0 -= event.amount0
+                delta1 -= event.amount1
+
+        if delta0 == 0 and delta1 == 0:
+            return None
+        return pool.reserve0 + delta0, pool.reserve1 + delta1
@@ -1,22 +1,69 @@
-from typing import Dict, Optional, Any, Tuple
+from typing import Dict, Optional, Any, Set, Tuple
 from decimal import Decimal
 import math
 from logger import logger
 
 from infrastructure.data_providers.pools.v2_pool import V2Pool
+from infrastructure.data_providers.pools.v3_pool import V3Pool
+from infrastructure.data_providers.pools.pool_state_mirror import PoolStateMirror
 from domain.entities.pool_models import IPool
+from usecases.quote_cache import QuoteCache
 # from infrastructure.repositories.redis_logger import redis_pool_logger
 
 
 
 class PoolSimulatorManager:
-    def __init__(self):
+    """
+    Holds the pool simulators by address.
+
+    fork() gives a copy-on-write overlay for what-if simulations: the fork
+    reads through to its base and copies a pool into its own
+    pool_simulators only when it is written (writable_simulator /
+    apply_swap), so a speculative sequence of swaps costs O(touched pools)
+    and never changes the base. Forks can be forked again and share the
+    base's quote cache, whose keys include the pool state version.
+    """
+
+    def __init__(self, base: Optional['PoolSimulatorManager'] = None):
+        """
+        Initialize the manager.
+
+        Args:
+            base: Manager to read through to (for forks)
+        """
+        self.base = base
+        # Pools of this manager; for a fork, only the pools it wrote
         self.pool_simulators: dict[str, IPool] = {}
         self.v2_pool_address_cache: dict[str, str] = {}
+        self.v3_pool_address_cache: dict[str, str] = {}
+        # Pools removed in a fork, hiding those of the base
+        self._removed: Set[str] = set()
+        self.quote_cache = base.quote_cache if base is not None else QuoteCache()
+        # Float64 copy of the V2 reserves for vectorized screening (forks write to pool copies, not the mirror)
+        self.state_mirror: Optional[PoolStateMirror] = PoolStateMirror() if base is None else None
     
     def clear(self) -> None:
         self.pool_simulators.clear()
         self.v2_pool_address_cache.clear()
+        self.v3_pool_address_cache.clear()
+        self._removed.clear()
+        if self.base is None:
+            self.quote_cache.clear()
+            self.state_mirror = PoolStateMirror()
+
+    def fork(self) -> 'PoolSimulatorManager':
+        """
+        Get a copy-on-write fork of the pool states.
+        
+        Returns:
+            Manager reading through to this one
+        """
+        return PoolSimulatorManager(base=self)
+
+    @property
+    def touched_pools(self) -> Set[str]:
+        """Get the addresses of the pools a fork has written."""
+        return set(self.pool_simulators)
     
     def _create_pool_by_tokens_cache_key(self, token0: str, token1: str, fee: int, provider: str) -> str:
         """
@@ -51,11 +98,37 @@ class PoolSimulatorManager:
         # Check cache first
         if cache_key in self.v2_pool_address_cache:
             return self.v2_pool_address_cache[cache_key]
+
+        if self.base is not None:
+            pool_address = self.base.get_v2_pool_address(token0, token1, provider)
+            if pool_address not in self._removed:
+                return pool_address
             
         # Not in cache - we'll return None
         # Repository calls are handled in the transaction handlers
         return None
     
+    def get_v3_pool_address(self, token0: str, token1: str, fee_tier: int, provider: str) -> Optional[str]:
+        """
+        Get V3 pool address from cache.
+        
+        Args:
+            token0: First token address
+            token1: Second token address
+            fee_tier: Fee tier in hundredths of a bip (e.g., 3000 for 0.3%)
+            provider: Provider name
+            
+        Returns:
+            Pool address if found, None otherwise
+        """
+        cache_key = self._create_pool_by_tokens_cache_key(token0, token1, fee_tier, provider)
+        pool_address = self.v3_pool_address_cache.get(cache_key)
+        if pool_address is None and self.base is not None:
+            pool_address = self.base.get_v3_pool_address(token0, token1, fee_tier, provider)
+            if pool_address in self._removed:
+                return None
+        return pool_address
+    
     def get_simulator(self, pool_address: str) -> Optional[IPool]:
         """
         Get a pool simulator by address.
@@ -66,7 +139,111 @@ class PoolSimulatorManager:
         Returns:
             Pool simulator if found, None otherwise
         """
-        return self.pool_simulators.get(pool_address)
+        pool_simulator = self.pool_simulators.get(pool_address)
+        if pool_simulator is None and self.base is not None and pool_address not in self._removed:
+            return self.base.get_simulator(pool_address)
+        return pool_simulator
+
+    def writable_simulator(self, pool_address: str) -> Optional[IPool]:
+        """
+        Get a pool simulator that may be changed, copying it from the base first in a fork.
+        
+        Args:
+            pool_address: Pool address
+            
+        Returns:
+            Pool simulator owned by this manager, None if not found
+        """
+        pool_simulator = self.pool_simulators.get(pool_address)
+        if pool_simulator is None and self.base is not None and pool_address not in self._removed:
+            base_simulator = self.base.get_simulator(pool_address)
+            if base_simulator is not None:
+                pool_simulator = base_simulator.copy()
+                self.pool_simulators[pool_address] = pool_simulator
+        return pool_simulator
+
+    def apply_swap(self, pool_address: str, amount_in: int, zero_for_one: bool) -> int:
+        """
+        Swap an exact input amount on a pool, changing only this manager's copy of it.
+        
+        Args:
+            pool_address: Pool address
+            amount_in: Input amount in wei units
+            zero_for_one: True to sell token0 for token1
+            
+        Returns:
+            Output amount in wei units
+        """
+        pool_simulator = self.writable_simulator(pool_address)
+        if pool_simulator is None:
+            raise KeyError(f"No pool simulator for {pool_address}")
+        return pool_simulator.apply_swap(amount_in, zero_for_one)
+
+    def get_amount_out(self, pool_address: str, amount_in: int, zero_for_one: bool) -> int:
+        """
+        Quote an exact-input swap on a pool through the quote cache.
+        
+        Args:
+            pool_address: Pool address
+            amount_in: Input amount in wei units
+            zero_for_one: True to sell token0 for token1
+            
+        Returns:
+            Output amount in wei units
+        """
+        pool_simulator = self.get_simulator(pool_address)
+        if pool_simulator is None:
+            raise KeyError(f"No pool simulator for {pool_address}")
+        return self.quote_cache.get_amount_out(pool_simulator, amount_in, zero_for_one)
+
+    def get_amount_in(self, pool_address: str, amount_out: int, zero_for_one: bool) -> int:
+        """
+        Quote an exact-output swap on a pool through the quote cache.
+        
+        Args:
+            pool_address: Pool address
+            amount_out: Desired output amount in wei units
+            zero_for_one: True to sell token0 for token1
+            
+        Returns:
+            Input amount in wei units
+        """
+        pool_simulator = self.get_simulator(pool_address)
+        if pool_simulator is None:
+            raise KeyError(f"No pool simulator for {pool_address}")
+        return self.quote_cache.get_amount_in(pool_simulator, amount_out, zero_for_one)
+
+    def remove_simulator(self, pool_address: str) -> None:
+        """
+        Remove a pool simulator and its address cache entry.
+        
+        Args:
+            pool_address: Pool address
+        """
+        if self.base is not None:
+            # Hide the base pool; its address cache entries are filtered on lookup
+            self.pool_simulators.pop(pool_address, None)
+            self._removed.add(pool_address)
+            return
+
+        pool_simulator = self.pool_simulators.pop(pool_address, None)
+        if pool_simulator is None:
+            return
+        if isinstance(pool_simulator, V2Pool):
+            self.state_mirror.remove(pool_address)
+            pool_simulator.attach_mirror(None, 0)
+
+        if isinstance(pool_simulator, V3Pool):
+            address_cache = self.v3_pool_address_cache
+            fee_key = pool_simulator.fee_pips
+        else:
+            address_cache = self.v2_pool_address_cache
+            fee_key = 0
+        address_cache_key = self._create_pool_by_tokens_cache_key(
+            pool_simulator.token0, pool_simulator.token1, fee_key, pool_simulator.protocol
+        )
+        if address_cache.get(address_cache_key) == pool_address:
+            del address_cache[address_cache_key]
 
 
     async def create_and_store_v2_pool_simulator(
@@ -103,9 +280,15 @@ class PoolSimulatorManager:
             print(pool_simulator.address, pool_simulator.token0, pool_simulator.token1, pool_simulator.reserve0, pool_simulator.reserve1)
             
             # Store pool simulator
+            previous_simulator = self.pool_simulators.get(pool_address)
+            if isinstance(previous_simulator, V2Pool):
+                previous_simulator.attach_mirror(None, 0)
             self.pool_simulators[pool_address] = pool_simulator
+            if self.state_mirror is not None:
+                self.state_mirror.add(pool_simulator)
             address_cache_key = self._create_pool_by_tokens_cache_key(token0, token1, 0, provider_name)
             self.v2_pool_address_cache[address_cache_key] = pool_address
+            self._removed.discard(pool_address)
 
             # Log pool creation to Redis
             # redis_pool_logger.log_pool_creation(pool_simulator, block_number)
@@ -114,6 +297,56 @@ class PoolSimulatorManager:
         except Exception as e:
             logger.exception(f"Error creating V2 pool simulator for {pool_address}")
 
+    async def create_and_store_v3_pool_simulator(
+        self, pool_address: str, token0: str, token1: str,
+        decimals0: int, decimals1: int, sqrt_price_x96: int, tick: int, liquidity: int,
+        tick_spacing: int, ticks: Dict[int, int], fee_tier: int, block_number: int, provider_name: str = 'uniswap_v3',
+        use_sqrt_ratio_table: bool = False
+    ) -> None:
+        """
+        Create and store a pool simulator for a V3 pool.
+        
+        Args:
+            pool_address: Pool address
+            token0: Token0 address
+            token1: Token1 address
+            decimals0: Token0 decimals
+            decimals1: Token1 decimals
+            sqrt_price_x96: slot0.sqrtPriceX96
+            tick: slot0.tick
+            liquidity: Active liquidity
+            tick_spacing: Tick spacing of the pool
+            ticks: Initialized tick -> liquidityNet
+            fee_tier: Fee tier in hundredths of a bip (e.g., 3000 for 0.3%)
+            block_number: Block the state was read at
+            provider_name: Provider name
+            use_sqrt_ratio_table: Use the precomputed tick sqrt ratios of the tick spacing (for hot pools)
+        """
+        try:
+            pool_simulator = V3Pool(
+                address=pool_address,
+                token0=token0,
+                token1=token1,
+                sqrt_price_x96=int(sqrt_price_x96),
+                tick=int(tick),
+                liquidity=int(liquidity),
+                tick_spacing=int(tick_spacing),
+                ticks={int(t): int(net) for t, net in ticks.items()},
+                fee=fee_tier/1000000.0,
+                decimals0=decimals0,
+                decimals1=decimals1,
+                protocol=provider_name,
+                block_number=block_number,
+                use_sqrt_ratio_table=use_sqrt_ratio_table
+            )
+
+            self.pool_simulators[pool_address] = pool_simulator
+            address_cache_key = self._create_pool_by_tokens_cache_key(token0, token1, fee_tier, provider_name)
+            self.v3_pool_address_cache[address_cache_key] = pool_address
+            self._removed.discard(pool_address)
+        except Exception as e:
+            logger.exception(f"Error creating V3 pool simulator for {pool_address}")
+
     '''
     def _update_graph_edges(self, pool_simulator: Any, price_graph: Any) -> None:
         """
@@ -148,9 +381,7 @@ class PoolSimulatorManager:
     '''
 
     def clone(self) -> 'PoolSimulatorManager':
-        return PoolSimulatorManager(
-            pool_simulators=self.pool_simulators,
-            v2_pool_address_cache=self.v2_pool_address_cache
-        )
+        """Get a copy-on-write fork (see fork())."""
+        return self.fork()
 
     
\ No newline at end of file
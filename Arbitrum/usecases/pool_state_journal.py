@@ -0,0 +1,95 @@
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+# Pool state before a block: (reserve0, reserve1, block number of that state)
+PoolState = Tuple[int, int, Optional[int]]
+
+
+class PoolStateJournal:
+    """
+    Bounded per-block undo log of pool simulator state.
+
+    For every applied block only the pools written in that block are
+    recorded, each with its state from before the block's first write.
+    Undoing a block restores exactly those pools, so a reorg costs
+    O(changed pools) instead of a graph rebuild. The oldest blocks are
+    dropped once more than max_depth blocks are journaled.
+    """
+
+    def __init__(self, max_depth: int = 64):
+        """
+        Initialize an empty journal.
+
+        Args:
+            max_depth: Number of most recent blocks that can be rolled back
+        """
+        if max_depth < 1:
+            raise ValueError(f"Invalid journal depth: {max_depth}")
+        self.max_depth = max_depth
+        # Block number -> pool address -> state before the block, oldest block first
+        self._blocks: "OrderedDict[int, Dict[str, PoolState]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._blocks)
+
+    @property
+    def oldest_block(self) -> Optional[int]:
+        """Get the oldest block that can be undone."""
+        return next(iter(self._blocks), None)
+
+    def clear(self) -> None:
+        """Forget all journaled blocks."""
+        self._blocks.clear()
+
+    def record(self, block_number: int, pool_address: str, previous: PoolState) -> None:
+        """
+        Record the state of a pool before its first write in a block.
+
+        Later writes of the same pool in the same block are ignored, so the
+        journal always holds the state from before the block.
+
+        Args:
+            block_number: Block being applied
+            pool_address: Pool address
+            previous: State of the pool before the write
+        """
+        changes = self._blocks.get(block_number)
+        if changes is None:
+            changes = self._blocks[block_number] = {}
+            while len(self._blocks) > self.max_depth:
+                self._blocks.popitem(last=False)
+        changes.setdefault(pool_address, previous)
+
+    def can_rollback(self, block_number: int) -> bool:
+        """
+        Check if the state at the end of a block can be restored.
+
+        Args:
+            block_number: Block to roll back to
+
+        Returns:
+            True if every journaled block after it is still in the journal
+        """
+        oldest = self.oldest_block
+        return oldest is None or block_number >= oldest - 1
+
+    def rollback(self, block_number: int) -> Optional[Dict[str, PoolState]]:
+        """
+        Undo every block after a block.
+
+        Args:
+            block_number: Last block to keep
+
+        Returns:
+            Pool address -> state to restore (the oldest recorded state of each
+            pool across the undone blocks), or None if the journal is not deep enough
+        """
+        if not self.can_rollback(block_number):
+            return None
+
+        restored: Dict[str, PoolState] = {}
+        undone: List[int] = [block for block in self._blocks if block > block_number]
+        # Newest first, so the state from before the oldest undone block wins
+        for block in reversed(undone):
+            restored.update(self._blocks.pop(block))
+        return restored
@@ -0,0 +1,96 @@
+from typing import Callable, Hashable, Tuple
+from cachetools import LRUCache
+
+from domain.entities.pool_models import IPool
+
+# Quote kinds stored in the cache
+EXACT_INPUT = 'in'
+EXACT_OUTPUT = 'out'
+
+
+class QuoteCache:
+    """
+    LRU cache of pool quotes keyed by (pool address, state version, kind, direction, amount).
+
+    Every state change of a pool gives it a new state_version, so entries
+    of older states are never hit again and simply age out of the LRU; no
+    explicit invalidation is needed. Sizing many candidate amounts over
+    cycles that share pools within one block reuses the quotes of the
+    shared hops.
+    """
+
+    def __init__(self, maxsize: int = 100_000):
+        """
+        Initialize the cache.
+
+        Args:
+            maxsize: Maximum number of cached quotes
+        """
+        self._cache: LRUCache = LRUCache(maxsize=maxsize)
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    @property
+    def hit_ratio(self) -> float:
+        """Get the share of lookups answered from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def clear(self) -> None:
+        """Drop all quotes and reset the counters."""
+        self._cache.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def _get(self, key: Tuple[Hashable, ...], compute: Callable[[], int]) -> int:
+        try:
+            value = self._cache[key]
+        except KeyError:
+            self.misses += 1
+            value = compute()
+            self._cache[key] = value
+            return value
+        self.hits += 1
+        return value
+
+    def get_amount_out(self, pool: IPool, amount_in: int, zero_for_one: bool) -> int:
+        """
+        Get the output of an exact-input swap, quoting the pool on a miss.
+
+        Args:
+            pool: Pool simulator (V2Pool or V3Pool)
+            amount_in: Input amount in wei units
+            zero_for_one: True to sell token0 for token1
+
+        Returns:
+            Output amount in wei units
+        """
+        key = (pool.address, pool.state_version, EXACT_INPUT, zero_for_one, amount_in)
+        return self._get(key, lambda: pool.get_amount_out(amount_in, zero_for_one))
+
+    def get_amount_in(self, pool: IPool, amount_out: int, zero_for_one: bool) -> int:
+        """
+        Get the input of an exact-output swap, quoting the pool on a miss.
+
+        Args:
+            pool: Pool simulator (V2Pool or V3Pool)
+            amount_out: Desired output amount in wei units
+            zero_for_one: True to sell token0 for token1
+
+        Returns:
+            Input amount in wei units
+        """
+        key = (pool.address, pool.state_version, EXACT_OUTPUT, zero_for_one, amount_out)
+        return self._get(key, lambda: pool.get_amount_in(amount_out, zero_for_one))
+
+    def stats(self) -> dict:
+        """Get the cache size, hit and miss counts and hit ratio."""
+        return {
+            'size': len(self._cache),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hit_ratio,
+        }
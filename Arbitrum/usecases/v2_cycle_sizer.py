@@ -0,0 +1,252 @@
+from typing import List, Optional, Sequence, Tuple, Union
+from math import isqrt
+import numpy as np
+
+from domain.entities.models import CycleQuote
+from infrastructure.data_providers.graph.cycle import Cycle_3, Cycle_2
+from infrastructure.data_providers.pools.v2_pool import V2Pool
+from infrastructure.data_providers.pools.pool_state_mirror import PoolStateMirror
+from usecases.pool_simulator_manager import PoolSimulatorManager
+
+# Fee denominator used by the V2 contracts (fee multiplier is in parts per 10000)
+FEE_DENOMINATOR = 10000
+
+# (reserve in, reserve out, fee multiplier) of one swap
+Hop = Tuple[int, int, int]
+
+
+def compose_hops(hops: Sequence[Hop]) -> Tuple[int, int, int]:
+    """
+    Compose a chain of constant-product swaps into one Mobius transform.
+
+    A single hop maps x to n*R'*x / (D*R + n*x). Chaining such maps gives
+    again out(x) = P*x / (Q + S*x), so the whole cycle behaves like one pool
+    with the composite coefficients (P, Q, S).
+
+    Args:
+        hops: Swaps in trading order
+
+    Returns:
+        Composite coefficients (P, Q, S)
+    """
+    p, q, s = 1, 1, 0
+    for reserve_in, reserve_out, fee_multiplier in hops:
+        p, q, s = (
+            fee_multiplier * reserve_out * p,
+            FEE_DENOMINATOR * reserve_in * q,
+            FEE_DENOMINATOR * reserve_in * s + fee_multiplier * p,
+        )
+    return p, q, s
+
+
+def optimal_amount_in(p: int, q: int, s: int) -> int:
+    """
+    Get the input maximizing out(x) - x for out(x) = P*x / (Q + S*x).
+
+    The derivative vanishes at x* = (sqrt(P*Q) - Q) / S, which is positive
+    only if the marginal rate at zero (P / Q) is above one.
+
+    Args:
+        p: Composite numerator coefficient
+        q: Composite constant denominator coefficient
+        s: Composite linear denominator coefficient
+
+    Returns:
+        Optimal input amount in wei units (0 if the cycle is not profitable)
+    """
+    if p <= q or s == 0:
+        return 0
+    return max(0, (isqrt(p * q) - q) // s)
+
+
+def simulate_hops(hops: Sequence[Hop], amount_in: int) -> int:
+    """
+    Simulate a chain of V2 swaps with the contract's integer rounding.
+
+    Args:
+        hops: Swaps in trading order
+        amount_in: Input amount in wei units
+
+    Returns:
+        Output amount in wei units
+    """
+    amount = amount_in
+    for reserve_in, reserve_out, fee_multiplier in hops:
+        amount_in_with_fee = amount * fee_multiplier
+        amount = amount_in_with_fee * reserve_out // (reserve_in * FEE_DENOMINATOR + amount_in_with_fee)
+    return amount
+
+
+def estimate_cycles(
+    mirror: PoolStateMirror, rows: np.ndarray, zero_for_one: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Estimate the optimal input and profit of many cycles at once on float64 reserves.
+
+    Same composite transform as compose_hops / optimal_amount_in, evaluated
+    column by column over all cycles; without the per-hop floor rounding the
+    estimate is a slight upper bound of the exact profit.
+
+    Args:
+        mirror: Float64 mirror of the pool reserves
+        rows: (n x hops) mirror rows of the pools, in trading order
+        zero_for_one: (n x hops) swap directions
+
+    Returns:
+        Estimated optimal input and profit per cycle, in wei units of the start token
+    """
+    reserve_in, reserve_out, fee_multiplier = mirror.hop_arrays(rows, zero_for_one)
+    n = rows.shape[0]
+    p = np.ones(n)
+    q = np.ones(n)
+    s = np.zeros(n)
+    for hop in range(rows.shape[1]):
+        p, q, s = (
+            fee_multiplier[:, hop] * reserve_out[:, hop] * p,
+            reserve_in[:, hop] * q,
+            reserve_in[:, hop] * s + fee_multiplier[:, hop] * p,
+        )
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        amount_in = np.where((p > q) & (s > 0), (np.sqrt(p * q) - q) / s, 0.0)
+        amount_out = p * amount_in / (q + s * amount_in)
+    profit = np.nan_to_num(amount_out - amount_in, nan=0.0)
+    return np.nan_to_num(amount_in, nan=0.0), profit
+
+
+class V2CycleSizer:
+    """
+    Closed-form trade sizing for cycles made only of V2 pools.
+
+    The composite transform of the cycle gives the profit-maximizing input
+    directly; the expected output is then simulated hop by hop with the same
+    floor division as the contracts, so the quoted profit is exact for the
+    current reserves.
+
+    Batches are screened first on the float64 reserve mirror of the pool
+    simulator manager; only cycles whose estimated profit passes are sized
+    with integer arithmetic.
+    """
+
+    def __init__(self, pool_simulator_manager: PoolSimulatorManager):
+        """
+        Initialize the sizer.
+
+        Args:
+            pool_simulator_manager: Manager holding the pool simulators
+        """
+        self.pool_simulator_manager = pool_simulator_manager
+
+    @staticmethod
+    def _legs(cycle: Union[Cycle_3, Cycle_2]) -> Tuple:
+        """Get the (token in, edge) of each hop of a cycle."""
+        if isinstance(cycle, Cycle_3):
+            return ((cycle.token1, cycle.edge1), (cycle.token2, cycle.edge2), (cycle.token3, cycle.edge3))
+        return ((cycle.token1, cycle.edge1), (cycle.token2, cycle.edge2))
+
+    def cycle_rows(self, cycle: Union[Cycle_3, Cycle_2]) -> Optional[Tuple[List[int], List[bool]]]:
+        """
+        Get the float mirror rows and swap directions of a cycle.
+
+        Args:
+            cycle: Cycle to trade, starting with token1
+
+        Returns:
+            (rows, zero_for_one) in trading order, or None if a pool is not a mirrored V2 pool
+        """
+        manager = self.pool_simulator_manager
+        mirror = manager.state_mirror
+        rows = []
+        directions = []
+        for token_in, edge in self._legs(cycle):
+            row = mirror.row(edge.pool)
+            pool = manager.get_simulator(edge.pool) if row is not None else None
+            if not isinstance(pool, V2Pool) or token_in not in (pool.token0, pool.token1):
+                return None
+            rows.append(row)
+            directions.append(token_in == pool.token0)
+        return rows, directions
+
+    def cycle_hops(self, cycle: Union[Cycle_3, Cycle_2]) -> Optional[List[Hop]]:
+        """
+        Get the swaps of a cycle from the current pool reserves.
+
+        Args:
+            cycle: Cycle to trade, starting with token1
+
+        Returns:
+            Swaps in trading order, or None if a pool is not a known V2 pool
+        """
+        hops = []
+        for token_in, edge in self._legs(cycle):
+            pool = self.pool_simulator_manager.get_simulator(edge.pool)
+            if not isinstance(pool, V2Pool):
+                return None
+            if token_in == pool.token0:
+                hops.append((pool.reserve0, pool.reserve1, pool.fee_multiplier))
+            elif token_in == pool.token1:
+                hops.append((pool.reserve1, pool.reserve0, pool.fee_multiplier))
+            else:
+                return None
+        return hops
+
+    def size_cycle(self, cycle: Union[Cycle_3, Cycle_2]) -> Optional[CycleQuote]:
+        """
+        Compute the optimal input and exact expected profit of one cycle.
+
+        Args:
+            cycle: Cycle to trade, starting with token1
+
+        Returns:
+            Quote in wei units of token1, or None if the cycle is not all-V2 or not profitable
+        """
+        hops = self.cycle_hops(cycle)
+        if hops is None or any(reserve_in == 0 or reserve_out == 0 for reserve_in, reserve_out, _ in hops):
+            return None
+
+        amount_in = optimal_amount_in(*compose_hops(hops))
+        if amount_in == 0:
+            return None
+
+        amount_out = simulate_hops(hops, amount_in)
+        if amount_out <= amount_in:
+            return None
+        return CycleQuote(amount_in=amount_in, amount_out=amount_out, profit=amount_out - amount_in)
+
+    def size_cycles(
+        self, cycles: Sequence[Union[Cycle_3, Cycle_2]], min_estimated_profit: float = 0.0
+    ) -> List[Optional[CycleQuote]]:
+        """
+        Size a batch of cycles of the same length.
+
+        Args:
+            cycles: Cycles to trade
+            min_estimated_profit: Float screening threshold in wei units; cycles at or below it are not sized exactly
+
+        Returns:
+            One quote per cycle (None for cycles that are not all-V2 or not profitable)
+        """
+        if self.pool_simulator_manager.state_mirror is None or not cycles:
+            return [self.size_cycle(cycle) for cycle in cycles]
+
+        candidates = []
+        rows = []
+        directions = []
+        for i, cycle in enumerate(cycles):
+            cycle_rows = self.cycle_rows(cycle)
+            if cycle_rows is not None:
+                candidates.append(i)
+                rows.append(cycle_rows[0])
+                directions.append(cycle_rows[1])
+
+        quotes: List[Optional[CycleQuote]] = [None] * len(cycles)
+        if not candidates:
+            return quotes
+
+        _, profit = estimate_cycles(
+            self.pool_simulator_manager.state_mirror,
+            np.asarray(rows, dtype=np.int64), np.asarray(directions, dtype=bool)
+        )
+        for k in np.flatnonzero(profit > min_estimated_profit).tolist():
+            quotes[candidates[k]] = self.size_cycle(cycles[candidates[k]])
+        return quotes